@@ -1,24 +1,24 @@
 import streamlit as st
 import os
+import time
 from dotenv import load_dotenv
 
 # Load environment variables from .env file (if it exists)
 load_dotenv()
 
-from utils.gemini_helper import ask_gemini, analyze_image_for_disease
-from utils.weather_helper import get_weather_data
-from utils.crop_advisory import get_crop_recommendation
-from utils.news_helper import get_agriculture_news
+# Only what the first screen needs is imported here. Each section's helpers
+# (and through them requests, numpy and the Gemini SDK) are imported by its
+# render function or section_data provider when it is first opened; later
+# reruns find them in sys.modules. Profile with `python -m utils.import_profile`.
+from utils.gemini_helper import ask_gemini_stream, analyze_image_bytes_for_disease
 from utils.auth_helper import register_user, login_user, get_user_data
-from utils.market_prices import get_market_prices, get_market_insights, get_best_selling_time
-from utils.farming_calendar import get_crop_calendar, add_crop_to_user, get_upcoming_tasks, add_reminder
-import json
+from utils.prefetch import get_refresher
+from utils import section_data
+from utils.i18n import get_catalog
+from utils.chat_memory import create_chat_memory
 from datetime import datetime, timedelta
-import base64
-import speech_recognition as sr
-import tempfile
-import io
-from audio_recorder_streamlit import audio_recorder
+
+script_start = time.perf_counter()
 
 # Page configuration
 st.set_page_config(
@@ -32,8 +32,8 @@ st.set_page_config(
 if 'current_section' not in st.session_state:
     st.session_state.current_section = "Ask AI"
 
-if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+if 'chat_memory' not in st.session_state:
+    st.session_state.chat_memory = create_chat_memory()
 
 if 'language' not in st.session_state:
     st.session_state.language = "English"
@@ -50,6 +50,9 @@ if 'user_mobile' not in st.session_state:
 if 'user_data' not in st.session_state:
     st.session_state.user_data = None
 
+if 'render_times' not in st.session_state:
+    st.session_state.render_times = {}
+
 # def process_voice_input(audio_file, language_code):
 #     """Process voice input and convert to text"""
 #     recognizer = sr.Recognizer()
@@ -81,393 +84,14 @@ st.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
-# Language selector
-languages = {"English": "en", "Malayalam": "ml", "Hindi": "hi", "Marathi": "mr"}
-
-# UI translations
-ui_translations = {
-    "English": {
-        "select_language": "🌐 Select Language",
-        "navigation": "Navigation",
-        "ask_ai": "💬 Ask AI",
-        "weather_info": "🌦️ Weather Info",
-        "schemes": "📢 Schemes",
-        "crop_advisory": "🌾 Crop Advisory",
-        "news_feed": "📰 News Feed",
-        "market_prices": "📈 Market Prices",
-        "farming_calendar": "📅 My Calendar",
-        "login": "🔐 Login/Signup",
-        "farming_assistant": "AI Farming Assistant",
-        "ask_questions": "Ask your farming questions",
-        "type_question": "Type your farming question here...",
-        "send": "📤 Send",
-        "voice_input": "🎤 Voice Input - Speak Directly",
-        "record_voice": "Click to record your question",
-        "upload_audio": "Upload audio file (WAV format)",
-        "process_voice": "🎤 Process Voice Input",
-        "disease_detection": "🔍 Crop Disease Detection",
-        "upload_image": "Upload crop image for disease analysis",
-        "analyze": "Analyze Disease",
-        "logout": "Logout",
-        "weather_header": "🌦️ Weather Information",
-        "temperature": "🌡️ Temperature",
-        "humidity": "💧 Humidity",
-        "rainfall": "🌧️ Rainfall",
-        "wind_speed": "💨 Wind Speed",
-        "current_conditions": "Current Conditions",
-        "weather": "Weather",
-        "feels_like": "Feels like",
-        "farming_advisory": "🧑‍🌾 Farming Advisory",
-        "high_humidity": "⚠️ High humidity detected. Monitor crops for fungal diseases.",
-        "high_temp": "🌡️ High temperature. Ensure adequate irrigation.",
-        "good_rainfall": "🌧️ Good rainfall. Perfect for rice cultivation.",
-        "schemes_header": "📢 Government Schemes",
-        "available_schemes": "Available Schemes for Kerala",
-        "description": "Description",
-        "eligibility": "Eligibility",
-        "benefits": "Benefits",
-        "how_to_apply": "How to Apply",
-        "deadline": "Deadline",
-        "contact": "Contact",
-        "crop_advisory_header": "🌾 Crop Advisory System",
-        "select_season": "Select Current Season",
-        "select_soil": "Select Soil Type",
-        "get_recommendations": "Get Crop Recommendations",
-        "recommended_crops": "🌱 Recommended Crops",
-        "alternative_crops": "Alternative Crops",
-        "farming_tips": "🧑‍🌾 Farming Tips",
-        "news_header": "📰 Agriculture News Feed",
-        "source": "Source",
-        "read_more": "Read More",
-        "market_header": "📈 Market Prices",
-        "live_prices": "📊 Live Market Prices",
-        "last_updated": "Last Updated",
-        "market_insights": "💡 Market Insights",
-        "best_time_sell": "⏰ Best Time to Sell",
-        "select_crop": "Select Crop",
-        "best_months": "Best Months",
-        "reason": "Reason",
-        "advice": "Advice",
-        "login_header": "🔐 Login / Signup",
-        "login_tab": "Login",
-        "signup_tab": "Sign Up",
-        "login_to_account": "Login to Your Account",
-        "mobile_number": "Mobile Number",
-        "password": "Password",
-        "login_button": "Login",
-        "create_account": "Create New Account",
-        "full_name": "Full Name",
-        "location": "Location (Village, District, State)",
-        "confirm_password": "Confirm Password",
-        "signup_button": "Sign Up",
-        "calendar_header": "📅 My Farming Calendar",
-        "my_crops": "🌾 My Crops",
-        "add_new_crop": "🌱 Add New Crop",
-        "upcoming_tasks": "📋 Upcoming Tasks (Next 7 Days)",
-        "planting_date": "Planting Date",
-        "expected_harvest": "Expected Harvest",
-        "total_duration": "Total Duration",
-        "growth_stages": "Growth Stages",
-        "activities": "Activities",
-        "fertilizer_schedule": "Fertilizer Schedule",
-        "area_acres": "Area (in acres)",
-        "add_crop_button": "Add Crop",
-        "add_reminder": "➕ Add Custom Reminder",
-        "reminder_title": "Reminder Title",
-        "reminder_date": "Reminder Date",
-        "description_optional": "Description (optional)",
-        "add_reminder_button": "Add Reminder",
-        "affects": "Affects",
-        "market_label": "Market"
-    },
-    "Hindi": {
-        "select_language": "🌐 भाषा चुनें",
-        "navigation": "नेविगेशन",
-        "ask_ai": "💬 AI से पूछें",
-        "weather_info": "🌦️ मौसम की जानकारी",
-        "schemes": "📢 योजनाएं",
-        "crop_advisory": "🌾 फसल सलाह",
-        "news_feed": "📰 समाचार",
-        "market_prices": "📈 बाजार मूल्य",
-        "farming_calendar": "📅 मेरा कैलेंडर",
-        "login": "🔐 लॉगिन/साइनअप",
-        "farming_assistant": "कृषि सहायक AI",
-        "ask_questions": "अपने कृषि संबंधी प्रश्न पूछें",
-        "type_question": "यहाँ अपना प्रश्न लिखें...",
-        "send": "📤 भेजें",
-        "voice_input": "🎤 वॉइस इनपुट - सीधे बोलें",
-        "record_voice": "अपना सवाल रिकॉर्ड करने के लिए क्लिक करें",
-        "upload_audio": "ऑडियो फ़ाइल अपलोड करें (WAV प्रारूप)",
-        "process_voice": "🎤 वॉइस प्रोसेस करें",
-        "disease_detection": "🔍 फसल रोग का पता लगाना",
-        "upload_image": "रोग विश्लेषण के लिए फसल की तस्वीर अपलोड करें",
-        "analyze": "विश्लेषण करें",
-        "logout": "लॉगआउट",
-        "weather_header": "🌦️ मौसम की जानकारी",
-        "temperature": "🌡️ तापमान",
-        "humidity": "💧 आर्द्रता",
-        "rainfall": "🌧️ वर्षा",
-        "wind_speed": "💨 हवा की गति",
-        "current_conditions": "वर्तमान स्थिति",
-        "weather": "मौसम",
-        "feels_like": "महसूस होता है",
-        "farming_advisory": "🧑‍🌾 कृषि सलाह",
-        "high_humidity": "⚠️ उच्च आर्द्रता का पता चला। फंगल रोगों के लिए फसलों की निगरानी करें।",
-        "high_temp": "🌡️ उच्च तापमान। पर्याप्त सिंचाई सुनिश्चित करें।",
-        "good_rainfall": "🌧️ अच्छी वर्षा। धान की खेती के लिए उपयुक्त।",
-        "schemes_header": "📢 सरकारी योजनाएं",
-        "available_schemes": "केरल के लिए उपलब्ध योजनाएं",
-        "description": "विवरण",
-        "eligibility": "पात्रता",
-        "benefits": "लाभ",
-        "how_to_apply": "आवेदन कैसे करें",
-        "deadline": "अंतिम तिथि",
-        "contact": "संपर्क",
-        "crop_advisory_header": "🌾 फसल सलाह प्रणाली",
-        "select_season": "वर्तमान मौसम चुनें",
-        "select_soil": "मिट्टी का प्रकार चुनें",
-        "get_recommendations": "फसल सिफारिशें प्राप्त करें",
-        "recommended_crops": "🌱 अनुशंसित फसलें",
-        "alternative_crops": "वैकल्पिक फसलें",
-        "farming_tips": "🧑‍🌾 कृषि युक्तियाँ",
-        "news_header": "📰 कृषि समाचार फ़ीड",
-        "source": "स्रोत",
-        "read_more": "और पढ़ें",
-        "market_header": "📈 बाजार मूल्य",
-        "live_prices": "📊 लाइव बाजार मूल्य",
-        "last_updated": "अंतिम अपडेट",
-        "market_insights": "💡 बाजार अंतर्दृष्टि",
-        "best_time_sell": "⏰ बेचने का सबसे अच्छा समय",
-        "select_crop": "फसल चुनें",
-        "best_months": "सबसे अच्छे महीने",
-        "reason": "कारण",
-        "advice": "सलाह",
-        "login_header": "🔐 लॉगिन / साइनअप",
-        "login_tab": "लॉगिन",
-        "signup_tab": "साइन अप",
-        "login_to_account": "अपने खाते में लॉगिन करें",
-        "mobile_number": "मोबाइल नंबर",
-        "password": "पासवर्ड",
-        "login_button": "लॉगिन",
-        "create_account": "नया खाता बनाएं",
-        "full_name": "पूरा नाम",
-        "location": "स्थान (गांव, जिला, राज्य)",
-        "confirm_password": "पासवर्ड की पुष्टि करें",
-        "signup_button": "साइन अप",
-        "calendar_header": "📅 मेरा कृषि कैलेंडर",
-        "my_crops": "🌾 मेरी फसलें",
-        "add_new_crop": "🌱 नई फसल जोड़ें",
-        "upcoming_tasks": "📋 आगामी कार्य (अगले 7 दिन)",
-        "planting_date": "रोपण तिथि",
-        "expected_harvest": "अपेक्षित फसल",
-        "total_duration": "कुल अवधि",
-        "growth_stages": "वृद्धि चरण",
-        "activities": "गतिविधियाँ",
-        "fertilizer_schedule": "उर्वरक अनुसूची",
-        "area_acres": "क्षेत्रफल (एकड़ में)",
-        "add_crop_button": "फसल जोड़ें",
-        "add_reminder": "➕ कस्टम रिमाइंडर जोड़ें",
-        "reminder_title": "रिमाइंडर शीर्षक",
-        "reminder_date": "रिमाइंडर तिथि",
-        "description_optional": "विवरण (वैकल्पिक)",
-        "add_reminder_button": "रिमाइंडर जोड़ें",
-        "affects": "प्रभावित करता है",
-        "market_label": "बाजार"
-    },
-    "Malayalam": {
-        "select_language": "🌐 ഭാഷ തിരഞ്ഞെടുക്കുക",
-        "navigation": "നാവിഗേഷൻ",
-        "ask_ai": "💬 AI യോട് ചോദിക്കുക",
-        "weather_info": "🌦️ കാലാവസ്ഥാ വിവരം",
-        "schemes": "📢 പദ്ധതികൾ",
-        "crop_advisory": "🌾 വിള ഉപദേശം",
-        "news_feed": "📰 വാർത്തകൾ",
-        "market_prices": "📈 വിപണി വില",
-        "farming_calendar": "📅 എന്റെ കലണ്ടർ",
-        "login": "🔐 ലോഗിൻ/സൈൻഅപ്പ്",
-        "farming_assistant": "കൃഷി സഹായി AI",
-        "ask_questions": "നിങ്ങളുടെ കൃഷി ചോദ്യങ്ങൾ ചോദിക്കുക",
-        "type_question": "ഇവിടെ നിങ്ങളുടെ ചോദ്യം ടൈപ്പ് ചെയ്യുക...",
-        "send": "📤 അയയ്ക്കുക",
-        "voice_input": "🎤 വോയ്സ് ഇൻപുട്ട് - നേരിട്ട് സംസാരിക്കുക",
-        "record_voice": "നിങ്ങളുടെ ചോദ്യം റെക്കോർഡ് ചെയ്യാൻ ക്ലിക്ക് ചെയ്യുക",
-        "upload_audio": "ഓഡിയോ ഫയൽ അപ്‌ലോഡ് ചെയ്യുക (WAV ഫോർമാറ്റ്)",
-        "process_voice": "🎤 വോയ്സ് പ്രോസസ് ചെയ്യുക",
-        "disease_detection": "🔍 വിള രോഗ കണ്ടെത്തൽ",
-        "upload_image": "രോഗ വിശകലനത്തിനായി വിള ചിത്രം അപ്‌ലോഡ് ചെയ്യുക",
-        "analyze": "വിശകലനം ചെയ്യുക",
-        "logout": "ലോഗൗട്ട്",
-        "weather_header": "🌦️ കാലാവസ്ഥാ വിവരം",
-        "temperature": "🌡️ ഊഷ്മാവ്",
-        "humidity": "💧 ഈർപ്പം",
-        "rainfall": "🌧️ മഴ",
-        "wind_speed": "💨 കാറ്റിന്റെ വേഗത",
-        "current_conditions": "നിലവിലെ അവസ്ഥ",
-        "weather": "കാലാവസ്ഥ",
-        "feels_like": "അനുഭവപ്പെടുന്നത്",
-        "farming_advisory": "🧑‍🌾 കൃഷി ഉപദേശം",
-        "high_humidity": "⚠️ ഉയർന്ന ഈർപ്പം കണ്ടെത്തി. ഫംഗൽ രോഗങ്ങൾക്കായി വിളകൾ നിരീക്ഷിക്കുക.",
-        "high_temp": "🌡️ ഉയർന്ന താപനില. മതിയായ ജലസേചനം ഉറപ്പാക്കുക.",
-        "good_rainfall": "🌧️ നല്ല മഴ. നെല്ല് കൃഷിക്ക് അനുയോജ്യം.",
-        "schemes_header": "📢 സർക്കാർ പദ്ധതികൾ",
-        "available_schemes": "കേരളത്തിനായി ലഭ്യമായ പദ്ധതികൾ",
-        "description": "വിവരണം",
-        "eligibility": "യോഗ്യത",
-        "benefits": "ആനുകൂല്യങ്ങൾ",
-        "how_to_apply": "എങ്ങനെ അപേക്ഷിക്കാം",
-        "deadline": "അവസാന തീയതി",
-        "contact": "ബന്ധപ്പെടുക",
-        "crop_advisory_header": "🌾 വിള ഉപദേശ സംവിധാനം",
-        "select_season": "നിലവിലെ സീസൺ തിരഞ്ഞെടുക്കുക",
-        "select_soil": "മണ്ണിന്റെ തരം തിരഞ്ഞെടുക്കുക",
-        "get_recommendations": "വിള ശുപാർശകൾ നേടുക",
-        "recommended_crops": "🌱 ശുപാർശ ചെയ്ത വിളകൾ",
-        "alternative_crops": "ബദൽ വിളകൾ",
-        "farming_tips": "🧑‍🌾 കൃഷി നുറുങ്ങുകൾ",
-        "news_header": "📰 കാർഷിക വാർത്താ ഫീഡ്",
-        "source": "ഉറവിടം",
-        "read_more": "കൂടുതൽ വായിക്കുക",
-        "market_header": "📈 മാർക്കറ്റ് വിലകൾ",
-        "live_prices": "📊 തത്സമയ വിപണി വിലകൾ",
-        "last_updated": "അവസാനം അപ്ഡേറ്റ് ചെയ്തത്",
-        "market_insights": "💡 വിപണി സ്ഥിതിവിവരങ്ങൾ",
-        "best_time_sell": "⏰ വിൽക്കാനുള്ള മികച്ച സമയം",
-        "select_crop": "വിള തിരഞ്ഞെടുക്കുക",
-        "best_months": "മികച്ച മാസങ്ങൾ",
-        "reason": "കാരണം",
-        "advice": "ഉപദേശം",
-        "login_header": "🔐 ലോഗിൻ / സൈൻഅപ്പ്",
-        "login_tab": "ലോഗിൻ",
-        "signup_tab": "സൈൻ അപ്പ്",
-        "login_to_account": "നിങ്ങളുടെ അക്കൗണ്ടിലേക്ക് ലോഗിൻ ചെയ്യുക",
-        "mobile_number": "മൊബൈൽ നമ്പർ",
-        "password": "പാസ്‌വേഡ്",
-        "login_button": "ലോഗിൻ",
-        "create_account": "പുതിയ അക്കൗണ്ട് സൃഷ്ടിക്കുക",
-        "full_name": "പൂർണ്ണ നാമം",
-        "location": "സ്ഥലം (ഗ്രാമം, ജില്ല, സംസ്ഥാനം)",
-        "confirm_password": "പാസ്‌വേഡ് സ്ഥിരീകരിക്കുക",
-        "signup_button": "സൈൻ അപ്പ്",
-        "calendar_header": "📅 എന്റെ കാർഷിക കലണ്ടർ",
-        "my_crops": "🌾 എന്റെ വിളകൾ",
-        "add_new_crop": "🌱 പുതിയ വിള ചേർക്കുക",
-        "upcoming_tasks": "📋 വരാനിരിക്കുന്ന ചുമതലകൾ (അടുത്ത 7 ദിവസം)",
-        "planting_date": "നടീൽ തീയതി",
-        "expected_harvest": "പ്രതീക്ഷിക്കുന്ന വിളവെടുപ്പ്",
-        "total_duration": "മൊത്തം ദൈർഘ്യം",
-        "growth_stages": "വളർച്ചാ ഘട്ടങ്ങൾ",
-        "activities": "പ്രവർത്തനങ്ങൾ",
-        "fertilizer_schedule": "വളം ഷെഡ്യൂൾ",
-        "area_acres": "വിസ്തീർണ്ണം (ഏക്കറിൽ)",
-        "add_crop_button": "വിള ചേർക്കുക",
-        "add_reminder": "➕ കസ്റ്റം റിമൈൻഡർ ചേർക്കുക",
-        "reminder_title": "റിമൈൻഡർ ശീർഷകം",
-        "reminder_date": "റിമൈൻഡർ തീയതി",
-        "description_optional": "വിവരണം (ഓപ്ഷണൽ)",
-        "add_reminder_button": "റിമൈൻഡർ ചേർക്കുക",
-        "affects": "ബാധിക്കുന്നത്",
-        "market_label": "വിപണി"
-    },
-    "Marathi": {
-        "select_language": "🌐 भाषा निवडा",
-        "navigation": "नेव्हिगेशन",
-        "ask_ai": "💬 AI ला विचारा",
-        "weather_info": "🌦️ हवामान माहिती",
-        "schemes": "📢 योजना",
-        "crop_advisory": "🌾 पीक सल्ला",
-        "news_feed": "📰 बातम्या",
-        "market_prices": "📈 बाजार किंमत",
-        "farming_calendar": "📅 माझे कॅलेंडर",
-        "login": "🔐 लॉगिन/साइनअप",
-        "farming_assistant": "शेती सहाय्यक AI",
-        "ask_questions": "तुमचे शेती प्रश्न विचारा",
-        "type_question": "येथे तुमचा प्रश्न टाइप करा...",
-        "send": "📤 पाठवा",
-        "voice_input": "🎤 व्हॉइस इनपुट - थेट बोला",
-        "record_voice": "तुमचा प्रश्न रेकॉर्ड करण्यासाठी क्लिक करा",
-        "upload_audio": "ऑडिओ फाइल अपलोड करा (WAV स्वरूप)",
-        "process_voice": "🎤 व्हॉइस प्रोसेस करा",
-        "disease_detection": "🔍 पीक रोग शोध",
-        "upload_image": "रोग विश्लेषणासाठी पीक प्रतिमा अपलोड करा",
-        "analyze": "विश्लेषण करा",
-        "logout": "लॉगआउट",
-        "weather_header": "🌦️ हवामान माहिती",
-        "temperature": "🌡️ तापमान",
-        "humidity": "💧 आर्द्रता",
-        "rainfall": "🌧️ पाऊस",
-        "wind_speed": "💨 वाऱ्याचा वेग",
-        "current_conditions": "सध्याची परिस्थिती",
-        "weather": "हवामान",
-        "feels_like": "जाणवते",
-        "farming_advisory": "🧑‍🌾 शेती सल्ला",
-        "high_humidity": "⚠️ उच्च आर्द्रता आढळली. बुरशीजन्य रोगांसाठी पिकांचे निरीक्षण करा.",
-        "high_temp": "🌡️ उच्च तापमान. पुरेसे सिंचन सुनिश्चित करा.",
-        "good_rainfall": "🌧️ चांगला पाऊस. तांदूळ लागवडीसाठी योग्य.",
-        "schemes_header": "📢 सरकारी योजना",
-        "available_schemes": "केरळसाठी उपलब्ध योजना",
-        "description": "वर्णन",
-        "eligibility": "पात्रता",
-        "benefits": "फायदे",
-        "how_to_apply": "अर्ज कसा करावा",
-        "deadline": "अंतिम तारीख",
-        "contact": "संपर्क",
-        "crop_advisory_header": "🌾 पीक सल्ला प्रणाली",
-        "select_season": "सध्याचा हंगाम निवडा",
-        "select_soil": "मातीचा प्रकार निवडा",
-        "get_recommendations": "पीक शिफारसी मिळवा",
-        "recommended_crops": "🌱 शिफारस केलेली पिके",
-        "alternative_crops": "पर्यायी पिके",
-        "farming_tips": "🧑‍🌾 शेती टिपा",
-        "news_header": "📰 कृषी बातम्या फीड",
-        "source": "स्रोत",
-        "read_more": "अधिक वाचा",
-        "market_header": "📈 बाजार किंमत",
-        "live_prices": "📊 थेट बाजार किंमत",
-        "last_updated": "शेवटचे अपडेट",
-        "market_insights": "💡 बाजार अंतर्दृष्टी",
-        "best_time_sell": "⏰ विक्रीसाठी सर्वोत्तम वेळ",
-        "select_crop": "पीक निवडा",
-        "best_months": "सर्वोत्तम महिने",
-        "reason": "कारण",
-        "advice": "सल्ला",
-        "login_header": "🔐 लॉगिन / साइनअप",
-        "login_tab": "लॉगिन",
-        "signup_tab": "साइन अप",
-        "login_to_account": "तुमच्या खात्यात लॉगिन करा",
-        "mobile_number": "मोबाइल नंबर",
-        "password": "पासवर्ड",
-        "login_button": "लॉगिन",
-        "create_account": "नवीन खाते तयार करा",
-        "full_name": "पूर्ण नाव",
-        "location": "स्थान (गाव, जिल्हा, राज्य)",
-        "confirm_password": "पासवर्ड पुष्टी करा",
-        "signup_button": "साइन अप",
-        "calendar_header": "📅 माझे शेती कॅलेंडर",
-        "my_crops": "🌾 माझी पिके",
-        "add_new_crop": "🌱 नवीन पीक जोडा",
-        "upcoming_tasks": "📋 आगामी कार्ये (पुढील 7 दिवस)",
-        "planting_date": "लागवड तारीख",
-        "expected_harvest": "अपेक्षित कापणी",
-        "total_duration": "एकूण कालावधी",
-        "growth_stages": "वाढीचे टप्पे",
-        "activities": "क्रियाकलाप",
-        "fertilizer_schedule": "खत वेळापत्रक",
-        "area_acres": "क्षेत्रफळ (एकरमध्ये)",
-        "add_crop_button": "पीक जोडा",
-        "add_reminder": "➕ सानुकूल रिमाइंडर जोडा",
-        "reminder_title": "रिमाइंडर शीर्षक",
-        "reminder_date": "रिमाइंडर तारीख",
-        "description_optional": "वर्णन (पर्यायी)",
-        "add_reminder_button": "रिमाइंडर जोडा",
-        "affects": "प्रभावित करते",
-        "market_label": "बाजार"
-    }
-}
+# Language selector and UI translations (locales/*.json, loaded once per process)
+catalog = get_catalog()
+languages = catalog.codes
 
 current_lang = st.selectbox(
-    ui_translations[st.session_state.language]["select_language"] + " / Select Language / भाषा चुनें / ഭാഷ തിരഞ്ഞെടുക്കുക / भाषा निवडा",
-    options=list(languages.keys()),
-    index=list(languages.keys()).index(st.session_state.language)
+    catalog.messages(st.session_state.language)["select_language"] + " / Select Language / भाषा चुनें / ഭാഷ തിരഞ്ഞെടുക്കുക / भाषा निवडा",
+    options=catalog.names,
+    index=catalog.names.index(st.session_state.language)
 )
 
 if current_lang != st.session_state.language:
@@ -475,57 +99,39 @@ if current_lang != st.session_state.language:
     st.rerun()
 
 # Get current language translations
-t = ui_translations[st.session_state.language]
-
-# Sidebar navigation
-st.sidebar.title(t["navigation"])
-
-# Login/Logout button
-if st.session_state.authenticated:
-    if st.sidebar.button(f"👤 {st.session_state.user_data['name']} - {t['logout']}", key="logout_btn"):
-        st.session_state.authenticated = False
-        st.session_state.user_mobile = None
-        st.session_state.user_data = None
-        st.session_state.current_section = "Ask AI"
-        st.rerun()
-else:
-    if st.sidebar.button(t["login"], key="login_btn"):
-        st.session_state.current_section = "Login"
-
-st.sidebar.divider()
-
-# Main sections
-sections = [
-    (t["ask_ai"], "Ask AI"),
-    (t["weather_info"], "Weather Info"),
-    (t["schemes"], "Schemes"),
-    (t["crop_advisory"], "Crop Advisory"),
-    (t["news_feed"], "News Feed"),
-    (t["market_prices"], "Market Prices"),
-]
-
-# Add authenticated-only sections
-if st.session_state.authenticated:
-    sections.append((t["farming_calendar"], "Farming Calendar"))
+t = catalog.messages(st.session_state.language)
 
-for display_name, section_key in sections:
-    if st.sidebar.button(display_name, key=section_key):
-        st.session_state.current_section = section_key
 
-# Main content area
-if st.session_state.current_section == "Ask AI":
+def render_ask_ai(t):
+    """Chat with the assistant and crop disease detection from a photo"""
     st.header(t["farming_assistant"])
     
     # Chat interface
     st.subheader(t["ask_questions"])
     
-    # Display chat history
-    for chat in st.session_state.chat_history:
+    # Display one page of the chat history, newest page first
+    memory = st.session_state.chat_memory
+    chat_page_size = int(os.getenv("CHAT_PAGE_SIZE", "5"))
+    chat_page = min(st.session_state.get("chat_page", 0), memory.page_count(chat_page_size) - 1)
+    if memory.total_turns > len(memory.history) and chat_page == memory.page_count(chat_page_size) - 1:
+        st.caption(f"{memory.total_turns - len(memory.history)} earlier questions are no longer shown")
+    for chat in memory.page(chat_page, chat_page_size):
         with st.container():
             st.markdown(f"**You:** {chat['question']}")
             st.markdown(f"**Krishi Mitra:** {chat['answer']}")
             st.divider()
     
+    if memory.page_count(chat_page_size) > 1:
+        col1, col2 = st.columns(2)
+        with col1:
+            if chat_page + 1 < memory.page_count(chat_page_size) and st.button("⬅️ Older", key="chat_older"):
+                st.session_state.chat_page = chat_page + 1
+                st.rerun()
+        with col2:
+            if chat_page > 0 and st.button("Newer ➡️", key="chat_newer"):
+                st.session_state.chat_page = chat_page - 1
+                st.rerun()
+    
     # Language code mapping for speech recognition
     speech_lang_codes = {
         "English": "en-IN",
@@ -570,17 +176,21 @@ if st.session_state.current_section == "Ask AI":
     
     if st.button(t["send"]):
         if user_query:
-            with st.spinner("Getting AI response..."):
-                try:
-                    response = ask_gemini(user_query, languages[st.session_state.language])
-                    st.session_state.chat_history.append({
-                        "question": user_query,
-                        "answer": response
-                    })
-                    st.session_state.voice_query = ""
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Error getting AI response: {str(e)}")
+            try:
+                # Stream the answer so the first words show up as soon as they arrive
+                st.markdown(f"**You:** {user_query}")
+                st.markdown("**Krishi Mitra:**")
+                # Recent turns go verbatim, older ones as a rolling summary
+                summary, recent_turns = memory.context()
+                response = st.write_stream(ask_gemini_stream(
+                    user_query, languages[st.session_state.language], history=recent_turns, summary=summary
+                ))
+                memory.add(user_query, response)
+                st.session_state.chat_page = 0
+                st.session_state.voice_query = ""
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error getting AI response: {str(e)}")
     
     # Image upload for disease detection
     st.subheader(t["disease_detection"])
@@ -592,28 +202,28 @@ if st.session_state.current_section == "Ask AI":
         if st.button(t["analyze"]):
             with st.spinner("Analyzing image..."):
                 try:
-                    # Save uploaded file temporarily
-                    with open("temp_image.jpg", "wb") as f:
-                        f.write(uploaded_file.getvalue())
-                    
-                    analysis = analyze_image_for_disease("temp_image.jpg", languages[st.session_state.language])
+                    analysis = analyze_image_bytes_for_disease(uploaded_file.getvalue(), languages[st.session_state.language])
                     st.success("Analysis Complete!")
                     st.write(analysis)
                     
-                    # Clean up temp file
-                    if os.path.exists("temp_image.jpg"):
-                        os.remove("temp_image.jpg")
-                        
                 except Exception as e:
                     st.error(f"Error analyzing image: {str(e)}")
 
-elif st.session_state.current_section == "Weather Info":
+
+def render_weather(t):
+    """Current weather for the user's location with farming advisories"""
+    from utils.weather_service import get_current_weather, get_user_weather_location
+    
     st.header(t["weather_header"])
     
-    location = "Palakkad,Kerala,IN"
+    location = get_user_weather_location(st.session_state.user_data if st.session_state.authenticated else None)
     
     try:
-        weather_data = get_weather_data(location)
+        # Read through the shared weather cache, which the background feed
+        # keeps fresh; only a location nobody has asked for yet is fetched
+        # inline, joining the feed's request for it
+        get_refresher().track('weather', location)
+        weather_data = get_current_weather(location)
         
         if weather_data:
             col1, col2, col3, col4 = st.columns(4)
@@ -658,34 +268,80 @@ elif st.session_state.current_section == "Weather Info":
                 st.warning(t["high_temp"])
             if weather_data.get('rainfall', 0) > 10:
                 st.info(t["good_rainfall"])
+            
+            advisory = section_data.forecast_advisory(location)
+            if advisory:
+                st.subheader(t["forecast_advisory"])
+                tr = section_data.translations(
+                    [message for day in advisory['daily'] for message in day['advisories']],
+                    languages[st.session_state.language]
+                )
+                for day in advisory['daily']:
+                    st.write(
+                        f"**{datetime.strptime(day['date'], '%Y-%m-%d').strftime('%a %d %b')}** "
+                        f"({day['temp_min']:.0f}–{day['temp_max']:.0f}°C, {day['rain_total']} mm): "
+                        + ' '.join(tr.get(message, message) for message in day['advisories'])
+                    )
+                for label, windows in ((t["heat_stress_windows"], advisory['heat_stress_windows']),
+                                       (t["fungal_risk_windows"], advisory['fungal_risk_windows'])):
+                    if windows:
+                        st.warning(f"{label}: " + ', '.join(
+                            f"{datetime.fromtimestamp(start).strftime('%d %b %H:%M')} – "
+                            f"{datetime.fromtimestamp(end).strftime('%d %b %H:%M')}"
+                            for start, end in windows
+                        ))
+        elif get_refresher().last_error('weather', location):
+            st.error(f"Unable to fetch weather data: {get_refresher().last_error('weather', location)}")
         else:
-            st.error("Unable to fetch weather data. Please check your internet connection.")
+            st.error("Weather data is not available for your location right now. Please try again later.")
             
     except Exception as e:
         st.error(f"Error fetching weather data: {str(e)}")
 
-elif st.session_state.current_section == "Schemes":
+
+def render_schemes(t):
+    """Government schemes for the user's state, deadlines and eligibility"""
+    from utils.schemes import state_from_location
+    
     st.header(t["schemes_header"])
     
     try:
-        with open('schemes.json', 'r', encoding='utf-8') as f:
-            schemes_data = json.load(f)
+        # Schemes for the user's state (from their registered location), Kerala otherwise
+        user_state = None
+        user_data = None
+        if st.session_state.authenticated and st.session_state.user_data:
+            user_data = st.session_state.user_data
+            user_state = state_from_location(user_data.get('location'))
+        user_state = user_state or "Kerala"
+        state_schemes, upcoming, eligible_ids = section_data.scheme_view(user_state, user_data)
         
-        # Filter schemes for Kerala
-        kerala_schemes = [scheme for scheme in schemes_data['schemes'] 
-                         if 'Kerala' in scheme.get('applicable_states', []) or 'All States' in scheme.get('applicable_states', [])]
+        # Scheme text in the selected language
+        fields = ('title', 'description', 'eligibility', 'benefits', 'how_to_apply', 'deadline')
+        tr = section_data.translations(
+            [scheme.get(field) for scheme in state_schemes for field in fields]
+            + [scheme['title'] for _, scheme in upcoming],
+            languages[st.session_state.language]
+        )
+        
+        if upcoming:
+            st.subheader(t["upcoming_deadlines"])
+            for deadline, scheme in upcoming:
+                st.warning(f"**{deadline.strftime('%d %b %Y')}** - {tr.get(scheme['title'], scheme['title'])}")
         
-        st.subheader(f"{t['available_schemes']} ({len(kerala_schemes)} schemes)")
+        st.subheader(f"{t['available_schemes']} ({len(state_schemes)} schemes)")
         
-        for scheme in kerala_schemes:
-            with st.expander(f"🎯 {scheme['title']}"):
-                st.write(f"**{t['description']}:** {scheme['description']}")
-                st.write(f"**{t['eligibility']}:** {scheme['eligibility']}")
-                st.write(f"**{t['benefits']}:** {scheme['benefits']}")
-                st.write(f"**{t['how_to_apply']}:** {scheme['how_to_apply']}")
+        for scheme in state_schemes:
+            marker = "✅" if scheme['id'] in eligible_ids else "🎯"
+            with st.expander(f"{marker} {tr.get(scheme['title'], scheme['title'])}"):
+                if scheme['id'] in eligible_ids:
+                    st.success(t["eligible_for_you"])
+                st.write(f"**{t['description']}:** {tr.get(scheme['description'], scheme['description'])}")
+                st.write(f"**{t['eligibility']}:** {tr.get(scheme['eligibility'], scheme['eligibility'])}")
+                st.write(f"**{t['benefits']}:** {tr.get(scheme['benefits'], scheme['benefits'])}")
+                st.write(f"**{t['how_to_apply']}:** {tr.get(scheme['how_to_apply'], scheme['how_to_apply'])}")
                 
                 if scheme.get('deadline'):
-                    st.write(f"**{t['deadline']}:** {scheme['deadline']}")
+                    st.write(f"**{t['deadline']}:** {tr.get(scheme['deadline'], scheme['deadline'])}")
                 
                 if scheme.get('contact_info'):
                     st.write(f"**{t['contact']}:** {scheme['contact_info']}")
@@ -695,7 +351,9 @@ elif st.session_state.current_section == "Schemes":
     except Exception as e:
         st.error(f"Error loading schemes: {str(e)}")
 
-elif st.session_state.current_section == "Crop Advisory":
+
+def render_crop_advisory(t):
+    """Crop recommendations for a season and soil type"""
     st.header(t["crop_advisory_header"])
     
     col1, col2 = st.columns(2)
@@ -713,7 +371,13 @@ elif st.session_state.current_section == "Crop Advisory":
         )
     
     if st.button(t["get_recommendations"]):
-        recommendations = get_crop_recommendation(season, soil_type, "Kerala")
+        from utils.schemes import state_from_location
+        
+        # Recommend for the user's state (from their registered location), Kerala otherwise
+        user_state = None
+        if st.session_state.authenticated and st.session_state.user_data:
+            user_state = state_from_location(st.session_state.user_data.get('location'))
+        recommendations = section_data.crop_recommendation(season, soil_type, user_state or "Kerala")
         
         st.subheader(t["recommended_crops"])
         
@@ -727,20 +391,31 @@ elif st.session_state.current_section == "Crop Advisory":
         
         # Additional tips
         st.subheader(t["farming_tips"])
+        tr = section_data.translations(recommendations['tips'], languages[st.session_state.language])
         for tip in recommendations['tips']:
-            st.write(f"• {tip}")
+            st.write(f"• {tr.get(tip, tip)}")
 
-elif st.session_state.current_section == "News Feed":
+
+def render_news(t):
+    """Paged agriculture news from the local store"""
     st.header(t["news_header"])
     
     try:
-        news_items = get_agriculture_news()
+        # Articles are fetched into the local store in the background, so
+        # this only reads from disk
+        get_refresher().track('news', 'all')
+        news_page = st.session_state.get('news_page', 0)
+        news_items, page_count = section_data.news_page(news_page)
         
         if news_items:
+            tr = section_data.translations(
+                [text for news in news_items for text in (news['title'], news['description'])],
+                languages[st.session_state.language]
+            )
             for news in news_items:
                 with st.container():
-                    st.subheader(news['title'])
-                    st.write(news['description'])
+                    st.subheader(tr.get(news['title'], news['title']))
+                    st.write(tr.get(news['description'], news['description']))
                     
                     col1, col2 = st.columns([3, 1])
                     with col1:
@@ -750,13 +425,25 @@ elif st.session_state.current_section == "News Feed":
                             st.markdown(f"[{t['read_more']}]({news['url']})")
                     
                     st.divider()
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if news_page > 0 and st.button("⬅️ Newer", key="news_newer"):
+                    st.session_state.news_page = news_page - 1
+                    st.rerun()
+            with col2:
+                if news_page + 1 < page_count and st.button("Older ➡️", key="news_older"):
+                    st.session_state.news_page = news_page + 1
+                    st.rerun()
         else:
             st.info("No news items available at the moment. Please check back later.")
             
     except Exception as e:
         st.error(f"Error loading news: {str(e)}")
 
-elif st.session_state.current_section == "Login":
+
+def render_login(t):
+    """Login and signup forms"""
     st.header(t["login_header"])
     
     tab1, tab2 = st.tabs([t["login_tab"], t["signup_tab"]])
@@ -802,33 +489,35 @@ elif st.session_state.current_section == "Login":
             else:
                 st.warning("Please fill all fields")
 
-elif st.session_state.current_section == "Market Prices":
+
+def render_market_prices(t):
+    """Mandi prices, market insights and best selling time"""
     st.header(t["market_header"])
     
     try:
-        market_data = get_market_prices("Kerala")
+        # Shared, read-only snapshot published by the background refresher
+        market_data, insights = section_data.market_view("Kerala")
         
-        st.subheader(f"{t['live_prices']} - {market_data['state']}")
-        st.caption(f"{t['last_updated']}: {market_data['last_updated']}")
+        st.subheader(f"{t['live_prices']} - {market_data.state}")
+        st.caption(f"{t['last_updated']}: {market_data.last_updated}")
         
         # Display prices in cards
         cols = st.columns(3)
-        for idx, (crop_name, crop_data) in enumerate(market_data['prices'].items()):
+        for idx, (crop_name, crop_data) in enumerate(market_data.prices.items()):
             with cols[idx % 3]:
-                trend_emoji = "📈" if crop_data['trend'] == 'up' else ("📉" if crop_data['trend'] == 'down' else "➡️")
+                trend_emoji = "📈" if crop_data.trend == 'up' else ("📉" if crop_data.trend == 'down' else "➡️")
                 
                 st.metric(
                     label=f"{trend_emoji} {crop_name}",
-                    value=f"₹{crop_data['modal_price']} / {crop_data['unit']}",
-                    delta=crop_data['change']
+                    value=f"₹{crop_data.modal_price} / {crop_data.unit}",
+                    delta=crop_data.change
                 )
-                st.caption(f"{t['market_label']}: {crop_data['market']}")
+                st.caption(f"{t['market_label']}: {crop_data.market}")
         
         st.divider()
         
         # Market Insights
         st.subheader(t["market_insights"])
-        insights = get_market_insights("Kerala")
         
         for insight in insights:
             impact_color = "green" if insight['impact'] == 'positive' else ("red" if insight['impact'] == 'negative' else "blue")
@@ -839,10 +528,10 @@ elif st.session_state.current_section == "Market Prices":
         
         # Best Selling Time
         st.subheader(t["best_time_sell"])
-        selected_crop = st.selectbox(t["select_crop"], list(market_data['prices'].keys()))
+        selected_crop = st.selectbox(t["select_crop"], list(market_data.prices.keys()))
         
         if selected_crop:
-            selling_advice = get_best_selling_time(selected_crop)
+            selling_advice = section_data.selling_advice(selected_crop, "Kerala")
             st.info(f"**{t['best_months']}:** {selling_advice['best_months']}")
             st.write(f"**{t['reason']}:** {selling_advice['reason']}")
             st.success(f"**{t['advice']}:** {selling_advice['advice']}")
@@ -850,7 +539,11 @@ elif st.session_state.current_section == "Market Prices":
     except Exception as e:
         st.error(f"Error loading market prices: {str(e)}")
 
-elif st.session_state.current_section == "Farming Calendar":
+
+def render_farming_calendar(t):
+    """The user's crops, upcoming tasks and reminders"""
+    from utils.farming_calendar import get_crop_calendar, add_crop_to_user, add_reminder
+    
     if not st.session_state.authenticated:
         st.warning("Please login to access your farming calendar")
         st.stop()
@@ -904,6 +597,7 @@ elif st.session_state.current_section == "Farming Calendar":
                 area_acres
             )
             if success:
+                section_data.invalidate_user_tasks()
                 st.session_state.user_data = get_user_data(st.session_state.user_mobile)
                 st.success(f"{crop_name} added successfully!")
                 st.rerun()
@@ -913,7 +607,7 @@ elif st.session_state.current_section == "Farming Calendar":
     with tab3:
         st.subheader(t["upcoming_tasks"])
         
-        upcoming = get_upcoming_tasks(st.session_state.user_mobile, days=7)
+        upcoming = section_data.upcoming_tasks(st.session_state.user_mobile, days=7)
         
         if upcoming:
             for task in upcoming:
@@ -949,10 +643,94 @@ elif st.session_state.current_section == "Farming Calendar":
                     }
                 )
                 if success:
+                    section_data.invalidate_user_tasks()
                     st.session_state.user_data = get_user_data(st.session_state.user_mobile)
                     st.success("Reminder added!")
                     st.rerun()
 
+
+def render_search(t):
+    """Full-text search across schemes, news, tips and calendars"""
+    st.header(t["search"])
+    st.caption(t["search_header"])
+    
+    search_query = st.text_input(t["search"], placeholder=t["search_placeholder"], label_visibility="collapsed")
+    
+    if search_query:
+        try:
+            kind_labels = {
+                'scheme': t["schemes"],
+                'news': t["news_feed"],
+                'tip': t["farming_tips"],
+                'calendar': t["farming_calendar"],
+            }
+            results = section_data.search_results(search_query)
+            
+            if results:
+                for result in results:
+                    with st.container():
+                        st.markdown(f"**{result['title']}**")
+                        st.caption(kind_labels.get(result['kind'], result['kind']))
+                        if result['snippet']:
+                            st.markdown(result['snippet'])
+                        if result.get('url'):
+                            st.markdown(f"[{t['read_more']}]({result['url']})")
+                        st.divider()
+            else:
+                st.info(t["no_results"])
+        
+        except Exception as e:
+            st.error(f"Error searching: {str(e)}")
+
+# Section registry: key -> (sidebar label key, render function, login required).
+# Sidebar order follows this order; Login is reached from its own button.
+SECTIONS = {
+    "Ask AI": ("ask_ai", render_ask_ai, False),
+    "Weather Info": ("weather_info", render_weather, False),
+    "Schemes": ("schemes", render_schemes, False),
+    "Crop Advisory": ("crop_advisory", render_crop_advisory, False),
+    "News Feed": ("news_feed", render_news, False),
+    "Market Prices": ("market_prices", render_market_prices, False),
+    "Search": ("search", render_search, False),
+    "Farming Calendar": ("farming_calendar", render_farming_calendar, True),
+    "Login": (None, render_login, False),
+}
+
+# Sidebar navigation
+st.sidebar.title(t["navigation"])
+
+# Login/Logout button
+if st.session_state.authenticated:
+    if st.sidebar.button(f"👤 {st.session_state.user_data['name']} - {t['logout']}", key="logout_btn"):
+        st.session_state.authenticated = False
+        st.session_state.user_mobile = None
+        st.session_state.user_data = None
+        st.session_state.current_section = "Ask AI"
+        st.rerun()
+else:
+    if st.sidebar.button(t["login"], key="login_btn"):
+        st.session_state.current_section = "Login"
+
+st.sidebar.divider()
+
+# Main sections, authenticated-only ones when logged in
+for section_key, (label_key, _, requires_login) in SECTIONS.items():
+    if label_key is None or (requires_login and not st.session_state.authenticated):
+        continue
+    if st.sidebar.button(t[label_key], key=section_key):
+        st.session_state.current_section = section_key
+
+# Main content area
+if st.session_state.current_section not in SECTIONS:
+    st.session_state.current_section = "Ask AI"
+section_key = st.session_state.current_section
+render_start = time.perf_counter()
+try:
+    SECTIONS[section_key][1](t)
+finally:
+    # Also recorded when the section stops or reruns the script
+    st.session_state.render_times[section_key] = (time.perf_counter() - render_start) * 1000
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -961,3 +739,15 @@ st.markdown("""
     <p>For support, contact: krishimitra@support.gov.in</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Debug overlay: per-section render times, enabled with ?debug=1 or DEBUG_OVERLAY=1
+if st.query_params.get("debug") == "1" or os.getenv("DEBUG_OVERLAY") == "1":
+    from utils.lazy_imports import LOAD_TIMES
+    
+    with st.sidebar.expander("⏱️ Render times", expanded=True):
+        st.caption(f"Script run: {(time.perf_counter() - script_start) * 1000:.0f} ms")
+        for name, ms in sorted(st.session_state.render_times.items(), key=lambda item: -item[1]):
+            marker = "▶ " if name == section_key else ""
+            st.write(f"{marker}{name}: {ms:.1f} ms")
+        for module, seconds in LOAD_TIMES.items():
+            st.caption(f"Lazy import {module}: {seconds * 1000:.0f} ms")
@@ -0,0 +1,59 @@
+import pytest
+
+from utils import auth_helper, event_index, user_store
+from utils.user_store import JSONUserStore, SQLiteUserStore
+
+CROP = {'name': 'Rice (Paddy)', 'planting_date': '2026-06-01', 'area_acres': 1.0, 'added_at': '2026-06-01T09:00:00'}
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def store(request, tmp_path, monkeypatch):
+    if request.param == 'sqlite':
+        store = SQLiteUserStore(str(tmp_path / 'users.db'), legacy_json_path=None)
+    else:
+        store = JSONUserStore(str(tmp_path / 'users.json'))
+    store.create({'name': 'Asha', 'location': 'Thrissur, Kerala', 'mobile': '9000000001', 'password': 'x'})
+    monkeypatch.setattr(user_store, '_store', store)
+    monkeypatch.setenv('EVENTS_DB_PATH', str(tmp_path / 'events.db'))
+    monkeypatch.setattr(event_index, '_index', None)
+    return store
+
+
+def test_incremental_write_keeps_index_in_step(store):
+    index = event_index.get_event_index()
+    assert index.source_version() == store.store_version()
+    auth_helper.add_user_crop('9000000001', CROP)
+    assert index.source_version() == store.store_version()
+    assert index.count() > 0
+
+
+def test_store_change_without_the_index_triggers_rebuild(store):
+    index = event_index.get_event_index()
+    store.add_crop('9000000001', CROP)  # e.g. another process, or a failed index write
+    assert index.count() == 0
+    assert event_index.get_current_event_index().count() > 0
+    assert index.source_version() == store.store_version()
+
+
+def test_failed_index_write_is_repaired_on_next_read(store, monkeypatch):
+    index = event_index.get_event_index()
+
+    def failing_add_crop(*args):
+        raise OSError('disk full')
+    with monkeypatch.context() as patch:
+        patch.setattr(index, 'add_crop', failing_add_crop)
+        # The crop is saved, so the farmer doesn't see the index failure
+        assert auth_helper.add_user_crop('9000000001', CROP)
+    assert index.count() == 0
+    assert event_index.get_current_event_index().count() > 0
+
+
+def test_writes_without_events_move_the_index_without_a_rebuild(store, monkeypatch):
+    index = event_index.get_event_index()
+    rebuilds = []
+    monkeypatch.setattr(index, 'rebuild', lambda *args: rebuilds.append(args))
+    assert auth_helper.register_user('Ravi', 'Palakkad, Kerala', '9000000002', 'secret')[0]
+    assert auth_helper.update_user_data('9000000002', {'location': 'Thrissur, Kerala'})
+    event_index.get_current_event_index()
+    assert rebuilds == []
+    assert index.source_version() == store.store_version()
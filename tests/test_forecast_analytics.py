@@ -0,0 +1,82 @@
+import itertools
+
+from utils.forecast_analytics import ForecastFrame, build_advisories, precompute_district_advisories
+from utils.weather_helper import get_farming_weather_advisory
+
+DAY = 86400
+START = 1788220800 - 19800  # local (IST) midnight
+
+
+def legacy_advisory(weather_data):
+    """The per-value checks get_farming_weather_advisory made before the vectorized engine"""
+    advisories = []
+    if weather_data['temperature'] > 35:
+        advisories.append("🌡️ High temperature detected. Increase irrigation frequency and provide shade for sensitive crops.")
+    if weather_data['temperature'] < 10:
+        advisories.append("🥶 Low temperature warning. Protect crops from frost damage.")
+    if weather_data['humidity'] > 85:
+        advisories.append("💧 High humidity levels. Monitor for fungal diseases and improve air circulation.")
+    if weather_data['humidity'] < 30:
+        advisories.append("🏜️ Low humidity. Increase irrigation and consider mulching.")
+    if weather_data['rainfall'] > 50:
+        advisories.append("🌧️ Heavy rainfall expected. Ensure proper drainage and harvest ready crops.")
+    if weather_data['wind_speed'] > 25:
+        advisories.append("💨 Strong winds expected. Secure tall crops and protect seedlings.")
+    if not advisories:
+        advisories.append("🌱 Weather conditions are favorable for normal farming activities.")
+    return advisories
+
+
+CONDITIONS = [
+    {'temperature': temperature, 'humidity': humidity, 'rainfall': rainfall, 'wind_speed': wind_speed}
+    for temperature, humidity, rainfall, wind_speed
+    in itertools.product([5, 10, 28, 35, 38], [20, 30, 60, 85, 92], [0, 50, 70], [10, 25, 40])
+]
+
+
+def payload(days):
+    """OpenWeatherMap /forecast response: each day's eight 3-hourly slots share that day's conditions"""
+    return {
+        'city': {'timezone': 19800},
+        'list': [
+            {'dt': START + day * DAY + slot * 10800,
+             'main': {'temp': conditions['temperature'], 'humidity': conditions['humidity']},
+             'rain': {'3h': conditions['rainfall'] / 8},
+             'wind': {'speed': conditions['wind_speed'] / 3.6}}
+            for day, conditions in enumerate(days) for slot in range(8)
+        ],
+    }
+
+
+def test_current_conditions_match_the_legacy_rules():
+    for conditions in CONDITIONS:
+        assert get_farming_weather_advisory(conditions) == legacy_advisory(conditions)
+
+
+def test_forecast_days_match_the_legacy_rules():
+    days = CONDITIONS[::7]
+    advisory = build_advisories([ForecastFrame.from_payload('Palakkad,Kerala,IN', payload(days))])
+    daily = advisory['Palakkad,Kerala,IN']['daily']
+    assert len(daily) == len(days)
+    for day, conditions in zip(daily, days):
+        assert day['advisories'] == legacy_advisory(conditions)
+
+
+def test_fungal_risk_window_needs_a_sustained_humid_warm_spell():
+    humid = {'temperature': 25, 'humidity': 90, 'rainfall': 0, 'wind_speed': 5}
+    dry = {'temperature': 25, 'humidity': 60, 'rainfall': 0, 'wind_speed': 5}
+    advisory = build_advisories([ForecastFrame.from_payload('Kochi,Kerala,IN', payload([dry, humid, dry]))])
+    assert advisory['Kochi,Kerala,IN']['fungal_risk_windows'] == [(START + DAY, START + 2 * DAY)]
+    assert advisory['Kochi,Kerala,IN']['heat_stress_windows'] == []
+
+
+def test_precompute_skips_locations_without_a_forecast():
+    frames = {'Kochi,Kerala,IN': ForecastFrame.from_payload('Kochi,Kerala,IN', payload(CONDITIONS[:2]))}
+
+    def fetch_frame(location):
+        if location == 'Nowhere,IN':
+            raise ValueError('city not found')
+        return frames.get(location)
+
+    advisories = precompute_district_advisories(['Kochi,Kerala,IN', 'Nowhere,IN', 'Idukki,Kerala,IN'], fetch_frame)
+    assert list(advisories) == ['Kochi,Kerala,IN']
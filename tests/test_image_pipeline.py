@@ -0,0 +1,31 @@
+import io
+
+from PIL import Image
+
+from utils.image_pipeline import decode_image, image_fingerprint, prepare_image
+
+
+def jpeg_bytes(color, size=(1600, 1200)):
+    output = io.BytesIO()
+    Image.new('RGB', size, color).save(output, format='JPEG', quality=90)
+    return output.getvalue()
+
+
+def test_similar_photos_get_different_fingerprints():
+    # Nearly identical leaves used to share a 64-bit dHash and each other's diagnosis
+    assert image_fingerprint(jpeg_bytes((10, 120, 10))) != image_fingerprint(jpeg_bytes((12, 120, 10)))
+
+
+def test_fingerprint_and_prepare_share_one_decode():
+    image_bytes = jpeg_bytes((10, 120, 10))
+    image = decode_image(image_bytes)
+    assert image_fingerprint(image_bytes, image=image) == image_fingerprint(image_bytes)
+    upload_bytes, mime_type = prepare_image(image_bytes, max_side=800, image=image)
+    assert mime_type == 'image/jpeg'
+    assert Image.open(io.BytesIO(upload_bytes)).size == (800, 600)
+    assert image.size == (1600, 1200)
+
+
+def test_undecodable_bytes_fall_back_to_a_raw_hash():
+    assert image_fingerprint(b'not an image').startswith('sha256:')
+    assert prepare_image(b'not an image') == (b'not an image', 'image/jpeg')
@@ -0,0 +1,46 @@
+from utils import news_helper, news_store
+
+ARTICLES = [
+    {'title': f'Mandi report {i}: {word} arrivals', 'description': 'Prices and arrivals', 'source': 'Desk',
+     'published_at': f'2026-10-{i:02d}T06:00:00Z', 'url': f'https://example.com/{i}'}
+    for i, word in enumerate(['rice', 'wheat', 'onion', 'pepper', 'coconut', 'banana', 'cardamom',
+                              'rubber', 'tea', 'coffee', 'ginger', 'turmeric'], start=1)
+]
+
+
+def api(fail_from_page=None):
+    """Fake NewsAPI: newest first, 'from'/'to' inclusive, failing from a page on like the free plan's result cap"""
+    def fetch(since=None, until=None, page=1, page_size=100):
+        if fail_from_page and page >= fail_from_page:
+            return None
+        matching = sorted(
+            (article for article in ARTICLES
+             if (not since or article['published_at'] >= since) and (not until or article['published_at'] <= until)),
+            key=lambda article: article['published_at'], reverse=True
+        )
+        return matching[(page - 1) * page_size:page * page_size]
+    return fetch
+
+
+def use_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(news_store, '_store', news_store.NewsStore(str(tmp_path / 'news.db')))
+    return news_store.get_news_store()
+
+
+def test_refresh_pages_until_exhausted(tmp_path, monkeypatch):
+    store = use_store(tmp_path, monkeypatch)
+    monkeypatch.setattr(news_helper, 'fetch_news_from_api', api())
+    assert news_helper.refresh_news_store(page_size=5) == len(ARTICLES)
+    assert store.fetch_window() == (ARTICLES[-1]['published_at'], None)
+
+
+def test_refresh_cut_short_resumes_below_oldest_fetched(tmp_path, monkeypatch):
+    store = use_store(tmp_path, monkeypatch)
+    monkeypatch.setattr(news_helper, 'fetch_news_from_api', api(fail_from_page=2))
+    assert news_helper.refresh_news_store(page_size=5) == 5
+    assert store.fetch_window() == (None, ARTICLES[-5]['published_at'])
+
+    while store.fetch_window()[1] is not None:
+        news_helper.refresh_news_store(page_size=5)
+    assert store.count() == len(ARTICLES)
+    assert store.fetch_window() == (ARTICLES[-1]['published_at'], None)
@@ -0,0 +1,34 @@
+import threading
+import time
+
+from utils.prefetch import BackgroundRefresher, Feed
+from utils.user_store import SQLiteUserStore
+
+
+def test_store_locations_are_distinct_and_non_empty(tmp_path):
+    store = SQLiteUserStore(str(tmp_path / 'users.db'), legacy_json_path=None)
+    for mobile, location in enumerate(['Palakkad, Kerala', 'Thrissur, Kerala', 'Palakkad, Kerala', '']):
+        store.create({'mobile': str(mobile), 'name': 'Farmer', 'location': location, 'password': 'x'})
+    assert store.locations() == {'Palakkad, Kerala', 'Thrissur, Kerala'}
+
+
+def test_discovered_keys_are_found_off_the_caller_thread_and_expire_unread():
+    callers = []
+
+    def discover():
+        callers.append(threading.current_thread())
+        return {'Palakkad,Kerala,IN'}
+
+    refresher = BackgroundRefresher(max_workers=2)
+    refresher.add_feed(Feed('weather', lambda key: key, interval=0.1, keys={'Kochi,Kerala,IN'},
+                            idle_ttl=0.3, discover=discover))
+    refresher.start()
+    try:
+        time.sleep(0.2)
+        assert refresher.feeds['weather'].keys == {'Kochi,Kerala,IN', 'Palakkad,Kerala,IN'}
+        assert callers and callers[0] is not threading.current_thread()
+        time.sleep(0.8)
+        # Pinned keys stay; discovered ones nobody read are dropped
+        assert refresher.feeds['weather'].keys == {'Kochi,Kerala,IN'}
+    finally:
+        refresher.stop()
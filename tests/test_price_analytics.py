@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+
+from utils.price_analytics import PriceMatrix, compute_analytics
+
+PEAK = {11: 1.2, 12: 1.25, 1: 1.2}
+
+
+def daily_prices(days, trend_per_day, start=date(2022, 1, 1)):
+    """Coconut prices at one market: a steady trend times a Nov-Jan seasonal peak"""
+    return [
+        ('Coconut', 'Kochi', day.isoformat(), (2000 + trend_per_day * i) * PEAK.get(day.month, 1.0))
+        for i, day in ((i, start + timedelta(days=i)) for i in range(days))
+    ]
+
+
+def test_best_months_survive_a_rising_trend():
+    stats = compute_analytics(PriceMatrix(daily_prices(3 * 365, trend_per_day=2.5)))[('Coconut', None)]
+    assert set(stats['best_months']) == {'November', 'December', 'January'}
+    assert stats['seasonality'][11] > 1.15 > 1.0 > stats['seasonality'][6]
+
+
+def test_best_months_survive_a_falling_trend():
+    stats = compute_analytics(PriceMatrix(daily_prices(3 * 365, trend_per_day=-1.2)))[('Coconut', 'Kochi')]
+    assert set(stats['best_months']) == {'November', 'December', 'January'}
+
+
+def test_too_short_a_history_reports_no_best_months():
+    stats = compute_analytics(PriceMatrix(daily_prices(300, trend_per_day=2.5)))[('Coconut', None)]
+    assert stats['best_months'] == []
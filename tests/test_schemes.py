@@ -0,0 +1,42 @@
+from utils.farming_calendar import add_crop_to_user
+from utils.schemes import SchemeIndex, profile_categories
+
+
+def stored_crop(name, area_acres=1.0):
+    """A crop in the shape add_crop_to_user stores and the user store returns"""
+    return {
+        'name': name,
+        'planting_date': '2026-06-01',
+        'area_acres': area_acres,
+        'added_at': '2026-06-01T09:00:00',
+    }
+
+
+def test_profile_categories_reads_stored_crop_names():
+    categories = profile_categories({'crops': [stored_crop('Coconut'), stored_crop('Pepper')]})
+    assert {'all_farmers', 'small_marginal', 'coconut', 'spice'} <= categories
+
+
+def test_profile_categories_large_holding_is_not_small_marginal():
+    categories = profile_categories({'crops': [stored_crop('Rice (Paddy)', area_acres=10)]})
+    assert 'small_marginal' not in categories
+    assert 'coconut' not in categories
+
+
+def test_crop_specific_scheme_is_eligible_for_grower():
+    index = SchemeIndex([
+        {'id': 1, 'title': 'Coconut replanting', 'applicable_states': ['Kerala'],
+         'eligibility': 'Coconut growers with at least 25 palms'},
+        {'id': 2, 'title': 'Spice mission', 'applicable_states': ['Kerala'],
+         'eligibility': 'Spice farmers'},
+    ])
+    user = {'location': 'Thrissur, Kerala', 'crops': [stored_crop('Coconut')]}
+    eligible = index.eligible(profile_categories(user), 'Kerala')
+    assert [scheme['id'] for scheme in eligible] == [1]
+
+
+def test_stored_crop_shape_matches_add_crop_to_user(monkeypatch):
+    added = []
+    monkeypatch.setattr('utils.auth_helper.add_user_crop', lambda mobile, crop: added.append(crop) or True)
+    add_crop_to_user('9999999999', 'Coconut', '2026-06-01', 1.0)
+    assert set(added[0]) == set(stored_crop('Coconut'))
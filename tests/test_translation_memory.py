@@ -0,0 +1,36 @@
+import time
+
+from utils.translation_memory import TranslationMemory, TranslationQueue
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_queue_translates_misses_into_the_memory_in_batches(tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'translations.db'))
+    calls = []
+
+    def translate(texts, language):
+        calls.append(list(texts))
+        memory.put_many({text: f"[{language}] {text}" for text in texts}, language)
+
+    queue = TranslationQueue(translate, memory, batch_size=2)
+    queue.enqueue(['Apply urea', 'Drain the field', 'Spray neem oil'], 'hi')
+    assert wait_for(lambda: queue.pending_count() == 0)
+    assert memory.get('Spray neem oil', 'hi') == '[hi] Spray neem oil'
+    assert sorted(len(batch) for batch in calls) == [1, 2]
+
+
+def test_failed_strings_are_not_retried_on_every_render(tmp_path):
+    memory = TranslationMemory(str(tmp_path / 'translations.db'))
+    calls = []
+    queue = TranslationQueue(lambda texts, language: calls.append(list(texts)), memory, retry_after=60)
+    queue.enqueue(['Apply urea'], 'ml')
+    assert wait_for(lambda: queue.pending_count() == 0)
+    queue.enqueue(['Apply urea'], 'ml')
+    assert queue.pending_count() == 0
+    assert calls == [['Apply urea']]
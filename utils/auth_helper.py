@@ -1,33 +1,118 @@
 import streamlit as st
-import json
+import copy
 import os
+import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime
-import hashlib
+from utils import password_hasher
+from utils.user_store import get_user_store
+from utils.lazy_imports import lazy_import
+
+class UserCache:
+    """
+    Process-wide read-through cache of user records with bounded LRU eviction.
+    Each entry remembers the store version it was read at and is refetched
+    once the version moves on, so writes from other processes are picked up.
+    """
+    
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, mobile, store):
+        # Read the version before the record: a write in between only makes
+        # the cached copy look stale, never the other way round
+        version = store.version(mobile)
+        if version is None:
+            self.invalidate(mobile)
+            return None
+        
+        with self._lock:
+            entry = self._entries.get(mobile)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(mobile)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+        
+        user = store.get(mobile)
+        
+        with self._lock:
+            if user is None:
+                self._entries.pop(mobile, None)
+            else:
+                self._entries[mobile] = (version, user)
+                self._entries.move_to_end(mobile)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return copy.deepcopy(user)
+    
+    def invalidate(self, mobile=None):
+        with self._lock:
+            if mobile is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(mobile, None)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
+
+user_cache = UserCache(maxsize=int(os.getenv('USER_CACHE_SIZE', '1024')))
+
+# Loaded on the first user write; the crop calendar (and numpy) behind it
+# only when a crop or reminder is indexed
+event_index = lazy_import('utils.event_index')
+
+logger = logging.getLogger(__name__)
+
+def get_user_cache_stats():
+    """Get hit/miss counters for the user record cache"""
+    return user_cache.stats()
 
 def hash_password(password):
     """Hash password for storage"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    return password_hasher.hash_password(password)
 
 def load_users():
-    """Load users from JSON file"""
-    if os.path.exists('users.json'):
-        with open('users.json', 'r') as f:
-            return json.load(f)
-    return {}
+    """Load all users from the configured user store"""
+    return get_user_store().load_all()
 
 def save_users(users):
-    """Save users to JSON file"""
-    with open('users.json', 'w') as f:
-        json.dump(users, f, indent=2)
+    """Replace all users in the configured user store"""
+    store = get_user_store()
+    store.save_all(users)
+    user_cache.invalidate()
+    event_index.get_event_index().rebuild(users, store.store_version())
+
+def _update_event_index(store, version_before, apply):
+    """
+    Apply the event index update for a store write made at version_before.
+    If the index wasn't in step with the store, it is rebuilt instead. The
+    store write has already committed, so an index failure is only logged:
+    the index stays behind and the next read repairs it.
+    """
+    try:
+        index = event_index.get_event_index()
+        if not apply(index, (version_before, store.store_version())):
+            index.sync(store)
+    except Exception:
+        logger.exception("Event index update failed; it will be rebuilt on the next read")
 
 def register_user(name, location, mobile, password):
     """Register a new user"""
-    users = load_users()
-    
-    if mobile in users:
-        return False, "Mobile number already registered"
-    
-    users[mobile] = {
+    store = get_user_store()
+    version_before = store.store_version()
+    created = store.create({
         'name': name,
         'location': location,
         'mobile': mobile,
@@ -35,33 +120,69 @@ def register_user(name, location, mobile, password):
         'registered_at': datetime.now().isoformat(),
         'crops': [],
         'reminders': []
-    }
+    })
+    
+    if not created:
+        return False, "Mobile number already registered"
+    
+    _update_event_index(store, version_before, lambda index, versions: index.advance(versions))
     
-    save_users(users)
     return True, "Registration successful"
 
 def login_user(mobile, password):
     """Login user"""
-    users = load_users()
+    user = get_user_data(mobile)
     
-    if mobile not in users:
+    if user is None:
         return False, "Mobile number not found"
     
-    if users[mobile]['password'] != hash_password(password):
+    if not password_hasher.verify_password(password, user['password']):
         return False, "Incorrect password"
     
-    return True, users[mobile]
+    # Upgrade legacy SHA-256 hashes (or hashes from an old cost setting) now
+    # that we have the plaintext
+    if password_hasher.needs_rehash(user['password']):
+        user['password'] = hash_password(password)
+        update_user_data(mobile, {'password': user['password']})
+    
+    return True, user
 
 def get_user_data(mobile):
     """Get user data by mobile number"""
-    users = load_users()
-    return users.get(mobile, None)
+    return user_cache.get(mobile, get_user_store())
 
 def update_user_data(mobile, data):
     """Update user data"""
-    users = load_users()
-    if mobile in users:
-        users[mobile].update(data)
-        save_users(users)
-        return True
-    return False
+    store = get_user_store()
+    version_before = store.store_version()
+    updated = store.update(mobile, data)
+    user_cache.invalidate(mobile)
+    if updated and ('crops' in data or 'reminders' in data):
+        user_data = get_user_data(mobile)
+        _update_event_index(store, version_before,
+                            lambda index, versions: index.reindex_user(mobile, user_data, versions))
+    elif updated:
+        _update_event_index(store, version_before, lambda index, versions: index.advance(versions))
+    return updated
+
+def add_user_crop(mobile, crop):
+    """Append a crop to the user's record without rewriting the others"""
+    store = get_user_store()
+    version_before = store.store_version()
+    added = store.add_crop(mobile, crop)
+    user_cache.invalidate(mobile)
+    if added:
+        _update_event_index(store, version_before,
+                            lambda index, versions: index.add_crop(mobile, crop, versions))
+    return added
+
+def add_user_reminder(mobile, reminder):
+    """Append a reminder to the user's record, returning its id (None if user not found)"""
+    store = get_user_store()
+    version_before = store.store_version()
+    reminder_id = store.add_reminder(mobile, reminder)
+    user_cache.invalidate(mobile)
+    if reminder_id is not None:
+        _update_event_index(store, version_before,
+                            lambda index, versions: index.add_reminder(mobile, {'id': reminder_id, **reminder}, versions))
+    return reminder_id
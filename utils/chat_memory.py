@@ -0,0 +1,96 @@
+import os
+import re
+from collections import deque
+from datetime import datetime
+
+_SENTENCE_END = re.compile(r'(?<=[.!?।])\s')
+_MARKDOWN = re.compile(r'[*_#`>]+')
+
+
+def _clip(text, limit):
+    text = ' '.join(_MARKDOWN.sub('', text or '').split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + '…'
+
+
+def _first_sentence(text):
+    text = ' '.join(_MARKDOWN.sub('', text or '').split())
+    return _SENTENCE_END.split(text, 1)[0]
+
+
+class ConversationMemory:
+    """
+    Chat memory with constant size. The latest turns are kept verbatim as
+    prompt context, bounded by turn count and characters; turns leaving that
+    window are folded into a rolling summary (the question and the gist of
+    the answer), itself capped in characters. Only the last max_turns turns
+    are kept for display, a page at a time.
+    """
+
+    def __init__(self, window=4, max_context_chars=6000, summary_chars=1500, max_turns=100):
+        self.window = window
+        self.max_context_chars = max_context_chars
+        self.summary_chars = summary_chars
+        self.recent = deque()
+        self.summary_lines = deque()
+        self.history = deque(maxlen=max_turns)
+        self.total_turns = 0
+        self._recent_chars = 0
+        self._summary_length = 0
+
+    def add(self, question, answer):
+        turn = {
+            'question': question,
+            'answer': answer,
+            'asked_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self.history.append(turn)
+        self.recent.append(turn)
+        self.total_turns += 1
+        self._recent_chars += len(question) + len(answer)
+        while len(self.recent) > self.window or (
+            len(self.recent) > 1 and self._recent_chars > self.max_context_chars
+        ):
+            self._fold(self.recent.popleft())
+
+    def _fold(self, turn):
+        self._recent_chars -= len(turn['question']) + len(turn['answer'])
+        line = f"- Farmer asked: {_clip(turn['question'], 160)} -> {_clip(_first_sentence(turn['answer']), 200)}"
+        self.summary_lines.append(line)
+        self._summary_length += len(line) + 1
+        while len(self.summary_lines) > 1 and self._summary_length > self.summary_chars:
+            self._summary_length -= len(self.summary_lines.popleft()) + 1
+
+    @property
+    def summary(self):
+        return '\n'.join(self.summary_lines)
+
+    def context(self):
+        """(rolling summary of older turns, recent turns verbatim) for the next prompt"""
+        return self.summary, list(self.recent)
+
+    def page_count(self, page_size):
+        return max(1, -(-len(self.history) // page_size))
+
+    def page(self, page, page_size):
+        """Turns on a page, oldest first; page 0 holds the newest turns"""
+        end = len(self.history) - page * page_size
+        start = max(0, end - page_size)
+        return [self.history[i] for i in range(start, max(start, end))]
+
+    def clear(self):
+        self.recent.clear()
+        self.summary_lines.clear()
+        self.history.clear()
+        self.total_turns = 0
+        self._recent_chars = 0
+        self._summary_length = 0
+
+
+def create_chat_memory():
+    """New per-session chat memory sized from CHAT_CONTEXT_TURNS, CHAT_CONTEXT_CHARS, CHAT_SUMMARY_CHARS and CHAT_HISTORY_MAX_TURNS"""
+    return ConversationMemory(
+        window=int(os.getenv('CHAT_CONTEXT_TURNS', '4')),
+        max_context_chars=int(os.getenv('CHAT_CONTEXT_CHARS', '6000')),
+        summary_chars=int(os.getenv('CHAT_SUMMARY_CHARS', '1500')),
+        max_turns=int(os.getenv('CHAT_HISTORY_MAX_TURNS', '100')),
+    )
@@ -1,191 +1,210 @@
+import json
+import os
+import threading
+
+ALL_SEASONS = "All Season"
+ALL_STATES = "All"
+
+# Match-quality points: a crop listed for the exact season or state ranks
+# above one that merely grows anywhere or year-round, and a soil listed
+# earlier in a crop's soil_types is a better fit than one listed later
+EXACT_MATCH_POINTS = 2
+GENERAL_MATCH_POINTS = 1
+SOIL_MATCH_POINTS = 3
+
+
+def _bits(positions):
+    bits = 0
+    for position in positions:
+        bits |= 1 << position
+    return bits
+
+
+def _positions(bits):
+    """Crop positions set in a bitset, in ascending order"""
+    positions = []
+    while bits:
+        low = bits & -bits
+        positions.append(low.bit_length() - 1)
+        bits ^= low
+    return positions
+
+
+class CropKnowledgeBase:
+    """
+    Crop characteristics from data/crops.json with inverted indexes from
+    season, soil type and state to the crops that fit them, each a bitset
+    over crop positions. A recommendation is a few bitwise ANDs and ORs, and
+    only the crops that survive them are scored.
+    """
+
+    def __init__(self, crops):
+        self.crops = tuple(crops)
+        self.by_season = {}
+        self.by_soil = {}
+        self.by_state = {}
+        self.soil_rank = []  # per crop: {soil: position in its soil_types}
+        for position, crop in enumerate(self.crops):
+            for index, values in ((self.by_season, crop["seasons"]),
+                                  (self.by_soil, crop["soil_types"]),
+                                  (self.by_state, crop["states"])):
+                for value in values:
+                    key = value.lower()
+                    index[key] = index.get(key, 0) | (1 << position)
+            self.soil_rank.append({soil.lower(): rank for rank, soil in enumerate(crop["soil_types"])})
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)["crops"])
+
+    def _score(self, position, season_key, soil_key, state_key):
+        crop = self.crops[position]
+        season_exact = (self.by_season.get(season_key, 0) >> position) & 1
+        state_exact = (self.by_state.get(state_key, 0) >> position) & 1
+        score = EXACT_MATCH_POINTS if season_exact else GENERAL_MATCH_POINTS
+        score += EXACT_MATCH_POINTS if state_exact else GENERAL_MATCH_POINTS
+        rank = self.soil_rank[position].get(soil_key)
+        if rank is not None:
+            score += SOIL_MATCH_POINTS - rank / len(crop["soil_types"])
+        return score
+
+    def match(self, season, soil_type, state):
+        """
+        ([(score, crop)] growing in the season, soil and state,
+        [(score, crop)] fitting season and state but not the soil), best first
+        """
+        season_key, soil_key, state_key = season.lower(), soil_type.lower(), (state or "").lower()
+        candidates = (
+            (self.by_season.get(season_key, 0) | self.by_season.get(ALL_SEASONS.lower(), 0))
+            & (self.by_state.get(state_key, 0) | self.by_state.get(ALL_STATES.lower(), 0))
+        )
+        primary = candidates & self.by_soil.get(soil_key, 0)
+        secondary = candidates & ~primary
+
+        def ranked(bits):
+            scored = [
+                (self._score(position, season_key, soil_key, state_key), position)
+                for position in _positions(bits)
+            ]
+            scored.sort(key=lambda item: (-item[0], item[1]))
+            return [(round(score, 2), self.crops[position]) for score, position in scored]
+
+        return ranked(primary), ranked(secondary)
+
+
+_knowledge_base = None
+_knowledge_base_lock = threading.Lock()
+
+
+def get_crop_knowledge_base():
+    """Return the process-wide crop knowledge base (path from CROPS_DB_PATH)"""
+    global _knowledge_base
+    if _knowledge_base is None:
+        with _knowledge_base_lock:
+            if _knowledge_base is None:
+                _knowledge_base = CropKnowledgeBase.from_file(os.getenv('CROPS_DB_PATH', 'data/crops.json'))
+    return _knowledge_base
+
+
 def get_crop_recommendation(season, soil_type, state="Kerala"):
     """
-    Rule-based crop recommendation system
+    Crops for a season, soil type and state from the crop knowledge base,
+    ranked by how closely each matches
     """
+    primary, secondary = get_crop_knowledge_base().match(season, soil_type, state)
+    season_name = season.split('(')[0].strip()
     
-    # Define crop database with characteristics
-    crops_db = {
-        "Rice": {
-            "seasons": ["Kharif (Monsoon)", "Rabi (Winter)"],
-            "soil_types": ["Clay", "Loamy", "Alluvial"],
-            "states": ["Kerala", "All"],
-            "water_req": "High",
-            "duration": "120-150 days"
-        },
-        "Coconut": {
-            "seasons": ["All Season"],
-            "soil_types": ["Sandy", "Loamy", "Red Soil"],
-            "states": ["Kerala", "All"],
-            "water_req": "Medium",
-            "duration": "Perennial"
-        },
-        "Pepper": {
-            "seasons": ["Kharif (Monsoon)"],
-            "soil_types": ["Red Soil", "Loamy"],
-            "states": ["Kerala", "All"],
-            "water_req": "Medium",
-            "duration": "Perennial"
-        },
-        "Banana": {
-            "seasons": ["All Season"],
-            "soil_types": ["Loamy", "Alluvial", "Red Soil"],
-            "states": ["Kerala", "All"],
-            "water_req": "High",
-            "duration": "12-15 months"
-        },
-        "Cardamom": {
-            "seasons": ["Kharif (Monsoon)"],
-            "soil_types": ["Red Soil", "Loamy"],
-            "states": ["Kerala"],
-            "water_req": "High",
-            "duration": "Perennial"
-        },
-        "Rubber": {
-            "seasons": ["All Season"],
-            "soil_types": ["Red Soil", "Loamy"],
-            "states": ["Kerala"],
-            "water_req": "High",
-            "duration": "Perennial"
-        },
-        "Tapioca": {
-            "seasons": ["Kharif (Monsoon)", "Zaid (Summer)"],
-            "soil_types": ["Red Soil", "Sandy", "Loamy"],
-            "states": ["Kerala", "All"],
-            "water_req": "Low",
-            "duration": "8-10 months"
-        },
-        "Ginger": {
-            "seasons": ["Kharif (Monsoon)"],
-            "soil_types": ["Loamy", "Red Soil"],
-            "states": ["Kerala", "All"],
-            "water_req": "Medium",
-            "duration": "8-10 months"
-        },
-        "Turmeric": {
-            "seasons": ["Kharif (Monsoon)"],
-            "soil_types": ["Loamy", "Red Soil", "Clay"],
-            "states": ["Kerala", "All"],
-            "water_req": "Medium",
-            "duration": "7-10 months"
-        },
-        "Arecanut": {
-            "seasons": ["All Season"],
-            "soil_types": ["Loamy", "Red Soil"],
-            "states": ["Kerala"],
-            "water_req": "High",
-            "duration": "Perennial"
-        },
-        "Cashew": {
-            "seasons": ["All Season"],
-            "soil_types": ["Red Soil", "Sandy"],
-            "states": ["Kerala", "All"],
-            "water_req": "Low",
-            "duration": "Perennial"
-        },
-        "Cocoa": {
-            "seasons": ["All Season"],
-            "soil_types": ["Loamy", "Red Soil"],
-            "states": ["Kerala"],
-            "water_req": "Medium",
-            "duration": "Perennial"
-        }
-    }
-    
-    # Additional crops for different seasons
-    if season == "Rabi (Winter)":
-        additional_crops = {
-            "Wheat": {
-                "seasons": ["Rabi (Winter)"],
-                "soil_types": ["Loamy", "Alluvial", "Clay"],
-                "states": ["All"],
-                "water_req": "Medium",
-                "duration": "120-150 days"
-            },
-            "Barley": {
-                "seasons": ["Rabi (Winter)"],
-                "soil_types": ["Loamy", "Sandy"],
-                "states": ["All"],
-                "water_req": "Low",
-                "duration": "120-140 days"
-            },
-            "Mustard": {
-                "seasons": ["Rabi (Winter)"],
-                "soil_types": ["Loamy", "Sandy"],
-                "states": ["All"],
-                "water_req": "Low",
-                "duration": "90-120 days"
-            }
+    primary_crops = [
+        {
+            "name": crop["name"],
+            "reason": f"Suitable for {season_name} season in {soil_type.lower()} soil",
+            "water_requirement": crop["water_req"],
+            "duration": crop["duration"],
+            "score": score
         }
-        crops_db.update(additional_crops)
-    
-    if season == "Zaid (Summer)":
-        summer_crops = {
-            "Watermelon": {
-                "seasons": ["Zaid (Summer)"],
-                "soil_types": ["Sandy", "Loamy"],
-                "states": ["All"],
-                "water_req": "High",
-                "duration": "90-100 days"
-            },
-            "Muskmelon": {
-                "seasons": ["Zaid (Summer)"],
-                "soil_types": ["Sandy", "Loamy"],
-                "states": ["All"],
-                "water_req": "Medium",
-                "duration": "90-110 days"
-            },
-            "Cucumber": {
-                "seasons": ["Zaid (Summer)"],
-                "soil_types": ["Loamy", "Sandy"],
-                "states": ["All"],
-                "water_req": "High",
-                "duration": "50-70 days"
-            }
+        for score, crop in primary[:5]  # Top 5 recommendations
+    ]
+    secondary_crops = [
+        {
+            "name": crop["name"],
+            "reason": f"May work with soil management for {season_name} season",
+            "water_requirement": crop["water_req"],
+            "duration": crop["duration"],
+            "score": score
         }
-        crops_db.update(summer_crops)
-    
-    # Find suitable crops
-    primary_crops = []
-    secondary_crops = []
-    
-    for crop_name, crop_info in crops_db.items():
-        # Check season compatibility
-        season_match = (season in crop_info["seasons"] or 
-                       "All Season" in crop_info["seasons"])
-        
-        # Check soil compatibility  
-        soil_match = soil_type in crop_info["soil_types"]
-        
-        # Check state compatibility
-        state_match = (state in crop_info["states"] or 
-                      "All" in crop_info["states"])
-        
-        if season_match and soil_match and state_match:
-            crop_rec = {
-                "name": crop_name,
-                "reason": f"Suitable for {season.split('(')[0].strip()} season in {soil_type.lower()} soil",
-                "water_requirement": crop_info["water_req"],
-                "duration": crop_info["duration"]
-            }
-            primary_crops.append(crop_rec)
-        elif season_match and state_match:  # Partially suitable
-            crop_rec = {
-                "name": crop_name,
-                "reason": f"May work with soil management for {season.split('(')[0].strip()} season",
-                "water_requirement": crop_info["water_req"], 
-                "duration": crop_info["duration"]
-            }
-            secondary_crops.append(crop_rec)
+        for score, crop in secondary[:3]  # Top 3 alternatives
+    ]
     
     # Generate farming tips based on season and soil
     tips = generate_farming_tips(season, soil_type, state)
     
     return {
-        "primary_crops": primary_crops[:5],  # Top 5 recommendations
-        "secondary_crops": secondary_crops[:3],  # Top 3 alternatives
+        "primary_crops": primary_crops,
+        "secondary_crops": secondary_crops,
         "tips": tips
     }
 
+# Farming tips keyed on a word in the season name, the soil type and the state
+SEASON_TIPS = {
+    "Monsoon": [
+        "Ensure proper drainage to prevent waterlogging",
+        "Monitor for fungal diseases due to high humidity",
+        "Plant at the right time to utilize monsoon rains effectively"
+    ],
+    "Winter": [
+        "Protect crops from frost in colder regions",
+        "Irrigation requirements are generally lower",
+        "Good time for harvesting kharif crops"
+    ],
+    "Summer": [
+        "Ensure adequate irrigation systems",
+        "Use mulching to conserve soil moisture",
+        "Consider drought-resistant varieties"
+    ]
+}
+
+SOIL_TIPS = {
+    "Clay": [
+        "Improve drainage by adding organic matter",
+        "Avoid working the soil when it's too wet",
+        "Clay soils retain nutrients well but may need better aeration"
+    ],
+    "Sandy": [
+        "Add organic matter to improve water retention",
+        "More frequent but lighter irrigation needed",
+        "Regular fertilization required as nutrients leach quickly"
+    ],
+    "Loamy": [
+        "Ideal soil type for most crops",
+        "Maintain organic matter levels with compost",
+        "Well-balanced nutrition and water retention"
+    ],
+    "Red Soil": [
+        "May need lime to reduce acidity",
+        "Add phosphorus-rich fertilizers",
+        "Good for perennial crops like coconut and cashew"
+    ],
+    "Black Soil": [
+        "Excellent for cotton and sugarcane",
+        "Rich in nutrients but may have drainage issues",
+        "Deep plowing recommended"
+    ],
+    "Alluvial": [
+        "Very fertile and suitable for cereals",
+        "Regular flooding areas - plan accordingly",
+        "Rich in potash but may need phosphorus"
+    ]
+}
+
+STATE_TIPS = {
+    "Kerala": [
+        "Take advantage of two monsoon seasons",
+        "Intercropping with spices can increase income",
+        "Consider organic farming for premium prices"
+    ]
+}
+
 def generate_farming_tips(season, soil_type, state):
     """
     Generate contextual farming tips
@@ -193,69 +212,16 @@ def generate_farming_tips(season, soil_type, state):
     tips = []
     
     # Season-specific tips
-    if "Monsoon" in season:
-        tips.extend([
-            "Ensure proper drainage to prevent waterlogging",
-            "Monitor for fungal diseases due to high humidity",
-            "Plant at the right time to utilize monsoon rains effectively"
-        ])
-    elif "Winter" in season:
-        tips.extend([
-            "Protect crops from frost in colder regions",
-            "Irrigation requirements are generally lower",
-            "Good time for harvesting kharif crops"
-        ])
-    elif "Summer" in season:
-        tips.extend([
-            "Ensure adequate irrigation systems",
-            "Use mulching to conserve soil moisture",
-            "Consider drought-resistant varieties"
-        ])
+    for keyword, season_tips in SEASON_TIPS.items():
+        if keyword in season:
+            tips.extend(season_tips)
+            break
     
     # Soil-specific tips
-    soil_tips = {
-        "Clay": [
-            "Improve drainage by adding organic matter",
-            "Avoid working the soil when it's too wet",
-            "Clay soils retain nutrients well but may need better aeration"
-        ],
-        "Sandy": [
-            "Add organic matter to improve water retention",
-            "More frequent but lighter irrigation needed",
-            "Regular fertilization required as nutrients leach quickly"
-        ],
-        "Loamy": [
-            "Ideal soil type for most crops",
-            "Maintain organic matter levels with compost",
-            "Well-balanced nutrition and water retention"
-        ],
-        "Red Soil": [
-            "May need lime to reduce acidity",
-            "Add phosphorus-rich fertilizers",
-            "Good for perennial crops like coconut and cashew"
-        ],
-        "Black Soil": [
-            "Excellent for cotton and sugarcane",
-            "Rich in nutrients but may have drainage issues",
-            "Deep plowing recommended"
-        ],
-        "Alluvial": [
-            "Very fertile and suitable for cereals",
-            "Regular flooding areas - plan accordingly",
-            "Rich in potash but may need phosphorus"
-        ]
-    }
-    
-    if soil_type in soil_tips:
-        tips.extend(soil_tips[soil_type])
+    tips.extend(SOIL_TIPS.get(soil_type, []))
     
-    # State-specific tips for Kerala
-    if state == "Kerala":
-        tips.extend([
-            "Take advantage of two monsoon seasons",
-            "Intercropping with spices can increase income",
-            "Consider organic farming for premium prices"
-        ])
+    # State-specific tips
+    tips.extend(STATE_TIPS.get(state, []))
     
     return tips[:8]  # Return top 8 tips
 
@@ -0,0 +1,254 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    mobile TEXT NOT NULL,
+    source_key TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    event_date TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (mobile, source_key, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_events_date ON events(event_date, event_type);
+CREATE INDEX IF NOT EXISTS idx_events_mobile_date ON events(mobile, event_date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Same-day tasks are listed reminders first, then fertilizer, then stage ends
+EVENT_ORDER = "CASE event_type WHEN 'reminder' THEN 0 WHEN 'fertilizer' THEN 1 ELSE 2 END"
+
+
+def _iso_day(value):
+    return datetime.fromisoformat(value).date().isoformat()
+
+
+def crop_source_key(crop):
+    return f"crop:{crop['name']}:{crop['planting_date']}:{crop.get('added_at', '')}"
+
+
+def crop_events(crop):
+    """(event_type, event_date, title, description) for a crop's fertilizer applications and stage ends"""
+    # The crop calendar pulls in numpy; signups and logins only move the version
+    from utils.farming_calendar import CROP_TEMPLATES, get_crop_calendar
+
+    crop_name = crop['name'] if crop['name'] in CROP_TEMPLATES else 'Rice (Paddy)'
+    calendar = get_crop_calendar(crop_name, crop['planting_date'])
+    events = [
+        ('fertilizer', fert['date'], f"{crop['name']} - Fertilizer Application", fert['fertilizer'])
+        for fert in calendar['fertilizer_schedule']
+    ]
+    events.extend(
+        ('stage', stage['end_date'], f"{crop['name']} - {stage['stage']} Complete", ', '.join(stage['activities']))
+        for stage in calendar['timeline']
+    )
+    return events
+
+
+def reminder_events(reminder):
+    return [('reminder', _iso_day(reminder['date']), reminder['title'], reminder.get('description', ''))]
+
+
+class EventIndex:
+    """
+    Dated farming tasks of every user (fertilizer applications, stage ends
+    and reminders) in SQLite, indexed on event_date and on (mobile,
+    event_date), so per-user and all-user window queries are index range
+    scans. Maintained incrementally as crops and reminders are added.
+
+    The index lives in its own database, so it records the user store
+    version it reflects. An incremental write only applies on top of the
+    version the store had before the matching user write; otherwise (another
+    process wrote, an index write failed, users.json/users.db changed
+    underneath) the index is rebuilt from the store by sync().
+    """
+
+    def __init__(self, path='events.db'):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _source_version(conn):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'source_version'").fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_source_version(conn, version):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('source_version', ?)", (version,))
+
+    def _write(self, operations, versions=None):
+        """
+        Run operations in one transaction. With versions=(before, after) they
+        only run if the index is at the store version before, which then
+        becomes after; returns False when the index was elsewhere.
+        """
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if versions is not None and self._source_version(conn) != versions[0]:
+                    conn.execute('ROLLBACK')
+                    return False
+                operations(conn)
+                if versions is not None:
+                    self._set_source_version(conn, versions[1])
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return True
+
+    @staticmethod
+    def _insert(conn, mobile, source_key, events):
+        conn.executemany(
+            'INSERT OR REPLACE INTO events (mobile, source_key, seq, event_type, event_date, title, description) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(mobile, source_key, seq, *event) for seq, event in enumerate(events)]
+        )
+
+    def _insert_user(self, conn, mobile, user_data):
+        for crop in user_data.get('crops', []):
+            self._insert(conn, mobile, crop_source_key(crop), crop_events(crop))
+        for i, reminder in enumerate(user_data.get('reminders', [])):
+            self._insert(conn, mobile, f"reminder:{reminder.get('id', f'#{i}')}", reminder_events(reminder))
+
+    def add_crop(self, mobile, crop, versions=None):
+        return self._write(lambda conn: self._insert(conn, mobile, crop_source_key(crop), crop_events(crop)), versions)
+
+    def add_reminder(self, mobile, reminder, versions=None):
+        return self._write(
+            lambda conn: self._insert(conn, mobile, f"reminder:{reminder.get('id')}", reminder_events(reminder)),
+            versions
+        )
+
+    def advance(self, versions):
+        """Follow a store write that changed no events (a signup, a password or profile edit)"""
+        return self._write(lambda conn: None, versions)
+
+    def reindex_user(self, mobile, user_data, versions=None):
+        """Replace all of a user's events, after their crops or reminders were rewritten wholesale"""
+        def operations(conn):
+            conn.execute('DELETE FROM events WHERE mobile = ?', (mobile,))
+            if user_data:
+                self._insert_user(conn, mobile, user_data)
+        return self._write(operations, versions)
+
+    def rebuild(self, users, source_version=None):
+        """
+        Re-index every user from {mobile: user_data}, read from the store at
+        source_version. Returns the number of events indexed
+        """
+        def operations(conn):
+            conn.execute('DELETE FROM events')
+            for mobile, user_data in users.items():
+                self._insert_user(conn, mobile, user_data)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('built_at', ?)",
+                         (datetime.now().isoformat(),))
+            self._set_source_version(conn, source_version)
+        self._write(operations)
+        return self.count()
+
+    def source_version(self):
+        """User store version the index reflects (None if unknown)"""
+        return self._source_version(self._connect())
+
+    def sync(self, store):
+        """Rebuild from the user store if it changed since the index last caught up with it"""
+        version = store.store_version()
+        if self.source_version() != version:
+            # Writes landing during load_all leave the index behind the
+            # store again, so the next sync picks them up
+            self.rebuild(store.load_all(), version)
+        return self
+
+    def upcoming(self, mobile, start, end):
+        """One user's events dated start..end inclusive (ISO dates), soonest first"""
+        rows = self._connect().execute(
+            'SELECT event_type, event_date, title, description FROM events '
+            f'WHERE mobile = ? AND event_date BETWEEN ? AND ? ORDER BY event_date, {EVENT_ORDER}',
+            (mobile, start, end)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def due_between(self, start, end, event_types=None):
+        """
+        Every user's events dated start..end inclusive as {mobile: [event, ...]},
+        optionally only some event types, for notification batching
+        """
+        sql = 'SELECT mobile, event_type, event_date, title, description FROM events WHERE event_date BETWEEN ? AND ?'
+        params = [start, end]
+        if event_types:
+            sql += f" AND event_type IN ({', '.join('?' for _ in event_types)})"
+            params.extend(event_types)
+        sql += f' ORDER BY event_date, {EVENT_ORDER}'
+
+        due = {}
+        for row in self._connect().execute(sql, params):
+            event = dict(row)
+            due.setdefault(event.pop('mobile'), []).append(event)
+        return due
+
+    def count(self):
+        return self._connect().execute('SELECT COUNT(*) FROM events').fetchone()[0]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_event_index():
+    """Return the process-wide event index (path from EVENTS_DB_PATH), synced with the user store on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from utils.user_store import get_user_store
+                _index = EventIndex(os.getenv('EVENTS_DB_PATH', 'events.db')).sync(get_user_store())
+    return _index
+
+
+def get_current_event_index():
+    """The event index for reading, first rebuilt if the user store changed without it"""
+    from utils.user_store import get_user_store
+    return get_event_index().sync(get_user_store())
+
+
+if __name__ == '__main__':
+    import argparse
+    from datetime import timedelta
+
+    parser = argparse.ArgumentParser(description="Rebuild the farming event index or list farmers with tasks due soon")
+    parser.add_argument('--rebuild', action='store_true')
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--type', dest='event_types', action='append', choices=['fertilizer', 'stage', 'reminder'])
+    args = parser.parse_args()
+
+    index = get_current_event_index()
+    if args.rebuild:
+        from utils.user_store import get_user_store
+        store = get_user_store()
+        print(f"Indexed {index.rebuild(store.load_all(), store.store_version())} events")
+
+    today = date.today()
+    due = index.due_between(today.isoformat(), (today + timedelta(days=args.days)).isoformat(), args.event_types)
+    print(f"{len(due)} farmers with tasks in the next {args.days} days")
+    for mobile, events in due.items():
+        print(f"{mobile}: " + '; '.join(f"{event['event_date']} {event['title']}" for event in events))
@@ -1,111 +1,148 @@
-from datetime import datetime, timedelta
-import json
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
 import os
+import numpy as np
 
-def get_crop_calendar(crop_name, planting_date=None):
-    """Get farming calendar for a specific crop"""
-    
-    crop_schedules = {
-        'Rice (Paddy)': {
-            'duration_days': 120,
-            'stages': [
-                {'name': 'Land Preparation', 'days': 7, 'activities': ['Ploughing', 'Leveling', 'Bund repair']},
-                {'name': 'Nursery Preparation', 'days': 25, 'activities': ['Seed treatment', 'Nursery bed preparation', 'Sowing']},
-                {'name': 'Transplanting', 'days': 5, 'activities': ['Field preparation', 'Transplant seedlings', 'Gap filling']},
-                {'name': 'Vegetative Stage', 'days': 40, 'activities': ['Irrigation', 'Weeding', 'First fertilizer dose']},
-                {'name': 'Reproductive Stage', 'days': 30, 'activities': ['Second fertilizer dose', 'Pest monitoring', 'Disease control']},
-                {'name': 'Maturity & Harvest', 'days': 13, 'activities': ['Stop irrigation', 'Harvesting', 'Threshing']}
-            ],
-            'fertilizer_schedule': [
-                {'days': 15, 'fertilizer': 'Urea - 25 kg/acre', 'stage': 'After transplanting'},
-                {'days': 40, 'fertilizer': 'Urea - 25 kg/acre', 'stage': 'Tillering stage'},
-                {'days': 60, 'fertilizer': 'Urea - 15 kg/acre', 'stage': 'Panicle initiation'}
-            ]
-        },
-        'Coconut': {
-            'duration_days': 365,
-            'stages': [
-                {'name': 'Year-round Care', 'days': 365, 'activities': ['Regular watering', 'Manuring', 'Pest control']}
-            ],
-            'fertilizer_schedule': [
-                {'days': 90, 'fertilizer': 'Organic manure - 25 kg/palm', 'stage': 'Pre-monsoon'},
-                {'days': 180, 'fertilizer': 'NPK - 1.3 kg/palm', 'stage': 'Monsoon'},
-                {'days': 270, 'fertilizer': 'Organic manure - 25 kg/palm', 'stage': 'Post-monsoon'}
-            ]
-        },
-        'Pepper': {
-            'duration_days': 240,
-            'stages': [
-                {'name': 'Planting', 'days': 15, 'activities': ['Pit preparation', 'Planting cuttings', 'Mulching']},
-                {'name': 'Establishment', 'days': 60, 'activities': ['Regular watering', 'Training vines', 'Mulching']},
-                {'name': 'Vegetative Growth', 'days': 90, 'activities': ['Fertilizer application', 'Pruning', 'Pest control']},
-                {'name': 'Flowering & Fruiting', 'days': 75, 'activities': ['Increased irrigation', 'Nutrient spray', 'Disease control']}
-            ],
-            'fertilizer_schedule': [
-                {'days': 45, 'fertilizer': 'Organic manure - 10 kg/vine', 'stage': 'After planting'},
-                {'days': 120, 'fertilizer': 'NPK - 100:60:140 g/vine', 'stage': 'Growth stage'},
-                {'days': 180, 'fertilizer': 'NPK - 100:60:140 g/vine', 'stage': 'Flowering stage'}
-            ]
-        },
-        'Banana': {
-            'duration_days': 365,
-            'stages': [
-                {'name': 'Planting', 'days': 15, 'activities': ['Pit preparation', 'Sucker selection', 'Planting']},
-                {'name': 'Vegetative Phase', 'days': 120, 'activities': ['Irrigation', 'Mulching', 'Earthing up']},
-                {'name': 'Flowering Phase', 'days': 90, 'activities': ['Bunch care', 'Propping', 'Denavelling']},
-                {'name': 'Fruiting & Harvest', 'days': 140, 'activities': ['Bunch covering', 'Harvesting', 'Post-harvest']}
-            ],
-            'fertilizer_schedule': [
-                {'days': 30, 'fertilizer': 'FYM - 10 kg/plant', 'stage': 'After planting'},
-                {'days': 60, 'fertilizer': 'NPK - 200:100:300 g/plant', 'stage': 'Vegetative'},
-                {'days': 120, 'fertilizer': 'NPK - 200:100:300 g/plant', 'stage': 'Pre-flowering'}
-            ]
-        }
+# Growth stages and fertilizer schedule per crop, as day offsets from planting
+CROP_SCHEDULES = {
+    'Rice (Paddy)': {
+        'duration_days': 120,
+        'stages': [
+            {'name': 'Land Preparation', 'days': 7, 'activities': ['Ploughing', 'Leveling', 'Bund repair']},
+            {'name': 'Nursery Preparation', 'days': 25, 'activities': ['Seed treatment', 'Nursery bed preparation', 'Sowing']},
+            {'name': 'Transplanting', 'days': 5, 'activities': ['Field preparation', 'Transplant seedlings', 'Gap filling']},
+            {'name': 'Vegetative Stage', 'days': 40, 'activities': ['Irrigation', 'Weeding', 'First fertilizer dose']},
+            {'name': 'Reproductive Stage', 'days': 30, 'activities': ['Second fertilizer dose', 'Pest monitoring', 'Disease control']},
+            {'name': 'Maturity & Harvest', 'days': 13, 'activities': ['Stop irrigation', 'Harvesting', 'Threshing']}
+        ],
+        'fertilizer_schedule': [
+            {'days': 15, 'fertilizer': 'Urea - 25 kg/acre', 'stage': 'After transplanting'},
+            {'days': 40, 'fertilizer': 'Urea - 25 kg/acre', 'stage': 'Tillering stage'},
+            {'days': 60, 'fertilizer': 'Urea - 15 kg/acre', 'stage': 'Panicle initiation'}
+        ]
+    },
+    'Coconut': {
+        'duration_days': 365,
+        'stages': [
+            {'name': 'Year-round Care', 'days': 365, 'activities': ['Regular watering', 'Manuring', 'Pest control']}
+        ],
+        'fertilizer_schedule': [
+            {'days': 90, 'fertilizer': 'Organic manure - 25 kg/palm', 'stage': 'Pre-monsoon'},
+            {'days': 180, 'fertilizer': 'NPK - 1.3 kg/palm', 'stage': 'Monsoon'},
+            {'days': 270, 'fertilizer': 'Organic manure - 25 kg/palm', 'stage': 'Post-monsoon'}
+        ]
+    },
+    'Pepper': {
+        'duration_days': 240,
+        'stages': [
+            {'name': 'Planting', 'days': 15, 'activities': ['Pit preparation', 'Planting cuttings', 'Mulching']},
+            {'name': 'Establishment', 'days': 60, 'activities': ['Regular watering', 'Training vines', 'Mulching']},
+            {'name': 'Vegetative Growth', 'days': 90, 'activities': ['Fertilizer application', 'Pruning', 'Pest control']},
+            {'name': 'Flowering & Fruiting', 'days': 75, 'activities': ['Increased irrigation', 'Nutrient spray', 'Disease control']}
+        ],
+        'fertilizer_schedule': [
+            {'days': 45, 'fertilizer': 'Organic manure - 10 kg/vine', 'stage': 'After planting'},
+            {'days': 120, 'fertilizer': 'NPK - 100:60:140 g/vine', 'stage': 'Growth stage'},
+            {'days': 180, 'fertilizer': 'NPK - 100:60:140 g/vine', 'stage': 'Flowering stage'}
+        ]
+    },
+    'Banana': {
+        'duration_days': 365,
+        'stages': [
+            {'name': 'Planting', 'days': 15, 'activities': ['Pit preparation', 'Sucker selection', 'Planting']},
+            {'name': 'Vegetative Phase', 'days': 120, 'activities': ['Irrigation', 'Mulching', 'Earthing up']},
+            {'name': 'Flowering Phase', 'days': 90, 'activities': ['Bunch care', 'Propping', 'Denavelling']},
+            {'name': 'Fruiting & Harvest', 'days': 140, 'activities': ['Bunch covering', 'Harvesting', 'Post-harvest']}
+        ],
+        'fertilizer_schedule': [
+            {'days': 30, 'fertilizer': 'FYM - 10 kg/plant', 'stage': 'After planting'},
+            {'days': 60, 'fertilizer': 'NPK - 200:100:300 g/plant', 'stage': 'Vegetative'},
+            {'days': 120, 'fertilizer': 'NPK - 200:100:300 g/plant', 'stage': 'Pre-flowering'}
+        ]
     }
-    
-    if crop_name not in crop_schedules:
-        crop_name = 'Rice (Paddy)'  # Default
-    
-    schedule = crop_schedules[crop_name]
-    
+}
+
+class CropTemplate:
+    """
+    A crop schedule compiled once: stage and fertilizer timings as integer
+    day offsets from planting, so a calendar for any planting date is a
+    vector add
+    """
+    __slots__ = ('crop', 'duration_days', 'stage_names', 'stage_days', 'stage_starts', 'stage_ends',
+                 'stage_activities', 'fertilizer_offsets', 'fertilizers', 'fertilizer_stages')
+
+    def __init__(self, crop, schedule):
+        self.crop = crop
+        self.duration_days = schedule['duration_days']
+        self.stage_names = tuple(stage['name'] for stage in schedule['stages'])
+        self.stage_days = np.array([stage['days'] for stage in schedule['stages']], dtype=np.int64)
+        self.stage_ends = np.cumsum(self.stage_days)
+        self.stage_starts = self.stage_ends - self.stage_days
+        self.stage_activities = tuple(tuple(stage['activities']) for stage in schedule['stages'])
+        self.fertilizer_offsets = np.array([fert['days'] for fert in schedule['fertilizer_schedule']], dtype=np.int64)
+        self.fertilizers = tuple(fert['fertilizer'] for fert in schedule['fertilizer_schedule'])
+        self.fertilizer_stages = tuple(fert['stage'] for fert in schedule['fertilizer_schedule'])
+
+    def expand(self, planting_day):
+        """Calendar for a planting date given as numpy.datetime64 day"""
+        stage_starts = (planting_day + self.stage_starts).astype(str)
+        stage_ends = (planting_day + self.stage_ends).astype(str)
+        fertilizer_dates = (planting_day + self.fertilizer_offsets).astype(str)
+        
+        timeline = tuple(
+            MappingProxyType({
+                'stage': name,
+                'start_date': start,
+                'end_date': end,
+                'duration_days': int(days),
+                'activities': activities
+            })
+            for name, start, end, days, activities in zip(
+                self.stage_names, stage_starts.tolist(), stage_ends.tolist(),
+                self.stage_days, self.stage_activities
+            )
+        )
+        fertilizer_timeline = tuple(
+            MappingProxyType({'date': fert_date, 'fertilizer': fertilizer, 'stage': stage})
+            for fert_date, fertilizer, stage in zip(
+                fertilizer_dates.tolist(), self.fertilizers, self.fertilizer_stages
+            )
+        )
+        
+        return MappingProxyType({
+            'crop': self.crop,
+            'planting_date': str(planting_day),
+            'harvest_date': str(planting_day + self.duration_days),
+            'total_duration': self.duration_days,
+            'timeline': timeline,
+            'fertilizer_schedule': fertilizer_timeline
+        })
+
+CROP_TEMPLATES = {crop: CropTemplate(crop, schedule) for crop, schedule in CROP_SCHEDULES.items()}
+
+def _planting_day(planting_date):
     if planting_date is None:
-        planting_date = datetime.now()
-    elif isinstance(planting_date, str):
+        return np.datetime64(date.today(), 'D')
+    if isinstance(planting_date, str):
         planting_date = datetime.fromisoformat(planting_date)
+    if isinstance(planting_date, datetime):
+        planting_date = planting_date.date()
+    return np.datetime64(planting_date, 'D')
+
+@lru_cache(maxsize=int(os.getenv('CROP_CALENDAR_CACHE_SIZE', '1024')))
+def _expand_calendar(crop_name, planting_day):
+    return CROP_TEMPLATES[crop_name].expand(np.datetime64(planting_day, 'D'))
+
+def get_crop_calendar(crop_name, planting_date=None):
+    """
+    Get farming calendar for a specific crop. The result is read-only and
+    shared between callers asking for the same crop and planting date.
+    """
+    if crop_name not in CROP_TEMPLATES:
+        crop_name = 'Rice (Paddy)'  # Default
     
-    # Generate timeline
-    timeline = []
-    current_date = planting_date
-    
-    for stage in schedule['stages']:
-        end_date = current_date + timedelta(days=stage['days'])
-        timeline.append({
-            'stage': stage['name'],
-            'start_date': current_date.strftime('%Y-%m-%d'),
-            'end_date': end_date.strftime('%Y-%m-%d'),
-            'duration_days': stage['days'],
-            'activities': stage['activities']
-        })
-        current_date = end_date
-    
-    # Generate fertilizer schedule
-    fertilizer_timeline = []
-    for fert in schedule['fertilizer_schedule']:
-        fert_date = planting_date + timedelta(days=fert['days'])
-        fertilizer_timeline.append({
-            'date': fert_date.strftime('%Y-%m-%d'),
-            'fertilizer': fert['fertilizer'],
-            'stage': fert['stage']
-        })
-    
-    return {
-        'crop': crop_name,
-        'planting_date': planting_date.strftime('%Y-%m-%d'),
-        'harvest_date': (planting_date + timedelta(days=schedule['duration_days'])).strftime('%Y-%m-%d'),
-        'total_duration': schedule['duration_days'],
-        'timeline': timeline,
-        'fertilizer_schedule': fertilizer_timeline
-    }
+    return _expand_calendar(crop_name, str(_planting_day(planting_date)))
 
 def get_user_reminders(mobile):
     """Get reminders for a user"""
@@ -119,99 +156,52 @@ def get_user_reminders(mobile):
 
 def add_reminder(mobile, reminder_data):
     """Add a reminder for user"""
-    from utils.auth_helper import get_user_data, update_user_data
-    
-    user_data = get_user_data(mobile)
-    if not user_data:
-        return False
+    from utils.auth_helper import add_user_reminder
     
-    reminders = user_data.get('reminders', [])
-    reminders.append({
-        'id': len(reminders) + 1,
+    reminder_id = add_user_reminder(mobile, {
         'created_at': datetime.now().isoformat(),
         **reminder_data
     })
     
-    update_user_data(mobile, {'reminders': reminders})
-    return True
+    return reminder_id is not None
+
+def _task(event, today):
+    return {
+        'type': event['event_type'],
+        'date': event['event_date'],
+        'days_until': (date.fromisoformat(event['event_date']) - today).days,
+        'title': event['title'],
+        'description': event['description']
+    }
 
 def get_upcoming_tasks(mobile, days=7):
-    """Get upcoming farming tasks for user"""
-    from utils.auth_helper import get_user_data
+    """Get upcoming farming tasks for user, from the event index"""
+    from utils.event_index import get_current_event_index
     
-    user_data = get_user_data(mobile)
-    if not user_data:
-        return []
+    today = date.today()
+    events = get_current_event_index().upcoming(mobile, today.isoformat(), (today + timedelta(days=days)).isoformat())
     
-    upcoming_tasks = []
-    today = datetime.now()
-    
-    # Check reminders
-    for reminder in user_data.get('reminders', []):
-        reminder_date = datetime.fromisoformat(reminder['date'])
-        days_until = (reminder_date - today).days
-        
-        if 0 <= days_until <= days:
-            upcoming_tasks.append({
-                'type': 'reminder',
-                'date': reminder['date'],
-                'days_until': days_until,
-                'title': reminder['title'],
-                'description': reminder.get('description', '')
-            })
-    
-    # Check crop calendars
-    for crop in user_data.get('crops', []):
-        calendar = get_crop_calendar(crop['name'], crop['planting_date'])
-        
-        # Check fertilizer schedule
-        for fert in calendar['fertilizer_schedule']:
-            fert_date = datetime.fromisoformat(fert['date'])
-            days_until = (fert_date - today).days
-            
-            if 0 <= days_until <= days:
-                upcoming_tasks.append({
-                    'type': 'fertilizer',
-                    'date': fert['date'],
-                    'days_until': days_until,
-                    'title': f"{crop['name']} - Fertilizer Application",
-                    'description': fert['fertilizer']
-                })
-        
-        # Check stage transitions
-        for stage in calendar['timeline']:
-            stage_date = datetime.fromisoformat(stage['end_date'])
-            days_until = (stage_date - today).days
-            
-            if 0 <= days_until <= days:
-                upcoming_tasks.append({
-                    'type': 'stage',
-                    'date': stage['end_date'],
-                    'days_until': days_until,
-                    'title': f"{crop['name']} - {stage['stage']} Complete",
-                    'description': ', '.join(stage['activities'])
-                })
+    return [_task(event, today) for event in events]
+
+def get_farmers_with_tasks(days=3, task_types=None):
+    """
+    Upcoming tasks of every farmer as {mobile: [task, ...]}, optionally only
+    some task types (e.g. ['fertilizer']), for SMS or notification batching
+    """
+    from utils.event_index import get_current_event_index
     
-    # Sort by date
-    upcoming_tasks.sort(key=lambda x: x['days_until'])
+    today = date.today()
+    due = get_current_event_index().due_between(today.isoformat(), (today + timedelta(days=days)).isoformat(), task_types)
     
-    return upcoming_tasks
+    return {mobile: [_task(event, today) for event in events] for mobile, events in due.items()}
 
 def add_crop_to_user(mobile, crop_name, planting_date, area_acres):
     """Add a crop to user's farming calendar"""
-    from utils.auth_helper import get_user_data, update_user_data
+    from utils.auth_helper import add_user_crop
     
-    user_data = get_user_data(mobile)
-    if not user_data:
-        return False
-    
-    crops = user_data.get('crops', [])
-    crops.append({
+    return add_user_crop(mobile, {
         'name': crop_name,
         'planting_date': planting_date,
         'area_acres': area_acres,
         'added_at': datetime.now().isoformat()
     })
-    
-    update_user_data(mobile, {'crops': crops})
-    return True
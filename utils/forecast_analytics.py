@@ -0,0 +1,225 @@
+import numpy as np
+
+# OpenWeatherMap forecast slots are 3 hours apart
+SLOT_SECONDS = 3 * 3600
+SLOTS_PER_DAY = 8
+IST_OFFSET_SECONDS = 19800
+
+# Advisory thresholds (get_farming_weather_advisory applies them to current conditions)
+HEAT_STRESS_TEMP = 35
+FROST_TEMP = 10
+HIGH_HUMIDITY = 85
+LOW_HUMIDITY = 30
+HEAVY_RAIN_MM = 50
+STRONG_WIND_KMH = 25
+
+# Fungal diseases take hold after a sustained humid, warm spell
+FUNGAL_HUMIDITY = 85
+FUNGAL_TEMP_RANGE = (18, 30)
+FUNGAL_MIN_SLOTS = 4  # 12 hours
+
+
+class ForecastFrame:
+    """Columnar 3-hourly forecast for one location (NumPy arrays, one value per slot)"""
+
+    def __init__(self, location, timestamps, temperature, humidity, rain, wind,
+                 tz_offset=IST_OFFSET_SECONDS):
+        self.location = location
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.temperature = np.asarray(temperature, dtype=np.float64)
+        self.humidity = np.asarray(humidity, dtype=np.float64)
+        self.rain = np.asarray(rain, dtype=np.float64)
+        self.wind = np.asarray(wind, dtype=np.float64)
+        self.tz_offset = tz_offset
+
+    @classmethod
+    def from_payload(cls, location, data):
+        """Build from a raw OpenWeatherMap /forecast response"""
+        items = data['list']
+        return cls(
+            location,
+            timestamps=[item['dt'] for item in items],
+            temperature=[item['main']['temp'] for item in items],
+            humidity=[item['main']['humidity'] for item in items],
+            rain=[item.get('rain', {}).get('3h', 0) for item in items],
+            wind=[item['wind']['speed'] * 3.6 for item in items],  # m/s to km/h
+            tz_offset=data.get('city', {}).get('timezone', IST_OFFSET_SECONDS),
+        )
+
+
+class ForecastBatch:
+    """
+    Forecasts for many locations stacked into (locations, slots) arrays on a
+    shared time grid. Slots a location has no data for are NaN.
+    """
+
+    def __init__(self, frames):
+        self.locations = [frame.location for frame in frames]
+        self.timestamps = np.unique(np.concatenate([frame.timestamps for frame in frames]))
+        self.tz_offset = frames[0].tz_offset if frames else IST_OFFSET_SECONDS
+
+        shape = (len(frames), len(self.timestamps))
+        self.temperature = np.full(shape, np.nan)
+        self.humidity = np.full(shape, np.nan)
+        self.rain = np.full(shape, np.nan)
+        self.wind = np.full(shape, np.nan)
+        for row, frame in enumerate(frames):
+            columns = np.searchsorted(self.timestamps, frame.timestamps)
+            self.temperature[row, columns] = frame.temperature
+            self.humidity[row, columns] = frame.humidity
+            self.rain[row, columns] = frame.rain
+            self.wind[row, columns] = frame.wind
+
+    def day_boundaries(self):
+        """Local calendar day of each slot, and the column where each day starts"""
+        days = (self.timestamps + self.tz_offset) // 86400
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        return days[starts], starts
+
+    def daily_aggregates(self):
+        """Per-location, per-day min/max temperature, mean humidity, total rain and max wind"""
+        days, starts = self.day_boundaries()
+        valid = ~np.isnan(self.temperature)
+        counts = np.add.reduceat(valid, starts, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            humidity_mean = np.add.reduceat(np.nan_to_num(self.humidity), starts, axis=1) / counts
+        return {
+            'dates': np.array(days * 86400, dtype='datetime64[s]').astype('datetime64[D]').astype(str),
+            'temp_min': np.fmin.reduceat(self.temperature, starts, axis=1),
+            'temp_max': np.fmax.reduceat(self.temperature, starts, axis=1),
+            'humidity_mean': humidity_mean,
+            'rain_total': np.add.reduceat(np.nan_to_num(self.rain), starts, axis=1),
+            'wind_max': np.fmax.reduceat(self.wind, starts, axis=1),
+            'slots': counts,
+        }
+
+    def rolling_rain(self, window_slots=SLOTS_PER_DAY):
+        """Trailing rain total over window_slots slots (24 h by default) ending at each slot"""
+        cumulative = np.cumsum(np.nan_to_num(self.rain), axis=1)
+        padded = np.concatenate([np.zeros((cumulative.shape[0], window_slots)), cumulative], axis=1)
+        return cumulative - padded[:, :cumulative.shape[1]]
+
+    def heat_stress_mask(self):
+        return self.temperature > HEAT_STRESS_TEMP
+
+    def fungal_risk_mask(self):
+        """Slots ending a run of at least FUNGAL_MIN_SLOTS humid, warm slots"""
+        low, high = FUNGAL_TEMP_RANGE
+        conducive = (self.humidity >= FUNGAL_HUMIDITY) & (self.temperature >= low) & (self.temperature <= high)
+        # Run length ending at each slot: count conducive slots in a trailing window
+        run = np.cumsum(conducive, axis=1)
+        padded = np.concatenate([np.zeros((run.shape[0], FUNGAL_MIN_SLOTS), dtype=run.dtype), run], axis=1)
+        sustained = (run - padded[:, :run.shape[1]]) == FUNGAL_MIN_SLOTS
+        # Extend each detection back over the slots that made it up
+        mask = sustained.copy()
+        for shift in range(1, FUNGAL_MIN_SLOTS):
+            mask[:, :-shift] |= sustained[:, shift:]
+        return mask
+
+    def windows(self, mask):
+        """Contiguous True runs of a (locations, slots) mask as [(start_ts, end_ts), ...] per location"""
+        padded = np.pad(mask.astype(np.int8), ((0, 0), (1, 1)))
+        edges = np.diff(padded, axis=1)
+        start_rows, start_cols = np.nonzero(edges == 1)
+        _, end_cols = np.nonzero(edges == -1)
+
+        result = [[] for _ in self.locations]
+        for row, start, end in zip(start_rows, start_cols, end_cols):
+            result[row].append((int(self.timestamps[start]), int(self.timestamps[end - 1]) + SLOT_SECONDS))
+        return result
+
+
+ADVISORY_MESSAGES = {
+    'heat': "🌡️ High temperature detected. Increase irrigation frequency and provide shade for sensitive crops.",
+    'frost': "🥶 Low temperature warning. Protect crops from frost damage.",
+    'high_humidity': "💧 High humidity levels. Monitor for fungal diseases and improve air circulation.",
+    'low_humidity': "🏜️ Low humidity. Increase irrigation and consider mulching.",
+    'heavy_rain': "🌧️ Heavy rainfall expected. Ensure proper drainage and harvest ready crops.",
+    'strong_wind': "💨 Strong winds expected. Secure tall crops and protect seedlings.",
+}
+FAVORABLE_MESSAGE = "🌱 Weather conditions are favorable for normal farming activities."
+
+
+def daily_advisories(daily):
+    """Advisory messages per location and day from daily aggregates"""
+    rules = [
+        (daily['temp_max'] > HEAT_STRESS_TEMP, ADVISORY_MESSAGES['heat']),
+        (daily['temp_min'] < FROST_TEMP, ADVISORY_MESSAGES['frost']),
+        (daily['humidity_mean'] > HIGH_HUMIDITY, ADVISORY_MESSAGES['high_humidity']),
+        (daily['humidity_mean'] < LOW_HUMIDITY, ADVISORY_MESSAGES['low_humidity']),
+        (daily['rain_total'] > HEAVY_RAIN_MM, ADVISORY_MESSAGES['heavy_rain']),
+        (daily['wind_max'] > STRONG_WIND_KMH, ADVISORY_MESSAGES['strong_wind']),
+    ]
+    flags = np.stack([mask for mask, _ in rules])  # (rules, locations, days)
+    messages = [message for _, message in rules]
+
+    locations, days = flags.shape[1], flags.shape[2]
+    result = [[[] for _ in range(days)] for _ in range(locations)]
+    for rule, location, day in zip(*np.nonzero(flags)):
+        result[location][day].append(messages[rule])
+    for location in range(locations):
+        for day in range(days):
+            if not result[location][day]:
+                result[location][day].append(FAVORABLE_MESSAGE)
+    return result
+
+
+def build_advisories(frames):
+    """
+    Multi-day advisories for many locations in one vectorized pass. Returns
+    {location: {'daily': [...], 'heat_stress_windows': [...],
+    'fungal_risk_windows': [...], 'max_rain_24h': float}}
+    """
+    if not frames:
+        return {}
+
+    batch = ForecastBatch(frames)
+    daily = batch.daily_aggregates()
+    messages = daily_advisories(daily)
+    heat_windows = batch.windows(batch.heat_stress_mask())
+    fungal_windows = batch.windows(batch.fungal_risk_mask())
+    max_rain_24h = np.nanmax(batch.rolling_rain(), axis=1)
+
+    advisories = {}
+    for row, location in enumerate(batch.locations):
+        days = []
+        for col, date in enumerate(daily['dates']):
+            if daily['slots'][row, col] == 0:
+                continue
+            days.append({
+                'date': str(date),
+                'temp_min': float(daily['temp_min'][row, col]),
+                'temp_max': float(daily['temp_max'][row, col]),
+                'humidity_mean': round(float(daily['humidity_mean'][row, col]), 1),
+                'rain_total': round(float(daily['rain_total'][row, col]), 1),
+                'wind_max': round(float(daily['wind_max'][row, col]), 1),
+                'advisories': messages[row][col],
+            })
+        advisories[location] = {
+            'daily': days,
+            'heat_stress_windows': heat_windows[row],
+            'fungal_risk_windows': fungal_windows[row],
+            'max_rain_24h': round(float(max_rain_24h[row]), 1),
+        }
+    return advisories
+
+
+def precompute_district_advisories(locations, fetch_frame=None, days=5):
+    """
+    Fetch forecasts for every location and build all advisories at once.
+    fetch_frame(location) returns a ForecastFrame (default: a fresh
+    get_weather_forecast); locations it fails for are skipped.
+    """
+    if fetch_frame is None:
+        from utils.weather_helper import get_weather_forecast
+        fetch_frame = lambda location: get_weather_forecast(location, days)
+
+    frames = []
+    for location in locations:
+        try:
+            frame = fetch_frame(location)
+        except Exception:
+            continue
+        if frame is not None and len(frame.timestamps):
+            frames.append(frame)
+    return build_advisories(frames)
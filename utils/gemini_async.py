@@ -0,0 +1,199 @@
+import asyncio
+import os
+import random
+import weakref
+import httpx
+from utils.image_pipeline import decode_image, prepare_image, image_fingerprint, get_diagnosis_cache
+from utils.lazy_imports import lazy_import
+from utils.response_cache import get_response_cache
+from utils.translation_memory import get_translation_memory
+from utils.gemini_helper import (
+    get_client,
+    types,
+    build_chat_contents,
+    get_chat_system_prompt,
+    get_disease_analysis_prompt,
+    get_translation_prompt,
+)
+
+# HTTP status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+errors = lazy_import('google.genai.errors')
+
+
+class AsyncGeminiClient:
+    """
+    asyncio wrapper around the Gemini client with a cap on concurrent model
+    calls, exponential backoff with full jitter on 429/5xx, and a deadline
+    per call that covers all retries. Cancelling the awaiting task cancels
+    the in-flight request.
+    """
+
+    def __init__(self, genai_client=None, max_concurrency=8, max_retries=3,
+                 base_delay=0.5, max_delay=8.0, timeout=60.0):
+        self.genai_client = genai_client
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        # asyncio primitives belong to one event loop, so keep a semaphore per loop
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    def _is_retryable(self, error):
+        if isinstance(error, errors.APIError):
+            return error.code in RETRYABLE_STATUS_CODES
+        # The SDK talks to the API over httpx, whose network errors don't
+        # subclass the builtin ConnectionError
+        return isinstance(error, (ConnectionError, TimeoutError, httpx.TransportError))
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def _call_with_retries(self, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore():
+                    return await (self.genai_client or get_client()).aio.models.generate_content(**kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+
+    async def generate_content(self, timeout=None, **kwargs):
+        """Call generate_content, raising TimeoutError once the deadline passes"""
+        async with asyncio.timeout(timeout or self.timeout):
+            return await self._call_with_retries(**kwargs)
+
+
+async_client = AsyncGeminiClient(
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+    max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "3")),
+    timeout=float(os.getenv("GEMINI_TIMEOUT", "60")),
+)
+
+
+# The caches are the same SQLite stores the sync functions in gemini_helper
+# use, so both paths share hits; their lookups run in a worker thread to
+# keep the event loop free.
+
+async def ask_gemini_async(query, language="en", use_cache=True, history=None, summary=None, timeout=None):
+    """
+    Async version of ask_gemini
+    """
+    cache = get_response_cache() if use_cache and not history and not summary else None
+    if cache is not None:
+        cached_answer = await asyncio.to_thread(cache.get, query, language)
+        if cached_answer:
+            return cached_answer
+
+    try:
+        response = await async_client.generate_content(
+            timeout=timeout,
+            model="gemini-2.5-flash",
+            contents=build_chat_contents(query, history),
+            config=types.GenerateContentConfig(
+                system_instruction=get_chat_system_prompt(language, summary),
+            ),
+        )
+
+        if not response.text:
+            return "I apologize, but I couldn't process your query at the moment. Please try again."
+
+        if cache is not None:
+            await asyncio.to_thread(cache.put, query, language, response.text)
+
+        return response.text
+
+    except TimeoutError:
+        return "Error: The AI service took too long to respond. Please try again."
+    except Exception as e:
+        return f"Error: Unable to get AI response. Please check your internet connection and try again. ({str(e)})"
+
+
+def _prepare_for_diagnosis(image_bytes, use_cache):
+    """(diagnosis cache or None, fingerprint, upload bytes, mime type) from one decode of the image"""
+    image = decode_image(image_bytes)
+    cache = get_diagnosis_cache() if use_cache else None
+    fingerprint = image_fingerprint(image_bytes, image=image) if cache is not None else None
+    upload_bytes, mime_type = prepare_image(image_bytes, image=image)
+    return cache, fingerprint, upload_bytes, mime_type
+
+
+async def analyze_image_for_disease_async(image_bytes, language="en", use_cache=True, timeout=None):
+    """
+    Async version of analyze_image_bytes_for_disease
+    """
+    try:
+        # Decoding, hashing and resizing are CPU-bound, keep them off the event loop
+        cache, fingerprint, upload_bytes, mime_type = await asyncio.to_thread(
+            _prepare_for_diagnosis, image_bytes, use_cache
+        )
+        if cache is not None:
+            cached_diagnosis = await asyncio.to_thread(cache.get, fingerprint, language)
+            if cached_diagnosis:
+                return cached_diagnosis
+
+        response = await async_client.generate_content(
+            timeout=timeout,
+            model="gemini-2.5-pro",
+            contents=[
+                types.Part.from_bytes(
+                    data=upload_bytes,
+                    mime_type=mime_type,
+                ),
+                get_disease_analysis_prompt(language)
+            ],
+        )
+
+        if not response.text:
+            return "Unable to analyze the image. Please ensure the image is clear and shows the affected plant parts."
+
+        if cache is not None:
+            await asyncio.to_thread(cache.put, fingerprint, language, response.text)
+
+        return response.text
+
+    except TimeoutError:
+        return "Error analyzing image: the AI service took too long to respond."
+    except Exception as e:
+        return f"Error analyzing image: {str(e)}"
+
+
+async def translate_text_async(text, target_language, timeout=None):
+    """
+    Async version of translate_text
+    """
+    if not text or target_language == "en":
+        return text
+
+    memory = get_translation_memory()
+    cached = await asyncio.to_thread(memory.get, text, target_language)
+    if cached is not None:
+        return cached
+
+    try:
+        response = await async_client.generate_content(
+            timeout=timeout,
+            model="gemini-2.5-flash",
+            contents=get_translation_prompt(text, target_language)
+        )
+
+        if response.text:
+            await asyncio.to_thread(memory.put, text, target_language, response.text)
+
+        return response.text or text
+
+    except Exception:
+        return text  # Return original text if translation fails
@@ -1,138 +1,396 @@
 import os
 import json
+import threading
+import time
+from collections import deque
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+from utils.lazy_imports import lazy_import
+from utils.response_cache import get_response_cache
+from utils.translation_memory import get_translation_memory
+from utils.image_pipeline import decode_image, prepare_image, image_fingerprint, get_diagnosis_cache
 
 # Load environment variables from .env file (if it exists)
 load_dotenv()
 
-# Initialize Gemini client
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY", "default_key"))
+# The google-genai SDK takes longer to import than the rest of the app put
+# together, so it is loaded on the first model call rather than at startup
+genai = lazy_import('google.genai')
+types = lazy_import('google.genai.types')
 
-def ask_gemini(query, language="en"):
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide Gemini client, created on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = genai.Client(api_key=os.getenv("GEMINI_API_KEY", "default_key"))
+    return _client
+
+
+def get_farming_system_prompt(language="en"):
+    """
+    Build the Krishi Mitra system prompt for the given answer language
     """
-    Ask Gemini AI a farming-related question with multilingual support
+    # Language codes mapping
+    lang_map = {
+        "en": "English",
+        "ml": "Malayalam", 
+        "hi": "Hindi",
+        "mr": "Marathi"
+    }
+    
+    target_language = lang_map.get(language, "English")
+    
+    # Create a comprehensive farming assistant prompt
+    return f"""
+    You are Krishi Mitra AI, an expert agricultural assistant for Indian farmers. 
+    You have deep knowledge of:
+    - Indian crops, seasons (Kharif, Rabi, Zaid)
+    - Soil types common in India
+    - Pest and disease management
+    - Government schemes and subsidies
+    - Weather-based farming advice
+    - Sustainable farming practices
+    - Market prices and trends
+    - Fertilizer and seed recommendations
+    
+    Always provide:
+    1. Practical, actionable advice
+    2. Context-specific recommendations for Indian conditions
+    3. Cost-effective solutions
+    4. Traditional knowledge combined with modern techniques
+    
+    Respond in {target_language}. If the user asks in a different language, detect it and respond in that language.
+    Keep responses informative yet concise (200-300 words max).
+    """
+
+def build_chat_contents(query, history=None):
+    """
+    Multi-turn contents for a question: earlier turns (dicts with question
+    and answer) as alternating user/model messages, then the question
+    """
+    contents = []
+    for turn in history or ():
+        contents.append(types.Content(role="user", parts=[types.Part(text=turn["question"])]))
+        contents.append(types.Content(role="model", parts=[types.Part(text=turn["answer"])]))
+    contents.append(types.Content(role="user", parts=[types.Part(text=query)]))
+    return contents
+
+def get_chat_system_prompt(language="en", summary=None):
     """
+    System prompt for a conversation, with the rolling summary of turns that
+    are no longer sent verbatim
+    """
+    prompt = get_farming_system_prompt(language)
+    if summary:
+        prompt += f"""
+    Earlier in this conversation (summary, oldest first):
+    {summary}
+    """
+    return prompt
+
+def ask_gemini(query, language="en", use_cache=True, history=None, summary=None):
+    """
+    Ask Gemini AI a farming-related question with multilingual support.
+    history (recent turns) and summary (older turns) carry the conversation
+    so follow-ups keep their context. Stand-alone questions are served from
+    the persistent response cache when possible.
+    """
+    # A follow-up's answer depends on the conversation, so only first
+    # questions are cached
+    cache = get_response_cache() if use_cache and not history and not summary else None
+    if cache is not None:
+        cached_answer = cache.get(query, language)
+        if cached_answer:
+            return cached_answer
+    
     try:
-        # Language codes mapping
-        lang_map = {
-            "en": "English",
-            "ml": "Malayalam", 
-            "hi": "Hindi",
-            "mr": "Marathi"
-        }
-        
-        target_language = lang_map.get(language, "English")
-        
-        # Create a comprehensive farming assistant prompt
-        system_prompt = f"""
-        You are Krishi Mitra AI, an expert agricultural assistant for Indian farmers. 
-        You have deep knowledge of:
-        - Indian crops, seasons (Kharif, Rabi, Zaid)
-        - Soil types common in India
-        - Pest and disease management
-        - Government schemes and subsidies
-        - Weather-based farming advice
-        - Sustainable farming practices
-        - Market prices and trends
-        - Fertilizer and seed recommendations
-        
-        Always provide:
-        1. Practical, actionable advice
-        2. Context-specific recommendations for Indian conditions
-        3. Cost-effective solutions
-        4. Traditional knowledge combined with modern techniques
-        
-        Respond in {target_language}. If the user asks in a different language, detect it and respond in that language.
-        Keep responses informative yet concise (200-300 words max).
-        """
-        
-        response = client.models.generate_content(
+        response = get_client().models.generate_content(
             model="gemini-2.5-flash",
-            contents=[
-                types.Content(role="user", parts=[types.Part(text=query)])
-            ],
+            contents=build_chat_contents(query, history),
             config=types.GenerateContentConfig(
-                system_instruction=system_prompt,
+                system_instruction=get_chat_system_prompt(language, summary),
             ),
         )
         
-        return response.text or "I apologize, but I couldn't process your query at the moment. Please try again."
+        if not response.text:
+            return "I apologize, but I couldn't process your query at the moment. Please try again."
+        
+        if cache is not None:
+            cache.put(query, language, response.text)
+        
+        return response.text
         
     except Exception as e:
         return f"Error: Unable to get AI response. Please check your internet connection and try again. ({str(e)})"
 
-def analyze_image_for_disease(image_path, language="en"):
+# Timings of recent streamed answers, newest last
+stream_timings = deque(maxlen=100)
+
+def ask_gemini_stream(query, language="en", use_cache=True, history=None, summary=None):
     """
-    Analyze crop image for disease detection using Gemini Vision
+    Streaming variant of ask_gemini: yields the answer in chunks as the model
+    produces them. Time-to-first-token and total time are recorded in
+    stream_timings.
     """
+    started = time.perf_counter()
+    first_chunk_at = None
+    chunks = []
+    source = "model"
+    
+    cache = get_response_cache() if use_cache and not history and not summary else None
+    cached_answer = cache.get(query, language) if cache is not None else None
+    
     try:
-        lang_map = {
-            "en": "English",
-            "ml": "Malayalam", 
-            "hi": "Hindi",
-            "mr": "Marathi"
-        }
+        if cached_answer:
+            source = "cache"
+            first_chunk_at = time.perf_counter()
+            chunks.append(cached_answer)
+            yield cached_answer
+            return
+        
+        try:
+            stream = get_client().models.generate_content_stream(
+                model="gemini-2.5-flash",
+                contents=build_chat_contents(query, history),
+                config=types.GenerateContentConfig(
+                    system_instruction=get_chat_system_prompt(language, summary),
+                ),
+            )
+            
+            for chunk in stream:
+                if not chunk.text:
+                    continue
+                if first_chunk_at is None:
+                    first_chunk_at = time.perf_counter()
+                chunks.append(chunk.text)
+                yield chunk.text
+            
+        except Exception as e:
+            source = "error"
+            yield f"Error: Unable to get AI response. Please check your internet connection and try again. ({str(e)})"
+            return
         
-        target_language = lang_map.get(language, "English")
+        if not chunks:
+            source = "error"
+            yield "I apologize, but I couldn't process your query at the moment. Please try again."
+            return
         
+        if cache is not None:
+            cache.put(query, language, "".join(chunks))
+    
+    finally:
+        finished = time.perf_counter()
+        stream_timings.append({
+            "source": source,
+            "ttft_ms": (first_chunk_at - started) * 1000 if first_chunk_at else None,
+            "total_ms": (finished - started) * 1000,
+            "chunks": len(chunks),
+        })
+
+def get_stream_timing_summary():
+    """
+    Summarize time-to-first-token and total time over recent streamed answers
+    """
+    timings = [t for t in stream_timings if t["source"] == "model" and t["ttft_ms"] is not None]
+    if not timings:
+        return None
+    
+    ttft = sorted(t["ttft_ms"] for t in timings)
+    total = sorted(t["total_ms"] for t in timings)
+    return {
+        "count": len(timings),
+        "ttft_p50_ms": ttft[len(ttft) // 2],
+        "ttft_max_ms": ttft[-1],
+        "total_p50_ms": total[len(total) // 2],
+        "total_max_ms": total[-1],
+    }
+
+def get_disease_analysis_prompt(language="en"):
+    """
+    Build the plant pathologist prompt for the given answer language
+    """
+    lang_map = {
+        "en": "English",
+        "ml": "Malayalam", 
+        "hi": "Hindi",
+        "mr": "Marathi"
+    }
+    
+    target_language = lang_map.get(language, "English")
+    
+    return f"""
+    You are an expert plant pathologist specializing in crop diseases common in India.
+    Analyze this image and provide:
+    1. Crop identification if possible
+    2. Disease/pest identification
+    3. Severity level (Mild/Moderate/Severe)
+    4. Immediate treatment recommendations
+    5. Prevention measures
+    6. Organic/chemical treatment options
+    
+    Focus on diseases common in Indian agriculture.
+    Respond in {target_language}.
+    If you cannot identify any disease, suggest general plant health tips.
+    """
+
+def get_translation_prompt(text, target_language):
+    """
+    Build the prompt asking Gemini to translate text to the target language
+    """
+    lang_map = {
+        "en": "English",
+        "ml": "Malayalam", 
+        "hi": "Hindi",
+        "mr": "Marathi"
+    }
+    
+    target_lang = lang_map.get(target_language, "English")
+    
+    return f"Translate the following text to {target_lang}. Keep agricultural terms accurate:\n\n{text}"
+
+def analyze_image_for_disease(image_path, language="en"):
+    """
+    Analyze crop image for disease detection using Gemini Vision
+    """
+    try:
         with open(image_path, "rb") as f:
             image_bytes = f.read()
-            
-        system_prompt = f"""
-        You are an expert plant pathologist specializing in crop diseases common in India.
-        Analyze this image and provide:
-        1. Crop identification if possible
-        2. Disease/pest identification
-        3. Severity level (Mild/Moderate/Severe)
-        4. Immediate treatment recommendations
-        5. Prevention measures
-        6. Organic/chemical treatment options
-        
-        Focus on diseases common in Indian agriculture.
-        Respond in {target_language}.
-        If you cannot identify any disease, suggest general plant health tips.
-        """
-        
-        response = client.models.generate_content(
+    except Exception as e:
+        return f"Error analyzing image: {str(e)}"
+    
+    return analyze_image_bytes_for_disease(image_bytes, language)
+
+def analyze_image_bytes_for_disease(image_bytes, language="en", use_cache=True):
+    """
+    Analyze an in-memory crop image for disease detection using Gemini Vision.
+    The image is downsized before upload and diagnoses are cached by image
+    fingerprint and language, so re-submitted photos return immediately.
+    """
+    try:
+        # Decoded once for both the cache key and the downsizing
+        image = decode_image(image_bytes)
+        cache = get_diagnosis_cache() if use_cache else None
+        fingerprint = image_fingerprint(image_bytes, image=image) if cache is not None else None
+        if cache is not None:
+            cached_diagnosis = cache.get(fingerprint, language)
+            if cached_diagnosis:
+                return cached_diagnosis
+        
+        upload_bytes, mime_type = prepare_image(image_bytes, image=image)
+        
+        response = get_client().models.generate_content(
             model="gemini-2.5-pro",
             contents=[
                 types.Part.from_bytes(
-                    data=image_bytes,
-                    mime_type="image/jpeg",
+                    data=upload_bytes,
+                    mime_type=mime_type,
                 ),
-                system_prompt
+                get_disease_analysis_prompt(language)
             ],
         )
         
-        return response.text or "Unable to analyze the image. Please ensure the image is clear and shows the affected plant parts."
+        if not response.text:
+            return "Unable to analyze the image. Please ensure the image is clear and shows the affected plant parts."
+        
+        if cache is not None:
+            cache.put(fingerprint, language, response.text)
+        
+        return response.text
         
     except Exception as e:
         return f"Error analyzing image: {str(e)}"
 
 def translate_text(text, target_language):
     """
-    Translate text to target language using Gemini
+    Translate text to target language using Gemini.
+    Text already in the translation memory never reaches the model.
     """
+    if not text or target_language == "en":
+        return text
+    
+    memory = get_translation_memory()
+    cached = memory.get(text, target_language)
+    if cached is not None:
+        return cached
+    
     try:
-        lang_map = {
-            "en": "English",
-            "ml": "Malayalam", 
-            "hi": "Hindi",
-            "mr": "Marathi"
-        }
-        
-        target_lang = lang_map.get(target_language, "English")
-        
-        prompt = f"Translate the following text to {target_lang}. Keep agricultural terms accurate:\n\n{text}"
-        
-        response = client.models.generate_content(
+        response = get_client().models.generate_content(
             model="gemini-2.5-flash",
-            contents=prompt
+            contents=get_translation_prompt(text, target_language)
         )
         
+        if response.text:
+            memory.put(text, target_language, response.text)
+        
         return response.text or text
         
     except Exception as e:
         return text  # Return original text if translation fails
+
+def translate_batch(texts, target_language, batch_size=50):
+    """
+    Translate many strings with a few structured model calls.
+    Strings are de-duplicated, looked up in the translation memory first, and
+    only the missing ones are sent, batch_size per request, as a JSON array.
+    Returns {text: translation}; strings that could not be translated map to
+    themselves.
+    """
+    unique_texts = [text for text in dict.fromkeys(texts) if text]
+    if target_language == "en":
+        return {text: text for text in unique_texts}
+    
+    memory = get_translation_memory()
+    translations = memory.get_many(unique_texts, target_language)
+    missing = [text for text in unique_texts if text not in translations]
+    
+    lang_map = {
+        "en": "English",
+        "ml": "Malayalam", 
+        "hi": "Hindi",
+        "mr": "Marathi"
+    }
+    target_lang = lang_map.get(target_language, "English")
+    
+    for i in range(0, len(missing), batch_size):
+        batch = missing[i:i + batch_size]
+        prompt = (
+            f"Translate each string in the following JSON array to {target_lang}. "
+            "Keep agricultural terms accurate, keep emojis, numbers and placeholders unchanged, "
+            "and return a JSON array of the translated strings in the same order.\n\n"
+            + json.dumps(batch, ensure_ascii=False)
+        )
+        
+        try:
+            response = get_client().models.generate_content(
+                model="gemini-2.5-flash",
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                ),
+            )
+            results = json.loads(response.text or "[]")
+        except Exception:
+            continue  # Leave this batch untranslated; it is retried next run
+        
+        if not isinstance(results, list) or len(results) != len(batch):
+            continue
+        
+        batch_translations = {
+            text: str(result) for text, result in zip(batch, results) if result
+        }
+        memory.put_many(batch_translations, target_language)
+        translations.update(batch_translations)
+    
+    return {text: translations.get(text, text) for text in unique_texts}
+
+def get_ask_cache_stats():
+    """
+    Get hit/miss/saved-call counters for the ask_gemini response cache
+    """
+    cache = get_response_cache()
+    return cache.stats() if cache is not None else None
@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Per-host (connect, read) timeouts in seconds. Weather responses are small
+# and a cold location is fetched while the page renders, so give up early;
+# news searches return up to 100 articles a page and are only fetched in
+# the background, so allow them longer.
+HOST_TIMEOUTS = {
+    'api.openweathermap.org': (3.05, 5),
+    'newsapi.org': (3.05, 20),
+}
+DEFAULT_TIMEOUT = (3.05, 10)
+
+
+class LatencyHistogram:
+    """Bucketed request latencies for one upstream host"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.errors = 0
+        self.sum_ms = 0.0
+
+    def observe(self, elapsed_ms, error=False):
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += 1
+        self.sum_ms += elapsed_ms
+        if error:
+            self.errors += 1
+
+    def snapshot(self):
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            'count': self.total,
+            'errors': self.errors,
+            'mean_ms': self.sum_ms / self.total if self.total else 0.0,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class HTTPClient:
+    """
+    Shared requests.Session for outbound API calls: pooled keep-alive
+    connections, retries with backoff on connection errors and 429/5xx,
+    a global cap on concurrent requests and per-host timeouts.
+    """
+
+    def __init__(self, pool_size=10, max_retries=3, backoff_factor=0.5, max_concurrency=20,
+                 host_timeouts=None, default_timeout=DEFAULT_TIMEOUT):
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET'],
+            respect_retry_after_header=True,
+            # Hand the last response back instead of raising, callers check status_code
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.host_timeouts = dict(HOST_TIMEOUTS if host_timeouts is None else host_timeouts)
+        self.default_timeout = default_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._histograms = {}
+        self._histograms_lock = threading.Lock()
+
+    def _observe(self, host, elapsed_ms, error):
+        with self._histograms_lock:
+            histogram = self._histograms.setdefault(host, LatencyHistogram())
+            histogram.observe(elapsed_ms, error)
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        host = urlsplit(url).hostname or ''
+        timeout = timeout or self.host_timeouts.get(host, self.default_timeout)
+        with self._slots:
+            start = time.perf_counter()
+            error = True
+            try:
+                response = self.session.get(url, params=params, timeout=timeout, **kwargs)
+                error = response.status_code >= 400
+                return response
+            finally:
+                self._observe(host, (time.perf_counter() - start) * 1000, error)
+
+    def latency_histograms(self):
+        with self._histograms_lock:
+            return {host: histogram.snapshot() for host, histogram in self._histograms.items()}
+
+
+http_client = HTTPClient(
+    pool_size=int(os.getenv('HTTP_POOL_SIZE', '10')),
+    max_retries=int(os.getenv('HTTP_MAX_RETRIES', '3')),
+    max_concurrency=int(os.getenv('HTTP_MAX_CONCURRENCY', '20')),
+)
+
+
+def http_get(url, params=None, timeout=None, **kwargs):
+    """GET through the shared pooled session"""
+    return http_client.get(url, params=params, timeout=timeout, **kwargs)
+
+
+def get_latency_histograms():
+    """Per-upstream-host latency histograms for requests made through http_get"""
+    return http_client.latency_histograms()
@@ -0,0 +1,124 @@
+import glob
+import json
+import os
+import re
+import sys
+import threading
+from types import MappingProxyType
+
+BASE_LANGUAGE = 'en'
+
+# t["key"] / t['key'] lookups in the app script
+_MESSAGE_LOOKUP = re.compile(r"""\bt\[["'](\w+)["']\]""")
+
+
+def used_keys(app_path='app.py'):
+    """Message keys the app script looks up"""
+    with open(app_path, 'r', encoding='utf-8') as f:
+        return set(_MESSAGE_LOOKUP.findall(f.read()))
+
+
+class TranslationCatalog:
+    """
+    UI messages for every language in locales/*.json, loaded once per process.
+    Each language's file may name a fallback language; a key missing from a
+    file resolves along that chain (e.g. Marathi -> Hindi -> English) at load
+    time, so every language ends up as one flat, read-only mapping and a
+    lookup is a single dict access. Keys are interned and shared across
+    languages.
+    """
+
+    def __init__(self, locales_dir='locales'):
+        self.locales_dir = locales_dir
+        self.files = {}  # code -> parsed file
+        for path in sorted(glob.glob(os.path.join(locales_dir, '*.json'))):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            code = data.get('code') or os.path.splitext(os.path.basename(path))[0]
+            self.files[code] = data
+        if BASE_LANGUAGE not in self.files:
+            raise FileNotFoundError(f"No {BASE_LANGUAGE}.json in {locales_dir}")
+
+        ordered = sorted(self.files.items(), key=lambda item: (item[1].get('order', len(self.files)), item[0]))
+        self.codes = MappingProxyType({data['language']: code for code, data in ordered})
+        self.names = tuple(self.codes)
+        self._messages = {}
+        for name, code in self.codes.items():
+            resolved = {}
+            for fallback_code in reversed(self.fallback_chain(code)):
+                for key, text in self.files[fallback_code]['messages'].items():
+                    resolved[sys.intern(key)] = text
+            self._messages[name] = MappingProxyType(resolved)
+
+    def fallback_chain(self, code):
+        """[code, its fallback, ..., en], raising ValueError on unknown or cyclic fallbacks"""
+        chain = [code]
+        while chain[-1] != BASE_LANGUAGE:
+            fallback = self.files[chain[-1]].get('fallback', BASE_LANGUAGE)
+            if fallback not in self.files:
+                raise ValueError(f"{chain[-1]}.json falls back to unknown language '{fallback}'")
+            if fallback in chain:
+                raise ValueError(f"Fallback cycle: {' -> '.join(chain + [fallback])}")
+            chain.append(fallback)
+        return chain
+
+    def messages(self, language):
+        """Read-only {key: text} for a language name such as "Hindi" (English if unknown)"""
+        return self._messages.get(language) or self._messages[self.files[BASE_LANGUAGE]['language']]
+
+    def missing_keys(self):
+        """
+        {code: (missing, unknown)} for every language whose own file lacks
+        keys of the English file (served from the fallback chain) or has keys
+        English doesn't define
+        """
+        base = set(self.files[BASE_LANGUAGE]['messages'])
+        report = {}
+        for code, data in self.files.items():
+            own = set(data['messages'])
+            missing, unknown = sorted(base - own), sorted(own - base)
+            if missing or unknown:
+                report[code] = (missing, unknown)
+        return report
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Return the process-wide translation catalog (directory from LOCALES_DIR)"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = TranslationCatalog(os.getenv('LOCALES_DIR', 'locales'))
+    return _catalog
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check the locale files for missing and unknown message keys")
+    parser.add_argument('--locales', default=os.getenv('LOCALES_DIR', 'locales'))
+    parser.add_argument('--app', default='app.py')
+    parser.add_argument('--strict', action='store_true', help="also fail on keys only served from a fallback language")
+    args = parser.parse_args()
+
+    catalog = TranslationCatalog(args.locales)
+    undefined = sorted(used_keys(args.app) - set(catalog.files[BASE_LANGUAGE]['messages']))
+    for key in undefined:
+        print(f"{args.app} uses undefined key: {key}")
+    failed = bool(undefined)
+    report = catalog.missing_keys()
+    for code in catalog.files:
+        chain = ' -> '.join(catalog.fallback_chain(code))
+        missing, unknown = report.get(code, ([], []))
+        print(f"{code} ({chain}): {len(catalog.files[code]['messages'])} messages, "
+              f"{len(missing)} missing, {len(unknown)} unknown")
+        for key in missing:
+            print(f"  missing: {key}")
+        for key in unknown:
+            print(f"  unknown: {key}")
+        failed = failed or bool(unknown) or (args.strict and bool(missing))
+    sys.exit(1 if failed else 0)
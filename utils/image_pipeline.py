@@ -0,0 +1,149 @@
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow ships with streamlit, but keep the raw-bytes path working without it
+    Image = None
+
+# Magic-number prefixes of the formats the uploader accepts (and a few phones send)
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+]
+
+MAX_IMAGE_SIDE = int(os.getenv('DISEASE_IMAGE_MAX_SIDE', '1280'))
+JPEG_QUALITY = int(os.getenv('DISEASE_IMAGE_QUALITY', '85'))
+
+
+def detect_image_format(image_bytes):
+    """Return the MIME type of an image from its magic bytes (None if unknown)"""
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if image_bytes.startswith(signature):
+            return mime_type
+    if image_bytes[:4] == b'RIFF' and image_bytes[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def decode_image(image_bytes):
+    """
+    Decode an upload once, upright (phone photos are often stored sideways
+    with an EXIF rotation tag). None without Pillow or for unreadable bytes.
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            image = ImageOps.exif_transpose(image)
+            image.load()
+            return image
+    except Exception:
+        return None
+
+
+def prepare_image(image_bytes, max_side=MAX_IMAGE_SIDE, quality=JPEG_QUALITY, image=None):
+    """
+    Downsize and recompress an uploaded image in memory before sending it to
+    the model. Returns (bytes, mime_type); images already within max_side are
+    sent unchanged. Pass the decode_image result to avoid decoding again.
+    """
+    mime_type = detect_image_format(image_bytes) or 'image/jpeg'
+    image = image if image is not None else decode_image(image_bytes)
+    if image is None or max(image.size) <= max_side:
+        return image_bytes, mime_type
+
+    try:
+        image = image.copy()
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=quality, optimize=True)
+        return output.getvalue(), 'image/jpeg'
+    except Exception:
+        return image_bytes, mime_type
+
+
+def image_fingerprint(image_bytes, image=None):
+    """
+    Hash identifying a photo for the diagnosis cache: a SHA-256 of the upright
+    RGB pixels when the image decodes (so the same photo with different
+    metadata still matches), otherwise a SHA-256 of the raw bytes. Only
+    identical pictures share a diagnosis.
+    """
+    image = image if image is not None else decode_image(image_bytes)
+    if image is not None:
+        try:
+            pixels = image if image.mode == 'RGB' else image.convert('RGB')
+            digest = hashlib.sha256(f"{pixels.width}x{pixels.height}:".encode())
+            digest.update(pixels.tobytes())
+            return f"rgb-sha256:{digest.hexdigest()}"
+        except Exception:
+            pass
+    return f"sha256:{hashlib.sha256(image_bytes).hexdigest()}"
+
+
+class DiagnosisCache:
+    """Persistent cache of disease diagnoses keyed by image fingerprint and language"""
+
+    def __init__(self, path='diagnosis_cache.db', ttl=30 * 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS diagnoses ('
+            'fingerprint TEXT NOT NULL, language TEXT NOT NULL, diagnosis TEXT NOT NULL, '
+            'created_at REAL NOT NULL, PRIMARY KEY (fingerprint, language))'
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, fingerprint, language):
+        row = self._connect().execute(
+            'SELECT diagnosis FROM diagnoses WHERE fingerprint = ? AND language = ? AND created_at >= ?',
+            (fingerprint, language, time.time() - self.ttl)
+        ).fetchone()
+        if row:
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, fingerprint, language, diagnosis):
+        self._connect().execute(
+            'INSERT OR REPLACE INTO diagnoses (fingerprint, language, diagnosis, created_at) '
+            'VALUES (?, ?, ?, ?)',
+            (fingerprint, language, diagnosis, time.time())
+        )
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_diagnosis_cache():
+    """Return the process-wide diagnosis cache (path from DIAGNOSIS_CACHE_PATH)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiagnosisCache(os.getenv('DIAGNOSIS_CACHE_PATH', 'diagnosis_cache.db'))
+    return _cache
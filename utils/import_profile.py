@@ -0,0 +1,158 @@
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from utils.lazy_imports import is_available
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time: self [us] | cumulative | imported package", with two spaces of
+# indentation per nesting level before the module name
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$')
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `python -X importtime` output"""
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            depth = (len(match.group(3)) - 1) // 2
+            entries.append((match.group(4), int(match.group(1)), int(match.group(2)), depth))
+    return entries
+
+
+def startup_imports(app_path=None):
+    """Modules app.py imports at module level, i.e. on every cold start"""
+    app_path = app_path or os.path.join(ROOT, 'app.py')
+    with open(app_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            # `from utils import section_data` imports the submodule, not just the package
+            for alias in node.names:
+                submodule = f"{node.module}.{alias.name}"
+                modules.append(submodule if is_available(submodule) else node.module)
+    return list(dict.fromkeys(modules))
+
+
+def profile_imports(modules, python=None):
+    """
+    Import modules in a fresh interpreter under -X importtime. Returns
+    (entries, wall_seconds) where entries come from parse_importtime.
+    """
+    code = '; '.join(f'import {module}' for module in modules)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [python or sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import failed')
+    return parse_importtime(result.stderr), wall
+
+
+def measure_first_paint(app_path=None, python=None):
+    """Seconds for the first full script run of the app, in a fresh interpreter"""
+    app_path = app_path or os.path.join(ROOT, 'app.py')
+    code = (
+        'import time\n'
+        'from streamlit.testing.v1 import AppTest\n'
+        f'app = AppTest.from_file({app_path!r}, default_timeout=120)\n'
+        'start = time.perf_counter()\n'
+        'app.run()\n'
+        'print(time.perf_counter() - start)\n'
+    )
+    result = subprocess.run([python or sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'app run failed')
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(entries, top=15):
+    """Total import time plus the slowest modules by cumulative and by self time"""
+    total_us = sum(cumulative for _, _, cumulative, depth in entries if depth == 0)
+    by_cumulative = sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+    by_self = sorted(entries, key=lambda entry: entry[1], reverse=True)[:top]
+    return {
+        'total_ms': round(total_us / 1000, 1),
+        'modules': len(entries),
+        'top_cumulative': [(module, round(cumulative / 1000, 1)) for module, _, cumulative, _ in by_cumulative],
+        'top_self': [(module, round(self_us / 1000, 1)) for module, self_us, _, _ in by_self],
+    }
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def record(path, run):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run) + '\n')
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Profile the app's cold-start imports with python -X importtime and track them over runs"
+    )
+    parser.add_argument('modules', nargs='*', help="modules to profile (default: app.py's module-level imports)")
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--first-paint', action='store_true', help="also time the app's first script run")
+    parser.add_argument('--history', default=os.getenv('IMPORT_PROFILE_HISTORY', 'import_profile.jsonl'),
+                        help="JSON-lines file runs are appended to and compared against")
+    parser.add_argument('--no-record', action='store_true')
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('IMPORT_BUDGET_MS', '0')),
+                        help="exit non-zero when total import time exceeds this (0 disables)")
+    args = parser.parse_args()
+
+    modules = args.modules or startup_imports()
+    entries, wall = profile_imports(modules)
+    summary = summarize(entries, args.top)
+
+    print(f"Imports: {', '.join(modules)}")
+    print(f"{summary['modules']} modules, {summary['total_ms']} ms import time, {wall * 1000:.0f} ms interpreter wall time")
+    print("\nSlowest by cumulative time (ms):")
+    for module, ms in summary['top_cumulative']:
+        print(f"  {ms:8.1f}  {module}")
+    print("\nSlowest by self time (ms):")
+    for module, ms in summary['top_self']:
+        print(f"  {ms:8.1f}  {module}")
+
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'modules': modules,
+        'import_ms': summary['total_ms'],
+        'wall_ms': round(wall * 1000, 1),
+        'module_count': summary['modules'],
+    }
+    if args.first_paint:
+        run['first_paint_ms'] = round(measure_first_paint() * 1000, 1)
+        print(f"\nFirst paint: {run['first_paint_ms']} ms")
+
+    history = load_history(args.history)
+    if history:
+        previous = history[-1]
+        print(f"\nSince {previous['timestamp']}:")
+        for key in ('import_ms', 'wall_ms', 'first_paint_ms'):
+            if key in run and key in previous:
+                print(f"  {key}: {previous[key]} -> {run[key]} ({run[key] - previous[key]:+.1f})")
+    if not args.no_record:
+        record(args.history, run)
+
+    if args.budget_ms and summary['total_ms'] > args.budget_ms:
+        print(f"\nImport time {summary['total_ms']} ms is over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
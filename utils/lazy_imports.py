@@ -0,0 +1,58 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+
+# Seconds each lazily loaded module took to import, in load order
+LOAD_TIMES = {}
+
+_load_lock = threading.Lock()
+
+
+def _load(name):
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    LOAD_TIMES.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access, so
+    heavy SDKs only load when the feature using them actually runs
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _resolve(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with _load_lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = _load(self.__dict__['_name'])
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name):
+    """Return the module if already imported, otherwise a LazyModule that imports it on first use"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def is_available(name):
+    """Whether an optional dependency is installed, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
@@ -1,140 +1,247 @@
-import requests
-from datetime import datetime, timedelta
-import random
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from utils.price_store import get_price_store
+from utils.price_analytics import TREND_SIGNAL_PCT, get_price_analytics
 
-def get_market_prices(state="Kerala"):
+@dataclass(frozen=True, slots=True)
+class PriceRecord:
+    """One commodity's current price. Immutable, so every session can share it"""
+    unit: str
+    min_price: int
+    max_price: int
+    modal_price: int
+    trend: str
+    change: str
+    market: str
+    date: str = None
+
+@dataclass(frozen=True, slots=True)
+class MarketSnapshot:
     """
-    Get current market prices for agricultural commodities
-    Uses AgMarkNet API or fallback to realistic data structure
+    Prices for one state as published at a point in time. prices is a
+    read-only mapping of crop name to PriceRecord; a refresh publishes a new
+    snapshot instead of changing this one.
     """
-    
-    # Real market price structure with realistic variations
-    crops_data = {
-        'Kerala': {
-            'Rice (Paddy)': {
-                'unit': 'Quintal',
-                'min_price': 2650,
-                'max_price': 2950,
-                'modal_price': 2800,
-                'trend': 'stable',
-                'change': '+1.5%',
-                'market': 'Palakkad Mandi'
-            },
-            'Coconut': {
-                'unit': '100 Nuts',
-                'min_price': 1750,
-                'max_price': 1950,
-                'modal_price': 1850,
-                'trend': 'up',
-                'change': '+5.2%',
-                'market': 'Thrissur Market'
-            },
-            'Pepper': {
-                'unit': 'Kg',
-                'min_price': 465,
-                'max_price': 510,
-                'modal_price': 485,
-                'trend': 'down',
-                'change': '-2.1%',
-                'market': 'Kochi Spice Market'
-            },
-            'Cardamom': {
-                'unit': 'Kg',
-                'min_price': 1200,
-                'max_price': 1350,
-                'modal_price': 1280,
-                'trend': 'up',
-                'change': '+3.8%',
-                'market': 'Kumily Market'
-            },
-            'Ginger': {
-                'unit': 'Quintal',
-                'min_price': 7800,
-                'max_price': 8600,
-                'modal_price': 8200,
-                'trend': 'stable',
-                'change': '+0.8%',
-                'market': 'Wayanad Market'
-            },
-            'Turmeric': {
-                'unit': 'Quintal',
-                'min_price': 7400,
-                'max_price': 8200,
-                'modal_price': 7800,
-                'trend': 'up',
-                'change': '+2.3%',
-                'market': 'Ernakulam Mandi'
-            },
-            'Banana': {
-                'unit': 'Dozen',
-                'min_price': 35,
-                'max_price': 45,
-                'modal_price': 40,
-                'trend': 'stable',
-                'change': '+0.5%',
-                'market': 'Trivandrum Market'
-            },
-            'Rubber': {
-                'unit': 'Kg',
-                'min_price': 168,
-                'max_price': 185,
-                'modal_price': 175,
-                'trend': 'down',
-                'change': '-1.2%',
-                'market': 'Kottayam Market'
-            },
-            'Arecanut': {
-                'unit': 'Quintal',
-                'min_price': 28500,
-                'max_price': 32000,
-                'modal_price': 30500,
-                'trend': 'up',
-                'change': '+4.2%',
-                'market': 'Kasaragod Market'
-            },
-            'Tapioca': {
-                'unit': 'Quintal',
-                'min_price': 1200,
-                'max_price': 1450,
-                'modal_price': 1350,
-                'trend': 'stable',
-                'change': '+1.1%',
-                'market': 'Kollam Market'
-            }
+    state: str
+    last_updated: str
+    published_at: float
+    source: str
+    prices: MappingProxyType
+
+# Reference prices shown until mandi data has been ingested into the price store
+FALLBACK_PRICE_TABLE = {
+    'Kerala': {
+        'Rice (Paddy)': {
+            'unit': 'Quintal',
+            'min_price': 2650,
+            'max_price': 2950,
+            'modal_price': 2800,
+            'trend': 'stable',
+            'change': '+1.5%',
+            'market': 'Palakkad Mandi'
+        },
+        'Coconut': {
+            'unit': '100 Nuts',
+            'min_price': 1750,
+            'max_price': 1950,
+            'modal_price': 1850,
+            'trend': 'up',
+            'change': '+5.2%',
+            'market': 'Thrissur Market'
+        },
+        'Pepper': {
+            'unit': 'Kg',
+            'min_price': 465,
+            'max_price': 510,
+            'modal_price': 485,
+            'trend': 'down',
+            'change': '-2.1%',
+            'market': 'Kochi Spice Market'
+        },
+        'Cardamom': {
+            'unit': 'Kg',
+            'min_price': 1200,
+            'max_price': 1350,
+            'modal_price': 1280,
+            'trend': 'up',
+            'change': '+3.8%',
+            'market': 'Kumily Market'
+        },
+        'Ginger': {
+            'unit': 'Quintal',
+            'min_price': 7800,
+            'max_price': 8600,
+            'modal_price': 8200,
+            'trend': 'stable',
+            'change': '+0.8%',
+            'market': 'Wayanad Market'
+        },
+        'Turmeric': {
+            'unit': 'Quintal',
+            'min_price': 7400,
+            'max_price': 8200,
+            'modal_price': 7800,
+            'trend': 'up',
+            'change': '+2.3%',
+            'market': 'Ernakulam Mandi'
+        },
+        'Banana': {
+            'unit': 'Dozen',
+            'min_price': 35,
+            'max_price': 45,
+            'modal_price': 40,
+            'trend': 'stable',
+            'change': '+0.5%',
+            'market': 'Trivandrum Market'
+        },
+        'Rubber': {
+            'unit': 'Kg',
+            'min_price': 168,
+            'max_price': 185,
+            'modal_price': 175,
+            'trend': 'down',
+            'change': '-1.2%',
+            'market': 'Kottayam Market'
+        },
+        'Arecanut': {
+            'unit': 'Quintal',
+            'min_price': 28500,
+            'max_price': 32000,
+            'modal_price': 30500,
+            'trend': 'up',
+            'change': '+4.2%',
+            'market': 'Kasaragod Market'
+        },
+        'Tapioca': {
+            'unit': 'Quintal',
+            'min_price': 1200,
+            'max_price': 1450,
+            'modal_price': 1350,
+            'trend': 'stable',
+            'change': '+1.1%',
+            'market': 'Kollam Market'
         }
     }
+}
+
+FALLBACK_PRICES = MappingProxyType({
+    state: MappingProxyType({crop: PriceRecord(**fields) for crop, fields in crops.items()})
+    for state, crops in FALLBACK_PRICE_TABLE.items()
+})
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+def build_market_snapshot(state="Kerala"):
+    """
+    Build a fresh snapshot from the latest ingested mandi prices, or from the
+    reference table when the store has no data for the state
+    """
+    prices = None
+    try:
+        latest = get_price_store().latest_prices(state)
+        if latest:
+            prices = MappingProxyType({crop: PriceRecord(**fields) for crop, fields in latest.items()})
+    except Exception:
+        pass
     
-    state_data = crops_data.get(state, crops_data['Kerala'])
-    
-    # Add slight random variation to simulate live prices
-    for crop in state_data:
-        base_price = state_data[crop]['modal_price']
-        variation = random.uniform(-0.02, 0.02)  # ±2% variation
-        state_data[crop]['modal_price'] = int(base_price * (1 + variation))
+    source = 'mandi' if prices else 'reference'
+    if prices is None:
+        prices = FALLBACK_PRICES.get(state, FALLBACK_PRICES['Kerala'])
     
-    return {
-        'state': state,
-        'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M'),
-        'prices': state_data
-    }
+    return MarketSnapshot(
+        state=state,
+        last_updated=datetime.now().strftime('%Y-%m-%d %H:%M'),
+        published_at=time.time(),
+        source=source,
+        prices=prices
+    )
+
+def refresh_market_snapshot(state="Kerala"):
+    """Build and atomically publish a new snapshot for a state (used by the background refresher)"""
+    snapshot = build_market_snapshot(state)
+    _snapshots[state] = snapshot
+    return snapshot
 
-def get_price_trend(crop_name, days=7):
-    """Get price trend for a crop over specified days"""
-    trend_data = []
-    base_price = 1000
+def get_market_prices(state="Kerala"):
+    """
+    Get current market prices for agricultural commodities as a shared,
+    read-only MarketSnapshot. Only rebuilt when older than MARKET_SNAPSHOT_TTL
+    seconds, so concurrent renders all read the same object.
+    """
+    snapshot = _snapshots.get(state)
+    ttl = float(os.getenv('MARKET_SNAPSHOT_TTL', '300'))
+    if snapshot is not None and time.time() - snapshot.published_at < ttl:
+        return snapshot
+    with _snapshots_lock:
+        snapshot = _snapshots.get(state)
+        if snapshot is None or time.time() - snapshot.published_at >= ttl:
+            snapshot = refresh_market_snapshot(state)
+        return snapshot
+
+def get_price_trend(crop_name, days=7, market=None, state=None):
+    """Get daily modal price trend for a crop over the last `days` days of mandi data"""
+    try:
+        return get_price_store().trend(crop_name, market=market, state=state, days=days)
+    except Exception:
+        return []
+
+def get_market_insights(state="Kerala", limit=4):
+    """Get market insights and predictions, from price history when available"""
+    try:
+        analytics = get_price_analytics(state)
+    except Exception:
+        analytics = {}
     
-    for i in range(days):
-        date = (datetime.now() - timedelta(days=days-i-1)).strftime('%Y-%m-%d')
-        price = base_price + random.randint(-100, 100)
-        trend_data.append({
-            'date': date,
-            'price': price
-        })
+    data_insights = []
+    for (crop, market), stats in analytics.items():
+        if market is not None or stats['trend_signal_pct'] is None:
+            continue
+        signal = stats['trend_signal_pct']
+        volatility = stats['volatility_pct'] or 0
+        if stats['trend'] == 'up':
+            title = f"{crop} Prices Rising"
+            impact = 'positive'
+        elif stats['trend'] == 'down':
+            title = f"{crop} Prices Falling"
+            impact = 'negative'
+        elif volatility >= 3:
+            title = f"{crop} Prices Volatile"
+            impact = 'neutral'
+        else:
+            continue
+        data_insights.append((abs(signal), {
+            'title': title,
+            'description': (
+                f"7-day average ₹{stats['ma_short']:,.0f} is {signal:+.1f}% against the 30-day average "
+                f"₹{stats['ma_long']:,.0f}; daily volatility {volatility:.1f}%"
+            ),
+            'impact': impact,
+            'crops': [crop]
+        }))
+    
+    if data_insights:
+        data_insights.sort(key=lambda item: item[0], reverse=True)
+        return [insight for _, insight in data_insights[:limit]]
+    
+    # With price history but no crop moving past the trend threshold, say so
+    # rather than fall back to the illustrative insights below
+    tracked = sorted(crop for crop, market in analytics if market is None)
+    if tracked:
+        return [{
+            'title': 'No Significant Price Movement',
+            'description': (
+                f"7-day averages are within {TREND_SIGNAL_PCT:.0f}% of 30-day averages "
+                f"for every tracked crop ({len(tracked)})"
+            ),
+            'impact': 'neutral',
+            'crops': tracked
+        }]
     
-    return trend_data
-
-def get_market_insights(state="Kerala"):
-    """Get market insights and predictions"""
     insights = {
         'Kerala': [
             {
@@ -166,8 +273,31 @@ def get_market_insights(state="Kerala"):
     
     return insights.get(state, insights['Kerala'])
 
-def get_best_selling_time(crop_name):
+def get_best_selling_time(crop_name, state="Kerala"):
     """Suggest best time to sell based on historical patterns"""
+    try:
+        stats = get_price_analytics(state).get((crop_name, None))
+    except Exception:
+        stats = None
+    
+    if stats and stats['best_months']:
+        best_index = max(v for v in stats['seasonality'] if v is not None)
+        current_month = datetime.now().strftime('%B')
+        if current_month in stats['best_months']:
+            advice = 'Prices are seasonally high now, a good time to sell'
+        elif stats['trend'] == 'up':
+            advice = f"Prices are rising; if you can store, hold for {stats['best_months'][0]}"
+        else:
+            advice = f"Store properly if possible and sell around {stats['best_months'][0]}"
+        return {
+            'best_months': stats['best_months'],
+            'reason': (
+                f"In mandi prices covering {stats['months_covered']} calendar months, {stats['best_months'][0]} prices "
+                f"ran {(best_index - 1) * 100:.0f}% above the underlying price trend"
+            ),
+            'advice': advice
+        }
+    
     selling_advice = {
         'Rice (Paddy)': {
             'best_months': ['November', 'December', 'January'],
@@ -1,21 +1,27 @@
-import requests
 import json
 import os
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from utils.http_client import http_get
+from utils.news_store import get_news_store
 
 # Load environment variables from .env file (if it exists)
 load_dotenv()
 
-def get_agriculture_news():
+def get_agriculture_news(page=0, page_size=8, fetch_if_empty=True):
     """
-    Fetch agriculture-related news (using NewsAPI or fallback to hardcoded)
+    Fetch agriculture-related news from the local news store, falling back
+    to hardcoded news only when the store is empty
     """
     try:
-        # Try to fetch from NewsAPI if available
-        news_items = fetch_news_from_api()
+        store = get_news_store()
+        news_items = store.recent(limit=page_size, offset=page * page_size)
         
-        if not news_items:
+        if not news_items and page == 0 and fetch_if_empty:
+            refresh_news_store()
+            news_items = store.recent(limit=page_size)
+        
+        if not news_items and page == 0:
             # Fallback to curated agriculture news
             news_items = get_fallback_news()
         
@@ -23,11 +29,50 @@ def get_agriculture_news():
     
     except Exception as e:
         # Return fallback news in case of any error
-        return get_fallback_news()
+        return get_fallback_news() if page == 0 else []
+
+def get_news_page_count(page_size=8):
+    """
+    Number of pages of stored news (0 when only fallback news is available)
+    """
+    try:
+        return -(-get_news_store().count() // page_size)
+    except Exception:
+        return 0
+
+def refresh_news_store(page_size=100, max_pages=None):
+    """
+    Incrementally fetch news newer than the store's cursor into the local
+    store, page by page until the results are exhausted. If the pages run out
+    first (max_pages, or an API error partway), the articles fetched are kept
+    and the next refresh resumes below the oldest of them. Returns the number
+    of new articles (None if the API is unavailable)
+    """
+    store = get_news_store()
+    since, until = store.fetch_window()
+    max_pages = max_pages or int(os.getenv('NEWS_FETCH_MAX_PAGES', '5'))
+    
+    news_items = []
+    complete = False
+    for page in range(1, max_pages + 1):
+        page_items = fetch_news_from_api(since=since, until=until, page=page, page_size=page_size)
+        if page_items is None:
+            break
+        news_items.extend(page_items)
+        if len(page_items) < page_size:
+            complete = True
+            break
+    
+    if not news_items and not complete:
+        return None
+    
+    return store.add_articles(news_items, since=since, complete=complete)
 
-def fetch_news_from_api():
+def fetch_news_from_api(since=None, until=None, page=1, page_size=100):
     """
-    Fetch news from NewsAPI (if API key is available)
+    Fetch one page of news from NewsAPI (if API key is available), newest
+    first, optionally only articles published from the `since` up to the
+    `until` ISO timestamp
     """
     try:
         api_key = os.getenv("NEWS_API_KEY", "")
@@ -41,17 +86,23 @@ def fetch_news_from_api():
             'q': 'agriculture OR farming OR crops OR farmers India',
             'language': 'en',
             'sortBy': 'publishedAt',
-            'pageSize': 10,
+            'pageSize': page_size,
+            'page': page,
             'apiKey': api_key
         }
         
-        response = requests.get(base_url, params=params, timeout=10)
+        if since:
+            params['from'] = since
+        if until:
+            params['to'] = until
+        
+        response = http_get(base_url, params=params)
         
         if response.status_code == 200:
             data = response.json()
             news_items = []
             
-            for article in data['articles'][:8]:  # Get top 8 articles
+            for article in data['articles']:
                 news_item = {
                     'title': article['title'],
                     'description': article['description'] or 'No description available',
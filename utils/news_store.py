@@ -0,0 +1,179 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    description TEXT,
+    source TEXT,
+    published_at TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published_at);
+CREATE INDEX IF NOT EXISTS idx_articles_title_key ON articles(title_key);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Titles sharing at least this fraction of words count as the same story
+TITLE_SIMILARITY = 0.8
+# How many of the newest stored titles a new article is compared against
+DEDUP_WINDOW = 300
+
+
+def title_key(title):
+    """Normalized title used to spot the same story syndicated under different URLs"""
+    title = unicodedata.normalize('NFKC', title or '').lower()
+    # Syndicated copies often append " - Source Name" or " | Source Name"
+    title = re.split(r'\s+[-|–]\s+[^-|–]+$', title)[0]
+    title = ''.join(ch if ch.isalnum() or ch.isspace() else ' ' for ch in title)
+    return ' '.join(title.split())
+
+
+def _title_similarity(a, b):
+    words_a, words_b = set(a.split()), set(b.split())
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+class NewsStore:
+    """Local SQLite store of news articles, de-duplicated by URL and near-duplicate title"""
+
+    def __init__(self, path='news.db'):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def latest_published_at(self):
+        """publishedAt of the newest stored article"""
+        row = self._connect().execute('SELECT MAX(published_at) FROM articles').fetchone()
+        return row[0]
+
+    def _meta(self, conn, key):
+        row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def fetch_window(self):
+        """
+        (since, until) for the next incremental fetch. Everything published
+        before since is stored. until is set while a fetch that ran out of
+        pages left a gap: articles from since up to until are still missing.
+        """
+        conn = self._connect()
+        cursor = conn.execute("SELECT value FROM meta WHERE key = 'cursor'").fetchone()
+        if cursor is None:
+            # Stores from before the window was kept: everything up to the newest article is in
+            return self.latest_published_at(), None
+        return cursor[0], self._meta(conn, 'pending_until')
+
+    def add_articles(self, articles, since=None, complete=None):
+        """
+        Insert new articles, skipping known URLs and near-duplicate titles.
+        Returns the number added. With complete set, the articles are the
+        result of a fetch from since (see fetch_window) and the window moves
+        in the same transaction: the cursor to the newest stored article if
+        the fetch was exhausted, otherwise the gap shrinks to end at the
+        oldest article it reached.
+        """
+        conn = self._connect()
+        added = 0
+        with self._write_lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                recent_keys = [
+                    row[0] for row in conn.execute(
+                        'SELECT title_key FROM articles ORDER BY published_at DESC LIMIT ?',
+                        (DEDUP_WINDOW,)
+                    )
+                ]
+                for article in articles:
+                    if not article.get('url') or not article.get('title'):
+                        continue
+                    key = title_key(article['title'])
+                    if conn.execute('SELECT 1 FROM articles WHERE url = ?', (article['url'],)).fetchone():
+                        continue
+                    if any(_title_similarity(key, other) >= TITLE_SIMILARITY for other in recent_keys):
+                        continue
+                    conn.execute(
+                        'INSERT INTO articles (url, title, title_key, description, source, published_at, fetched_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (article['url'], article['title'], key, article.get('description'),
+                         article.get('source'), article.get('published_at') or '', time.time())
+                    )
+                    recent_keys.append(key)
+                    added += 1
+                if complete is not None:
+                    self._advance_window(conn, articles, since, complete)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return added
+
+    def _advance_window(self, conn, articles, since, complete):
+        if complete:
+            cursor = conn.execute('SELECT MAX(published_at) FROM articles').fetchone()[0]
+            pending_until = None
+        else:
+            # Pages come newest first, so what's missing lies below the oldest one fetched
+            cursor = since
+            published = [article['published_at'] for article in articles if article.get('published_at')]
+            pending_until = min(published) if published else self._meta(conn, 'pending_until')
+        conn.executemany(
+            'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+            [('cursor', cursor), ('pending_until', pending_until)]
+        )
+
+    def recent(self, limit=8, offset=0):
+        """A page of the newest articles, in the same dict shape as fetch_news_from_api"""
+        rows = self._connect().execute(
+            'SELECT title, description, source, published_at, url FROM articles '
+            'ORDER BY published_at DESC LIMIT ? OFFSET ?',
+            (limit, offset)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def articles_after(self, rowid=0, limit=500):
+        """Articles stored after the given rowid, oldest first, for incremental consumers like the search index"""
+        rows = self._connect().execute(
+            'SELECT rowid, title, description, source, published_at, url FROM articles '
+            'WHERE rowid > ? ORDER BY rowid LIMIT ?',
+            (rowid, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        return self._connect().execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_news_store():
+    """Return the process-wide news store (path from NEWS_DB_PATH)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = NewsStore(os.getenv('NEWS_DB_PATH', 'news.db'))
+    return _store
@@ -0,0 +1,187 @@
+import hashlib
+import hmac
+import os
+import secrets
+
+# Stored hashes are tagged with their algorithm and parameters:
+#   scrypt$<n>$<r>$<p>$<salt hex>$<hash hex>
+#   pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>
+# Untagged 64-character hex strings are legacy unsalted SHA-256 hashes.
+
+SALT_BYTES = 16
+
+
+class ScryptHasher:
+    """scrypt with a per-user salt; cost is the CPU/memory parameter n (a power of two)"""
+
+    algorithm = 'scrypt'
+
+    def __init__(self, n=2 ** 14, r=8, p=1):
+        self.n = n
+        self.r = r
+        self.p = p
+
+    def _derive(self, password, salt, n, r, p):
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p,
+            maxmem=256 * n * r + 1024 * 1024, dklen=32
+        )
+
+    def hash(self, password):
+        salt = secrets.token_bytes(SALT_BYTES)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.algorithm}${self.n}${self.r}${self.p}${salt.hex()}${digest.hex()}"
+
+    def verify(self, password, stored):
+        _, n, r, p, salt, digest = stored.split('$')
+        candidate = self._derive(password, bytes.fromhex(salt), int(n), int(r), int(p))
+        return hmac.compare_digest(candidate.hex(), digest)
+
+    def needs_rehash(self, stored):
+        _, n, r, p, _, _ = stored.split('$')
+        return (int(n), int(r), int(p)) != (self.n, self.r, self.p)
+
+
+class PBKDF2Hasher:
+    """PBKDF2-HMAC-SHA256 with a per-user salt; cost is the iteration count"""
+
+    algorithm = 'pbkdf2_sha256'
+
+    def __init__(self, iterations=600000):
+        self.iterations = iterations
+
+    def _derive(self, password, salt, iterations):
+        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+
+    def hash(self, password):
+        salt = secrets.token_bytes(SALT_BYTES)
+        digest = self._derive(password, salt, self.iterations)
+        return f"{self.algorithm}${self.iterations}${salt.hex()}${digest.hex()}"
+
+    def verify(self, password, stored):
+        _, iterations, salt, digest = stored.split('$')
+        candidate = self._derive(password, bytes.fromhex(salt), int(iterations))
+        return hmac.compare_digest(candidate.hex(), digest)
+
+    def needs_rehash(self, stored):
+        return int(stored.split('$')[1]) != self.iterations
+
+
+class LegacySHA256Hasher:
+    """Unsalted single-round SHA-256 used before hashes were tagged. Verify only"""
+
+    algorithm = 'sha256'
+
+    def hash(self, password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password, stored):
+        return hmac.compare_digest(self.hash(password), stored)
+
+    def needs_rehash(self, stored):
+        return True
+
+
+HASHERS = {
+    ScryptHasher.algorithm: ScryptHasher,
+    PBKDF2Hasher.algorithm: PBKDF2Hasher,
+}
+
+
+def get_hasher(algorithm=None, cost=None):
+    """
+    Build a hasher for new passwords. Defaults come from PASSWORD_HASHER
+    ("scrypt" or "pbkdf2_sha256") and PASSWORD_HASH_COST (scrypt n or
+    PBKDF2 iterations) so each deployment can pick its own work factor.
+    """
+    algorithm = algorithm or os.getenv('PASSWORD_HASHER', ScryptHasher.algorithm)
+    if algorithm not in HASHERS:
+        raise ValueError(f"Unknown password hasher: {algorithm}")
+
+    if cost is None and os.getenv('PASSWORD_HASH_COST'):
+        cost = int(os.getenv('PASSWORD_HASH_COST'))
+
+    if cost is None:
+        return HASHERS[algorithm]()
+    if algorithm == ScryptHasher.algorithm:
+        return ScryptHasher(n=cost)
+    return PBKDF2Hasher(iterations=cost)
+
+
+default_hasher = get_hasher()
+
+
+def identify_hasher(stored):
+    """Pick the hasher that can verify a stored hash from its algorithm tag"""
+    algorithm = stored.split('$', 1)[0] if '$' in stored else LegacySHA256Hasher.algorithm
+    if algorithm == LegacySHA256Hasher.algorithm:
+        return LegacySHA256Hasher()
+    if algorithm not in HASHERS:
+        raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+    return HASHERS[algorithm]()
+
+
+def hash_password(password, hasher=None):
+    """Hash a password with the deployment's hasher"""
+    return (hasher or default_hasher).hash(password)
+
+
+def verify_password(password, stored):
+    """Check a password against a stored hash of any supported algorithm"""
+    try:
+        return identify_hasher(stored).verify(password, stored)
+    except ValueError:
+        return False
+
+
+def needs_rehash(stored, hasher=None):
+    """True if the stored hash uses a different algorithm or cost than the current hasher"""
+    hasher = hasher or default_hasher
+    if identify_hasher(stored).algorithm != hasher.algorithm:
+        return True
+    return hasher.needs_rehash(stored)
+
+
+def benchmark(algorithm, costs, rounds=20):
+    """Time verify_password (the work done by a login) at each cost setting"""
+    import statistics
+    import time
+
+    results = []
+    for cost in costs:
+        stored = hash_password('benchmark-password', get_hasher(algorithm, cost))
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            verify_password('benchmark-password', stored)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results.append({
+            'algorithm': algorithm,
+            'cost': cost,
+            'mean_ms': statistics.mean(timings),
+            'p50_ms': timings[len(timings) // 2],
+            'p99_ms': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        })
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report login latency at each password hashing cost")
+    parser.add_argument('--algorithm', default=ScryptHasher.algorithm, choices=sorted(HASHERS))
+    parser.add_argument('--costs', type=int, nargs='*')
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    default_costs = {
+        ScryptHasher.algorithm: [2 ** 12, 2 ** 13, 2 ** 14, 2 ** 15, 2 ** 16],
+        PBKDF2Hasher.algorithm: [100000, 200000, 400000, 600000, 1000000],
+    }
+    costs = args.costs or default_costs[args.algorithm]
+
+    print(f"{'algorithm':<15}{'cost':>10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for row in benchmark(args.algorithm, costs, args.rounds):
+        print(f"{row['algorithm']:<15}{row['cost']:>10}{row['mean_ms']:>10.1f}"
+              f"{row['p50_ms']:>10.1f}{row['p99_ms']:>10.1f}")
@@ -0,0 +1,264 @@
+import heapq
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SnapshotStore:
+    """
+    Latest fetched value per (feed, key). Values are replaced wholesale, never
+    mutated, so readers always see a complete snapshot without copying.
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def get(self, feed, key):
+        """Return (value, fetched_at) or None if the key has never been fetched"""
+        with self._lock:
+            return self._snapshots.get((feed, key))
+
+    def put(self, feed, key, value):
+        with self._lock:
+            self._snapshots[(feed, key)] = (value, time.time())
+
+    def delete(self, feed, key):
+        with self._lock:
+            self._snapshots.pop((feed, key), None)
+
+
+class Feed:
+    """
+    An upstream data source refreshed per key every interval seconds. The
+    keys it starts with are always refreshed; keys added later through
+    track() or read(), or found by discover (a callable run once on the
+    refresher's workers when it starts), are dropped once nobody has read
+    them for idle_ttl seconds (None keeps them forever).
+    """
+
+    def __init__(self, name, fetch, interval, keys=(), jitter=0.1, idle_ttl=None, discover=None):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.jitter = jitter
+        self.idle_ttl = idle_ttl
+        self.discover = discover
+        self.keys = set(keys)
+        self.pinned = frozenset(keys)
+
+    def next_delay(self, failed=False):
+        # Failed fetches retry sooner; jitter spreads refreshes so they don't
+        # all hit the upstream API in the same second
+        base = self.interval / 4 if failed else self.interval
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class BackgroundRefresher:
+    """
+    Scheduler thread plus worker pool that keeps a SnapshotStore warm.
+    Each (feed, key) pair is refetched on its own jittered schedule; a
+    failed fetch keeps the previous snapshot and is retried sooner.
+    """
+
+    def __init__(self, store=None, max_workers=4):
+        self.store = store or SnapshotStore()
+        self.feeds = {}
+        self._queue = []
+        self._scheduled = set()
+        self._errors = {}
+        self._last_read = {}
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._thread = None
+        self._stopped = False
+
+    def add_feed(self, feed):
+        self.feeds[feed.name] = feed
+        for key in list(feed.keys):
+            self.track(feed.name, key)
+
+    def track(self, feed_name, key):
+        """Start refreshing a key (e.g. a newly seen location). Fetches it right away if new"""
+        with self._condition:
+            self._last_read[(feed_name, key)] = time.time()
+            self.feeds[feed_name].keys.add(key)
+            if (feed_name, key) not in self._scheduled:
+                self._schedule(feed_name, key, 0)
+
+    def _schedule(self, feed_name, key, delay):
+        # Caller holds self._condition
+        self._scheduled.add((feed_name, key))
+        heapq.heappush(self._queue, (time.time() + delay, feed_name, key))
+        self._condition.notify()
+
+    def _expired(self, feed, key):
+        if feed.idle_ttl is None or key in feed.pinned:
+            return False
+        return time.time() - self._last_read.get((feed.name, key), 0) > feed.idle_ttl
+
+    def _forget(self, feed, key):
+        # Caller holds self._condition
+        feed.keys.discard(key)
+        self._last_read.pop((feed.name, key), None)
+        self._errors.pop((feed.name, key), None)
+        self.store.delete(feed.name, key)
+
+    def _refresh(self, feed_name, key):
+        feed = self.feeds[feed_name]
+        with self._condition:
+            if self._expired(feed, key):
+                self._forget(feed, key)
+                return
+        error = None
+        try:
+            value = feed.fetch(key)
+            if value is None:
+                error = "No data returned"
+            else:
+                self.store.put(feed_name, key, value)
+        except Exception as e:
+            error = str(e)
+        failed = error is not None
+        if failed:
+            self._errors[(feed_name, key)] = error
+        else:
+            self._errors.pop((feed_name, key), None)
+        with self._condition:
+            if not self._stopped:
+                self._schedule(feed_name, key, feed.next_delay(failed))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped and (not self._queue or self._queue[0][0] > time.time()):
+                    timeout = self._queue[0][0] - time.time() if self._queue else None
+                    self._condition.wait(timeout)
+                if self._stopped:
+                    return
+                _, feed_name, key = heapq.heappop(self._queue)
+                self._scheduled.discard((feed_name, key))
+            try:
+                self._executor.submit(self._refresh, feed_name, key)
+            except RuntimeError:
+                return  # Interpreter is shutting down
+
+    def _discover(self, feed):
+        try:
+            keys = feed.discover()
+        except Exception:
+            return  # Only a warm-up; keys still get tracked as they are read
+        for key in keys:
+            self.track(feed.name, key)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="prefetch-scheduler", daemon=True)
+            self._thread.start()
+            # Discovery may scan a store, so it stays off the caller's (render) thread
+            for feed in self.feeds.values():
+                if feed.discover is not None:
+                    self._executor.submit(self._discover, feed)
+        return self
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._executor.shutdown(wait=False)
+
+    def read(self, feed_name, key):
+        """
+        Latest snapshot value for a key, or None if it hasn't been fetched yet.
+        Never waits on the upstream API; an unknown key is queued for an
+        immediate background fetch.
+        """
+        snapshot = self.store.get(feed_name, key)
+        if snapshot is None:
+            self.track(feed_name, key)
+            return None
+        self._last_read[(feed_name, key)] = time.time()
+        return snapshot[0]
+
+    def tracked_keys(self, feed_name):
+        """Keys a feed currently refreshes"""
+        with self._condition:
+            return sorted(self.feeds[feed_name].keys)
+
+    def last_error(self, feed_name, key):
+        """Error from the most recent failed fetch of a key (None if it succeeded)"""
+        return self._errors.get((feed_name, key))
+
+    def last_updated(self, feed_name, key):
+        snapshot = self.store.get(feed_name, key)
+        return snapshot[1] if snapshot else None
+
+
+def _registered_locations():
+    """Weather locations of every registered user, so their data is warm before they log in"""
+    from utils.user_store import get_user_store
+    from utils.weather_service import location_query
+
+    return {location_query(location) for location in get_user_store().locations()}
+
+
+def _tracked_location_advisories(refresher):
+    """Forecast advisories for every location the weather feed refreshes"""
+    from utils.forecast_analytics import precompute_district_advisories
+    from utils.weather_service import get_forecast
+
+    return precompute_district_advisories(refresher.tracked_keys('weather'), get_forecast)
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def get_refresher():
+    """Return the process-wide refresher, starting it on first use"""
+    global _refresher
+    if _refresher is None:
+        with _refresher_lock:
+            if _refresher is None:
+                from utils.market_prices import refresh_market_snapshot
+                from utils.news_helper import refresh_news_store
+                from utils.weather_service import DEFAULT_LOCATION, refresh_current_weather
+
+                refresher = BackgroundRefresher(
+                    max_workers=int(os.getenv('PREFETCH_WORKERS', '4'))
+                )
+                # Weather is fetched through the shared single-flight cache, so
+                # the feed and direct get_current_weather callers share one
+                # upstream request per location
+                refresher.add_feed(Feed(
+                    'weather', refresh_current_weather,
+                    interval=int(os.getenv('PREFETCH_WEATHER_INTERVAL', '600')),
+                    keys={DEFAULT_LOCATION},
+                    idle_ttl=int(os.getenv('PREFETCH_IDLE_TTL', '86400')),
+                    discover=_registered_locations,
+                ))
+                # Forecast advisories for every tracked weather location, built
+                # in one vectorized pass over the cached forecasts
+                refresher.add_feed(Feed(
+                    'advisories',
+                    lambda key: _tracked_location_advisories(refresher),
+                    interval=int(os.getenv('PREFETCH_ADVISORY_INTERVAL', '1800')),
+                    keys={'all'},
+                ))
+                # News lands in the local news store; the snapshot only records
+                # how many new articles the last fetch added
+                refresher.add_feed(Feed(
+                    'news', lambda key: refresh_news_store(),
+                    interval=int(os.getenv('PREFETCH_NEWS_INTERVAL', '1800')),
+                    keys={'all'},
+                ))
+                refresher.add_feed(Feed(
+                    'market', refresh_market_snapshot,
+                    interval=int(os.getenv('PREFETCH_MARKET_INTERVAL', '300')),
+                    keys={'Kerala'},
+                    idle_ttl=int(os.getenv('PREFETCH_IDLE_TTL', '86400')),
+                ))
+                _refresher = refresher.start()
+    return _refresher
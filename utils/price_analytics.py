@@ -0,0 +1,203 @@
+import calendar
+import os
+import threading
+import warnings
+from datetime import date, timedelta
+import numpy as np
+
+SHORT_WINDOW = 7
+LONG_WINDOW = 30
+VOLATILITY_WINDOW = 30
+# Centred window of the trend prices are divided by before seasonality is read off
+SEASONAL_TREND_WINDOW = 365
+
+# Short moving average this far above/below the long one counts as a trend
+TREND_SIGNAL_PCT = 2.0
+
+# Seasonality needs detrended prices in most months to say anything about the
+# best one (detrending needs half a year of history either side of a price)
+MIN_SEASONAL_MONTHS = 9
+
+MONTH_NAMES = list(calendar.month_name)[1:]
+
+
+class PriceMatrix:
+    """
+    Daily modal prices as a dense (series, days) array on a shared date grid,
+    NaN where a market did not report. One row per (commodity, market), plus a
+    (commodity, None) row averaging every market of the commodity.
+    """
+
+    def __init__(self, rows):
+        if not rows:
+            self.keys = []
+            self.dates = np.array([], dtype='datetime64[D]')
+            self.values = np.empty((0, 0))
+            return
+
+        series = np.array([f"{commodity}\x00{market}" for commodity, market, _, _ in rows])
+        dates = np.array([row[2] for row in rows], dtype='datetime64[D]')
+        prices = np.array([row[3] for row in rows], dtype=np.float64)
+
+        series_keys, row_index = np.unique(series, return_inverse=True)
+        start = dates.min()
+        day_index = (dates - start).astype(np.int64)
+        market_values = np.full((len(series_keys), int(day_index.max()) + 1), np.nan)
+        market_values[row_index, day_index] = prices
+
+        market_keys = [tuple(key.split('\x00', 1)) for key in series_keys]
+        commodities = sorted({commodity for commodity, _ in market_keys})
+        position = {commodity: i for i, commodity in enumerate(commodities)}
+        commodity_of_row = np.array([position[commodity] for commodity, _ in market_keys])
+
+        # Commodity-wide rows: mean over reporting markets, computed for all
+        # commodities at once with bincount-style sums
+        valid = ~np.isnan(market_values)
+        sums = np.zeros((len(commodities), market_values.shape[1]))
+        counts = np.zeros_like(sums)
+        np.add.at(sums, commodity_of_row, np.where(valid, market_values, 0.0))
+        np.add.at(counts, commodity_of_row, valid)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            commodity_values = sums / counts
+
+        self.keys = market_keys + [(commodity, None) for commodity in commodities]
+        self.values = np.vstack([market_values, commodity_values])
+        self.dates = start + np.arange(self.values.shape[1]).astype('timedelta64[D]')
+
+
+def _trailing_nanmean(values, window):
+    """Mean of the non-NaN values in the trailing window ending at each day"""
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0), axis=1)
+    counts = np.cumsum(valid, axis=1)
+    pad = np.zeros((values.shape[0], window))
+    sums = sums - np.concatenate([pad, sums], axis=1)[:, :sums.shape[1]]
+    counts = counts - np.concatenate([pad, counts], axis=1)[:, :counts.shape[1]]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+
+def _centered_nanmean(values, window):
+    """
+    Mean of the non-NaN values in the window centred on each day; NaN where
+    the window runs past either end of the series
+    """
+    half = window // 2
+    valid = ~np.isnan(values)
+    pad = np.zeros((values.shape[0], 1))
+    sums = np.concatenate([pad, np.cumsum(np.where(valid, values, 0.0), axis=1)], axis=1)
+    counts = np.concatenate([pad, np.cumsum(valid, axis=1)], axis=1)
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] > 2 * half:
+        window_sums = sums[:, 2 * half + 1:] - sums[:, :-2 * half - 1]
+        window_counts = counts[:, 2 * half + 1:] - counts[:, :-2 * half - 1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[:, half:values.shape[1] - half] = window_sums / window_counts
+    return result
+
+
+def _forward_fill(values):
+    """Carry the last reported price forward over days a market did not report"""
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = values[np.arange(values.shape[0])[:, None], index]
+    filled[~np.maximum.accumulate(valid, axis=1)] = np.nan
+    return filled
+
+
+def compute_analytics(matrix):
+    """
+    Moving averages, volatility, month-of-year seasonality and trend signal
+    for every series of a PriceMatrix in one vectorized pass. Returns
+    {(commodity, market): {...}} with market None for commodity-wide figures.
+    """
+    if not matrix.keys:
+        return {}
+
+    values = matrix.values
+    # Series without data in a window yield NaN; numpy's empty-slice warnings add nothing
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return _compute(matrix, values)
+
+
+def _compute(matrix, values):
+    short_ma = _trailing_nanmean(values, SHORT_WINDOW)[:, -1]
+    long_ma = _trailing_nanmean(values, LONG_WINDOW)[:, -1]
+
+    # Volatility: standard deviation of daily log returns over the last window
+    filled = _forward_fill(values)
+    returns = np.diff(np.log(filled), axis=1)[:, -VOLATILITY_WINDOW:]
+    volatility = np.nanstd(returns, axis=1) * 100 if returns.size else np.full(len(matrix.keys), np.nan)
+
+    # Seasonality: each price relative to the centred 12-month trend around
+    # it (so a rising or falling market doesn't favour the months at its
+    # end), averaged per calendar month and scaled to average 1
+    ratios = values / _centered_nanmean(values, SEASONAL_TREND_WINDOW)
+    months = (matrix.dates.astype('datetime64[M]').astype(np.int64) % 12)
+    valid = ~np.isnan(ratios)
+    rows = len(matrix.keys)
+    flat = (np.arange(rows)[:, None] * 12 + months[None, :])[valid]
+    month_sums = np.bincount(flat, weights=ratios[valid], minlength=rows * 12).reshape(rows, 12)
+    month_counts = np.bincount(flat, minlength=rows * 12).reshape(rows, 12)
+    month_means = month_sums / month_counts
+    seasonality = month_means / np.nanmean(month_means, axis=1)[:, None]
+    signal_pct = (short_ma / long_ma - 1) * 100
+    months_covered = (month_counts > 0).sum(axis=1)
+
+    latest = filled[:, -1]
+    month_order = np.argsort(-np.nan_to_num(seasonality, nan=-np.inf), axis=1)
+
+    result = {}
+    for i, key in enumerate(matrix.keys):
+        signal = signal_pct[i]
+        if np.isnan(signal):
+            trend = 'unknown'
+        elif signal > TREND_SIGNAL_PCT:
+            trend = 'up'
+        elif signal < -TREND_SIGNAL_PCT:
+            trend = 'down'
+        else:
+            trend = 'stable'
+        seasonal = months_covered[i] >= MIN_SEASONAL_MONTHS
+        result[key] = {
+            'latest_price': None if np.isnan(latest[i]) else round(float(latest[i]), 2),
+            'ma_short': None if np.isnan(short_ma[i]) else round(float(short_ma[i]), 2),
+            'ma_long': None if np.isnan(long_ma[i]) else round(float(long_ma[i]), 2),
+            'volatility_pct': None if np.isnan(volatility[i]) else round(float(volatility[i]), 2),
+            'trend': trend,
+            'trend_signal_pct': None if np.isnan(signal) else round(float(signal), 2),
+            'seasonality': [None if np.isnan(v) else round(float(v), 3) for v in seasonality[i]],
+            'best_months': [MONTH_NAMES[m] for m in month_order[i][:3]] if seasonal else [],
+            'months_covered': int(months_covered[i]),
+        }
+    return result
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_price_analytics(state="Kerala"):
+    """
+    Analytics for every commodity/market pair in a state, recomputed at most
+    once per day (prices are published daily). History used is bounded by
+    PRICE_ANALYTICS_YEARS.
+    """
+    from utils.price_store import get_price_store
+
+    today = date.today()
+    cached = _cache.get(state)
+    if cached and cached[0] == today:
+        return cached[1]
+    with _cache_lock:
+        cached = _cache.get(state)
+        if cached and cached[0] == today:
+            return cached[1]
+        years = int(os.getenv('PRICE_ANALYTICS_YEARS', '3'))
+        since = (today - timedelta(days=365 * years)).isoformat()
+        rows = get_price_store().daily_series(state=state, since=since)
+        analytics = compute_analytics(PriceMatrix(rows))
+        _cache[state] = (today, analytics)
+        return analytics
@@ -0,0 +1,378 @@
+import csv
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mandi_prices (
+    commodity TEXT NOT NULL,
+    market TEXT NOT NULL,
+    arrival_date TEXT NOT NULL,
+    variety TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL,
+    district TEXT,
+    min_price REAL,
+    max_price REAL,
+    modal_price REAL NOT NULL,
+    unit TEXT NOT NULL DEFAULT 'Quintal',
+    PRIMARY KEY (commodity, market, arrival_date, variety)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_mandi_prices_state ON mandi_prices(state, commodity, arrival_date);
+CREATE INDEX IF NOT EXISTS idx_mandi_prices_commodity_date ON mandi_prices(commodity, arrival_date);
+"""
+
+# AgMarkNet commodity names mapped to the crop names used across the app
+COMMODITY_ALIASES = {
+    'paddy(dhan)(common)': 'Rice (Paddy)',
+    'paddy(dhan)(basmati)': 'Rice (Paddy)',
+    'coconut': 'Coconut',
+    'black pepper': 'Pepper',
+    'pepper ungarbled': 'Pepper',
+    'cardamoms': 'Cardamom',
+    'ginger(green)': 'Ginger',
+    'turmeric': 'Turmeric',
+    'banana': 'Banana',
+    'rubber': 'Rubber',
+    'arecanut(betelnut/supari)': 'Arecanut',
+    'tapioca': 'Tapioca',
+}
+
+# Normalized CSV/Parquet header prefixes and the column each maps to. Covers
+# the data.gov.in dump ("Min_x0020_Price") and the AgMarkNet portal export
+# ("Min Price (Rs./Quintal)").
+COLUMN_PREFIXES = [
+    ('arrival_date', 'arrival_date'),
+    ('price_date', 'arrival_date'),
+    ('reported_date', 'arrival_date'),
+    ('min_price', 'min_price'),
+    ('max_price', 'max_price'),
+    ('modal_price', 'modal_price'),
+    ('commodity', 'commodity'),
+    ('market', 'market'),
+    ('state', 'state'),
+    ('district', 'district'),
+    ('variety', 'variety'),
+]
+
+DATE_FORMATS = ('%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d', '%d %b %Y', '%d-%b-%Y')
+
+# A change beyond this percentage over the trend window counts as up/down
+TREND_THRESHOLD_PCT = 1.0
+
+INGEST_BATCH_SIZE = 5000
+
+
+def _column_name(header):
+    name = header.strip().lower().replace('_x0020_', '_').replace(' ', '_')
+    for prefix, column in COLUMN_PREFIXES:
+        if name.startswith(prefix):
+            return column
+    return None
+
+
+def _parse_date(value):
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    return _parse_date_text(str(value or '').strip())
+
+
+@lru_cache(maxsize=8192)
+def _parse_date_text(value):
+    # Dumps repeat the same few thousand dates across every market and commodity
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_price(value):
+    try:
+        price = float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+
+def canonical_commodity(name):
+    name = (name or '').strip()
+    return COMMODITY_ALIASES.get(name.lower(), name)
+
+
+def normalize_row(raw):
+    """Map one raw mandi record (any supported header style) to a row tuple, or None if unusable"""
+    row = {}
+    for header, value in raw.items():
+        column = _column_name(header)
+        if column and column not in row:
+            row[column] = value
+    arrival_date = _parse_date(row.get('arrival_date'))
+    modal_price = _parse_price(row.get('modal_price'))
+    if not arrival_date or modal_price is None or not row.get('commodity') or not row.get('market'):
+        return None
+    return (
+        canonical_commodity(row['commodity']),
+        str(row['market']).strip(),
+        arrival_date,
+        str(row.get('variety') or '').strip(),
+        str(row.get('state') or '').strip(),
+        str(row.get('district') or '').strip() or None,
+        _parse_price(row.get('min_price')),
+        _parse_price(row.get('max_price')),
+        modal_price,
+    )
+
+
+class PriceStore:
+    """
+    Daily mandi prices in SQLite, clustered on (commodity, market, date) so
+    latest-price, range and trend queries for one series are index range
+    scans. Prices are Rs. per quintal, as published by AgMarkNet.
+    """
+
+    def __init__(self, path='prices.db'):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def ingest_rows(self, raw_rows):
+        """Insert or replace raw mandi records in batches. Returns (ingested, skipped)"""
+        conn = self._connect()
+        ingested = skipped = 0
+        batch = []
+
+        def flush():
+            with self._write_lock:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO mandi_prices (commodity, market, arrival_date, variety, state, '
+                        'district, min_price, max_price, modal_price) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        batch
+                    )
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+
+        for raw in raw_rows:
+            row = normalize_row(raw)
+            if row is None:
+                skipped += 1
+                continue
+            batch.append(row)
+            if len(batch) >= INGEST_BATCH_SIZE:
+                flush()
+                ingested += len(batch)
+                batch = []
+        if batch:
+            flush()
+            ingested += len(batch)
+        return ingested, skipped
+
+    def ingest_csv(self, path):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            return self.ingest_rows(csv.DictReader(f))
+
+    def ingest_parquet(self, path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("pyarrow is required to ingest Parquet files (pip install pyarrow)")
+
+        def rows():
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=INGEST_BATCH_SIZE):
+                yield from batch.to_pylist()
+
+        return self.ingest_rows(rows())
+
+    def ingest_file(self, path):
+        if path.lower().endswith('.parquet'):
+            return self.ingest_parquet(path)
+        return self.ingest_csv(path)
+
+    def _series_filter(self, commodity, market=None, state=None):
+        clauses, params = ['commodity = ?'], [commodity]
+        if market:
+            clauses.append('market = ?')
+            params.append(market)
+        if state:
+            clauses.append('state = ?')
+            params.append(state)
+        return ' AND '.join(clauses), params
+
+    def latest_date(self, commodity, market=None, state=None):
+        where, params = self._series_filter(commodity, market, state)
+        row = self._connect().execute(f'SELECT MAX(arrival_date) FROM mandi_prices WHERE {where}', params).fetchone()
+        return row[0]
+
+    def latest(self, commodity, market=None, state=None):
+        """Most recent day's min/max/modal price for a commodity, averaged over markets and varieties that day"""
+        latest_date = self.latest_date(commodity, market, state)
+        if latest_date is None:
+            return None
+        where, params = self._series_filter(commodity, market, state)
+        row = self._connect().execute(
+            f'SELECT MIN(min_price) AS min_price, MAX(max_price) AS max_price, AVG(modal_price) AS modal_price, '
+            f'COUNT(DISTINCT market) AS markets FROM mandi_prices '
+            f'WHERE {where} AND arrival_date = ?',
+            params + [latest_date]
+        ).fetchone()
+        return {
+            'date': latest_date,
+            'min_price': row['min_price'],
+            'max_price': row['max_price'],
+            'modal_price': row['modal_price'],
+            'markets': row['markets'],
+        }
+
+    def summary(self, commodity, market=None, state=None, days=30):
+        """Min, max and mean modal price over the last `days` days of available data"""
+        latest_date = self.latest_date(commodity, market, state)
+        if latest_date is None:
+            return None
+        start = (date.fromisoformat(latest_date) - timedelta(days=days - 1)).isoformat()
+        where, params = self._series_filter(commodity, market, state)
+        row = self._connect().execute(
+            f'SELECT MIN(min_price) AS min_price, MAX(max_price) AS max_price, AVG(modal_price) AS modal_price, '
+            f'COUNT(DISTINCT arrival_date) AS days FROM mandi_prices '
+            f'WHERE {where} AND arrival_date BETWEEN ? AND ?',
+            params + [start, latest_date]
+        ).fetchone()
+        return {'start_date': start, 'end_date': latest_date, **dict(row)}
+
+    def trend(self, commodity, market=None, state=None, days=7):
+        """Daily mean modal price over the last `days` days of available data, oldest first"""
+        latest_date = self.latest_date(commodity, market, state)
+        if latest_date is None:
+            return []
+        start = (date.fromisoformat(latest_date) - timedelta(days=days - 1)).isoformat()
+        where, params = self._series_filter(commodity, market, state)
+        rows = self._connect().execute(
+            f'SELECT arrival_date, AVG(modal_price) AS price FROM mandi_prices '
+            f'WHERE {where} AND arrival_date BETWEEN ? AND ? GROUP BY arrival_date ORDER BY arrival_date',
+            params + [start, latest_date]
+        ).fetchall()
+        return [{'date': row['arrival_date'], 'price': round(row['price'], 2)} for row in rows]
+
+    def latest_prices(self, state, trend_days=7):
+        """
+        Latest price per commodity in a state as dicts of
+        market_prices.PriceRecord fields, with change and trend over trend_days
+        """
+        conn = self._connect()
+        rows = []
+        for commodity in self.commodities(state):
+            row = conn.execute(
+                'SELECT commodity, market, arrival_date, min_price, max_price, modal_price, unit FROM mandi_prices '
+                'WHERE state = ? AND commodity = ? ORDER BY arrival_date DESC LIMIT 1',
+                (state, commodity)
+            ).fetchone()
+            rows.append(row)
+
+        prices = {}
+        for row in rows:
+            before = (date.fromisoformat(row['arrival_date']) - timedelta(days=trend_days)).isoformat()
+            previous = conn.execute(
+                'SELECT modal_price FROM mandi_prices WHERE commodity = ? AND market = ? AND arrival_date <= ? '
+                'ORDER BY arrival_date DESC LIMIT 1',
+                (row['commodity'], row['market'], before)
+            ).fetchone()
+            change = 0.0
+            if previous and previous[0]:
+                change = (row['modal_price'] - previous[0]) / previous[0] * 100
+            trend = 'up' if change > TREND_THRESHOLD_PCT else ('down' if change < -TREND_THRESHOLD_PCT else 'stable')
+            prices[row['commodity']] = {
+                'unit': row['unit'],
+                'min_price': int(round(row['min_price'] or row['modal_price'])),
+                'max_price': int(round(row['max_price'] or row['modal_price'])),
+                'modal_price': int(round(row['modal_price'])),
+                'trend': trend,
+                'change': f"{change:+.1f}%",
+                'market': row['market'],
+                'date': row['arrival_date'],
+            }
+        return prices
+
+    def daily_series(self, state=None, since=None):
+        """
+        Every (commodity, market) daily mean modal price as
+        [(commodity, market, arrival_date, price)], ordered by series then date
+        """
+        clauses, params = [], []
+        if state:
+            clauses.append('state = ?')
+            params.append(state)
+        if since:
+            clauses.append('arrival_date >= ?')
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ''
+        return self._connect().execute(
+            f'SELECT commodity, market, arrival_date, AVG(modal_price) FROM mandi_prices {where}'
+            'GROUP BY commodity, market, arrival_date ORDER BY commodity, market, arrival_date',
+            params
+        ).fetchall()
+
+    def commodities(self, state=None):
+        """Distinct commodities, optionally in one state, found by index seeks rather than a table scan"""
+        if state:
+            where, params = 'state = ? AND ', [state, state]
+        else:
+            where, params = '', []
+        rows = self._connect().execute(
+            'WITH RECURSIVE c(commodity) AS ('
+            f' SELECT MIN(commodity) FROM mandi_prices WHERE {where}1'
+            ' UNION ALL'
+            f' SELECT (SELECT MIN(commodity) FROM mandi_prices WHERE {where}commodity > c.commodity)'
+            ' FROM c WHERE c.commodity IS NOT NULL'
+            ') SELECT commodity FROM c WHERE commodity IS NOT NULL',
+            params
+        )
+        return [row[0] for row in rows]
+
+    def markets(self, commodity):
+        rows = self._connect().execute(
+            'SELECT DISTINCT market FROM mandi_prices WHERE commodity = ? ORDER BY market', (commodity,)
+        )
+        return [row[0] for row in rows]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_price_store():
+    """Return the process-wide price store (path from MARKET_DB_PATH)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PriceStore(os.getenv('MARKET_DB_PATH', 'prices.db'))
+    return _store
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load AgMarkNet mandi price dumps (CSV or Parquet) into the price store")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--db', default=os.getenv('MARKET_DB_PATH', 'prices.db'))
+    args = parser.parse_args()
+
+    store = PriceStore(args.db)
+    for path in args.files:
+        ingested, skipped = store.ingest_file(path)
+        print(f"{path}: {ingested} rows ingested, {skipped} skipped")
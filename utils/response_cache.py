@@ -0,0 +1,227 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    language TEXT NOT NULL,
+    query TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    token_count INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_answers_last_used ON answers(last_used_at);
+CREATE TABLE IF NOT EXISTS answer_tokens (
+    token TEXT NOT NULL,
+    language TEXT NOT NULL,
+    key TEXT NOT NULL REFERENCES answers(key) ON DELETE CASCADE,
+    PRIMARY KEY (token, language, key)
+);
+CREATE INDEX IF NOT EXISTS idx_answer_tokens_key ON answer_tokens(key);
+"""
+
+# Words that carry no meaning for matching near-duplicate questions
+STOPWORDS = {
+    'a', 'an', 'the', 'is', 'are', 'to', 'of', 'in', 'on', 'for', 'and', 'or',
+    'my', 'i', 'me', 'we', 'what', 'how', 'when', 'which', 'should', 'can',
+    'do', 'does', 'please', 'tell', 'about', 'with', 'it', 'this', 'that'
+}
+
+
+def normalize_query(query):
+    """Lowercase, drop punctuation/symbols and collapse whitespace"""
+    query = unicodedata.normalize('NFKC', query).lower()
+    query = ''.join(
+        ' ' if unicodedata.category(ch)[0] in ('P', 'S') else ch
+        for ch in query
+    )
+    return re.sub(r'\s+', ' ', query).strip()
+
+
+def query_tokens(normalized):
+    """Distinct content words of a normalized query, used by near-duplicate lookup"""
+    return sorted({word for word in normalized.split() if word not in STOPWORDS})
+
+
+class ResponseCache:
+    """
+    Persistent cache of AI answers keyed on the normalized question and answer
+    language. Entries expire after ttl seconds and the least recently used
+    ones are evicted beyond max_entries. With near_duplicates enabled, a miss
+    falls back to the most similar cached question (token Jaccard similarity
+    over an inverted index) if it scores at least similarity_threshold.
+    """
+
+    def __init__(self, path='ask_cache.db', ttl=7 * 24 * 3600, max_entries=5000,
+                 near_duplicates=False, similarity_threshold=0.8):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.near_duplicates = near_duplicates
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+        return conn
+
+    def _key(self, normalized, language):
+        return hashlib.sha256(f"{language}\x00{normalized}".encode()).hexdigest()
+
+    def _count(self, counter):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _use(self, conn, key):
+        conn.execute(
+            'UPDATE answers SET last_used_at = ?, hit_count = hit_count + 1 WHERE key = ?',
+            (time.time(), key)
+        )
+
+    def get(self, query, language):
+        """Return a cached answer for the question, or None"""
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        conn = self._connect()
+        fresh_after = time.time() - self.ttl
+
+        key = self._key(normalized, language)
+        row = conn.execute(
+            'SELECT answer FROM answers WHERE key = ? AND created_at >= ?',
+            (key, fresh_after)
+        ).fetchone()
+        if row:
+            self._use(conn, key)
+            self._count('hits')
+            return row[0]
+
+        if self.near_duplicates:
+            match = self._nearest(conn, normalized, language, fresh_after)
+            if match:
+                self._use(conn, match[0])
+                self._count('near_hits')
+                return match[1]
+
+        self._count('misses')
+        return None
+
+    def _nearest(self, conn, normalized, language, fresh_after):
+        tokens = query_tokens(normalized)
+        if not tokens:
+            return None
+        placeholders = ','.join('?' * len(tokens))
+        # Candidates share at least one token; rank them by overlap in SQL
+        # and only score the best few
+        candidates = conn.execute(
+            f'SELECT t.key, COUNT(*) AS shared, a.token_count, a.answer '
+            f'FROM answer_tokens t JOIN answers a ON a.key = t.key '
+            f'WHERE t.language = ? AND t.token IN ({placeholders}) AND a.created_at >= ? '
+            f'GROUP BY t.key ORDER BY shared DESC LIMIT 20',
+            (language, *tokens, fresh_after)
+        ).fetchall()
+
+        best = None
+        best_score = self.similarity_threshold
+        for key, shared, token_count, answer in candidates:
+            score = shared / (len(tokens) + token_count - shared)
+            if score >= best_score:
+                best, best_score = (key, answer), score
+        return best
+
+    def put(self, query, language, answer):
+        """Store an answer and evict expired / least recently used entries"""
+        normalized = normalize_query(query)
+        if not normalized or not answer:
+            return
+        key = self._key(normalized, language)
+        tokens = query_tokens(normalized)
+        now = time.time()
+
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO answers '
+                '(key, language, query, answer, token_count, created_at, last_used_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, language, normalized, answer, len(tokens), now, now)
+            )
+            conn.execute('DELETE FROM answer_tokens WHERE key = ?', (key,))
+            conn.executemany(
+                'INSERT INTO answer_tokens (token, language, key) VALUES (?, ?, ?)',
+                [(token, language, key) for token in tokens]
+            )
+            self._evict(conn, now)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _evict(self, conn, now):
+        conn.execute('DELETE FROM answers WHERE created_at < ?', (now - self.ttl,))
+        overflow = conn.execute('SELECT COUNT(*) FROM answers').fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                'DELETE FROM answers WHERE key IN '
+                '(SELECT key FROM answers ORDER BY last_used_at LIMIT ?)',
+                (overflow,)
+            )
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute('DELETE FROM answers')
+
+    def stats(self):
+        with self._stats_lock:
+            hits, near_hits, misses = self.hits, self.near_hits, self.misses
+        entries = self._connect().execute('SELECT COUNT(*) FROM answers').fetchone()[0]
+        lookups = hits + near_hits + misses
+        return {
+            'hits': hits,
+            'near_hits': near_hits,
+            'misses': misses,
+            'saved_calls': hits + near_hits,
+            'hit_rate': (hits + near_hits) / lookups if lookups else 0.0,
+            'entries': entries,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the process-wide answer cache configured from ASK_CACHE_* env vars (None if disabled)"""
+    global _cache
+    if os.getenv('ASK_CACHE_ENABLED', '1') == '0':
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    path=os.getenv('ASK_CACHE_PATH', 'ask_cache.db'),
+                    ttl=int(os.getenv('ASK_CACHE_TTL', str(7 * 24 * 3600))),
+                    max_entries=int(os.getenv('ASK_CACHE_MAX_ENTRIES', '5000')),
+                    near_duplicates=os.getenv('ASK_CACHE_NEAR_DUPLICATES', '0') == '1',
+                    similarity_threshold=float(os.getenv('ASK_CACHE_SIMILARITY', '0.8')),
+                )
+    return _cache
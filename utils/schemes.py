@@ -0,0 +1,273 @@
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from datetime import date, timedelta
+
+NATIONAL = 'All States'
+
+INDIAN_STATES = (
+    'Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar', 'Chhattisgarh', 'Goa',
+    'Gujarat', 'Haryana', 'Himachal Pradesh', 'Jharkhand', 'Karnataka', 'Kerala',
+    'Madhya Pradesh', 'Maharashtra', 'Manipur', 'Meghalaya', 'Mizoram', 'Nagaland',
+    'Odisha', 'Punjab', 'Rajasthan', 'Sikkim', 'Tamil Nadu', 'Telangana', 'Tripura',
+    'Uttar Pradesh', 'Uttarakhand', 'West Bengal', 'Andaman and Nicobar Islands',
+    'Chandigarh', 'Dadra and Nagar Haveli and Daman and Diu', 'Delhi',
+    'Jammu and Kashmir', 'Ladakh', 'Lakshadweep', 'Puducherry',
+)
+
+# Eligibility categories recognised in a scheme's eligibility text. A scheme
+# can also list them explicitly in an "eligibility_categories" field.
+ELIGIBILITY_KEYWORDS = {
+    'all_farmers': ('all farmers', 'all categories of farmers', 'individual farmers'),
+    'small_marginal': ('small and marginal', 'up to 2 hectares'),
+    'tenant': ('tenant', 'sharecropper', 'lessee'),
+    'group': ('shg', 'farmer groups', 'groups of farmers', 'fpo'),
+    'entrepreneur': ('entrepreneur', 'processing units'),
+    'coconut': ('coconut',),
+    'spice': ('spice',),
+}
+
+# Crops a farmer grows that make them eligible for crop-specific schemes
+CROP_CATEGORIES = {
+    'coconut': 'coconut',
+    'pepper': 'spice',
+    'cardamom': 'spice',
+    'ginger': 'spice',
+    'turmeric': 'spice',
+}
+
+SMALL_MARGINAL_HECTARES = 2.0
+HECTARES_PER_ACRE = 0.4047
+
+_MONTHS = {
+    name: number for number, name in enumerate(
+        ('january', 'february', 'march', 'april', 'may', 'june', 'july',
+         'august', 'september', 'october', 'november', 'december'), start=1)
+}
+_ANNUAL_DEADLINE = re.compile(r'\b(' + '|'.join(_MONTHS) + r')\s+(\d{1,2})\b', re.IGNORECASE)
+_FIXED_DEADLINE = re.compile(r'\b(\d{4})-(\d{2})-(\d{2})\b')
+
+
+def parse_deadline(text):
+    """
+    Classify a free-text deadline as ('fixed', date), ('annual', (month, day))
+    or ('open', None) for ongoing and varying deadlines
+    """
+    text = text or ''
+    match = _FIXED_DEADLINE.search(text)
+    if match:
+        try:
+            return 'fixed', date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        except ValueError:
+            pass
+    match = _ANNUAL_DEADLINE.search(text)
+    if match:
+        return 'annual', (_MONTHS[match.group(1).lower()], int(match.group(2)))
+    return 'open', None
+
+
+def eligibility_categories(scheme):
+    if scheme.get('eligibility_categories'):
+        return set(scheme['eligibility_categories'])
+    text = (scheme.get('eligibility') or '').lower()
+    categories = {
+        category for category, keywords in ELIGIBILITY_KEYWORDS.items()
+        if any(keyword in text for keyword in keywords)
+    }
+    # "Farmers, SHGs, and entrepreneurs in ..." is open to every farmer
+    if text.startswith('farmers'):
+        categories.add('all_farmers')
+    return categories
+
+
+def state_from_location(location):
+    """The Indian state named in a free-text location such as "Thrissur, Kerala" (None if not found)"""
+    lowered = (location or '').lower()
+    for state in INDIAN_STATES:
+        if state.lower() in lowered:
+            return state
+    return None
+
+
+def profile_categories(user_data):
+    """Eligibility categories that apply to a registered user, from their land area and crops"""
+    categories = {'all_farmers'}
+    crops = user_data.get('crops', [])
+    area_acres = sum(crop.get('area_acres') or 0 for crop in crops)
+    if area_acres * HECTARES_PER_ACRE <= SMALL_MARGINAL_HECTARES:
+        categories.add('small_marginal')
+    for crop in crops:
+        name = (crop.get('name') or '').lower()
+        for keyword, category in CROP_CATEGORIES.items():
+            if keyword in name:
+                categories.add(category)
+    categories.update(user_data.get('eligibility_categories', []))
+    return categories
+
+
+class SchemeIndex:
+    """
+    Immutable indexes over one version of the catalog: schemes by state
+    (national schemes merged in), by eligibility category and by deadline
+    """
+
+    def __init__(self, schemes):
+        self.schemes = tuple(schemes)
+        self.by_id = {scheme['id']: scheme for scheme in self.schemes}
+
+        self.national = tuple(s for s in self.schemes if NATIONAL in s.get('applicable_states', []))
+        state_ids = {}
+        for scheme in self.schemes:
+            for state in scheme.get('applicable_states', []):
+                if state != NATIONAL:
+                    state_ids.setdefault(state.lower(), set()).add(scheme['id'])
+        # Each state's list has the national schemes merged in, in catalog order
+        national_ids = {scheme['id'] for scheme in self.national}
+        self.national_ids = frozenset(national_ids)
+        self.state_ids = {state: frozenset(ids | national_ids) for state, ids in state_ids.items()}
+        self.by_state = {
+            state: tuple(s for s in self.schemes if s['id'] in ids)
+            for state, ids in self.state_ids.items()
+        }
+        self.position = {scheme['id']: i for i, scheme in enumerate(self.schemes)}
+
+        self.by_category = {}
+        for scheme in self.schemes:
+            for category in eligibility_categories(scheme):
+                self.by_category.setdefault(category, set()).add(scheme['id'])
+
+        self.annual_deadlines = []  # sorted (month, day, id)
+        self.fixed_deadlines = []  # sorted (date, id)
+        for scheme in self.schemes:
+            kind, value = parse_deadline(scheme.get('deadline'))
+            if kind == 'annual':
+                self.annual_deadlines.append((value[0], value[1], scheme['id']))
+            elif kind == 'fixed':
+                self.fixed_deadlines.append((value, scheme['id']))
+        self.annual_deadlines.sort()
+        self.fixed_deadlines.sort()
+
+    def for_state(self, state):
+        """Schemes open in a state, national ones included"""
+        if not state:
+            return self.national
+        return self.by_state.get(state.lower(), self.national)
+
+    def upcoming_deadlines(self, today=None, days=60, state=None):
+        """[(deadline_date, scheme)] for deadlines in the next `days` days, soonest first, optionally only schemes open in a state"""
+        today = today or date.today()
+        end = today + timedelta(days=days)
+        upcoming = []
+
+        start = bisect.bisect_left(self.fixed_deadlines, (today, -1))
+        for deadline, scheme_id in self.fixed_deadlines[start:]:
+            if deadline > end:
+                break
+            upcoming.append((deadline, self.by_id[scheme_id]))
+
+        # Annual deadlines are sorted by (month, day); walk from today's
+        # position and wrap around the year end
+        count = len(self.annual_deadlines)
+        start = bisect.bisect_left(self.annual_deadlines, (today.month, today.day, -1))
+        for offset in range(count):
+            month, day, scheme_id = self.annual_deadlines[(start + offset) % count]
+            deadline = _next_occurrence(today, month, day)
+            if deadline > end:
+                break
+            upcoming.append((deadline, self.by_id[scheme_id]))
+
+        if state:
+            open_ids = self.state_ids.get(state.lower(), self.national_ids)
+            upcoming = [item for item in upcoming if item[1]['id'] in open_ids]
+        upcoming.sort(key=lambda item: item[0])
+        return upcoming
+
+    def eligible(self, categories, state=None):
+        """Schemes matching any of the eligibility categories and open in the state, in catalog order"""
+        ids = set()
+        for category in categories:
+            ids |= self.by_category.get(category, set())
+        if state:
+            ids &= self.state_ids.get(state.lower(), self.national_ids)
+        return tuple(self.by_id[i] for i in sorted(ids, key=self.position.__getitem__))
+
+
+def _next_occurrence(today, month, day):
+    for year in (today.year, today.year + 1):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            candidate = date(year, month, 28)  # February 29 in a non-leap year
+        if candidate >= today:
+            return candidate
+    return candidate
+
+
+class SchemeCatalog:
+    """
+    Schemes catalog loaded once from schemes.json. The file is re-checked at
+    most every check_interval seconds and, when it changed, re-parsed into a
+    new SchemeIndex that replaces the old one atomically.
+    """
+
+    def __init__(self, path='schemes.json', check_interval=5):
+        self.path = path
+        self.check_interval = check_interval
+        self._index = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def index(self):
+        """Current SchemeIndex, reloading the file if it changed"""
+        now = time.time()
+        if self._index is not None and now - self._checked_at < self.check_interval:
+            return self._index
+        with self._lock:
+            if self._index is None or now - self._checked_at >= self.check_interval:
+                signature = self._file_signature()
+                if signature != self._signature:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        schemes = json.load(f)['schemes']
+                    self._index = SchemeIndex(schemes)
+                    self._signature = signature
+                self._checked_at = now
+        return self._index
+
+    def all(self):
+        return self.index().schemes
+
+    def for_state(self, state):
+        return self.index().for_state(state)
+
+    def upcoming_deadlines(self, today=None, days=60, state=None):
+        return self.index().upcoming_deadlines(today, days, state)
+
+    def eligible_for_user(self, user_data, state=None):
+        """Schemes a registered user qualifies for, in their state (from their location) unless given"""
+        state = state or state_from_location(user_data.get('location'))
+        return self.index().eligible(profile_categories(user_data), state)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_scheme_catalog():
+    """Return the process-wide schemes catalog (path from SCHEMES_PATH)"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = SchemeCatalog(
+                    os.getenv('SCHEMES_PATH', 'schemes.json'),
+                    check_interval=float(os.getenv('SCHEMES_CHECK_INTERVAL', '5')),
+                )
+    return _catalog
@@ -0,0 +1,348 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from utils.response_cache import STOPWORDS
+
+# Combining vowel signs and viramas of the Indic scripts (Devanagari through
+# Sinhala). unicode61 would otherwise treat them as separators and split
+# words like "सिंचाई" into fragments.
+INDIC_MARKS = ''.join(
+    chr(code) for code in range(0x0900, 0x0E00)
+    if unicodedata.category(chr(code)) in ('Mn', 'Mc')
+)
+
+# porter stems English words ("irrigated" matches "irrigation") and passes
+# other scripts through unchanged
+TOKENIZER = f"porter unicode61 remove_diacritics 2 tokenchars '{INDIC_MARKS}'"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    doc_id TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    url TEXT,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_kind ON documents(kind);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, body, content='documents', content_rowid='id', tokenize="{TOKENIZER}"
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    INSERT INTO documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+CREATE TABLE IF NOT EXISTS source_state (
+    kind TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# bm25 column weights: a hit in the title counts ten times a hit in the body
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+
+def search_tokens(text):
+    """Split text into index terms the same way the tokenizer does, minus stopwords"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    tokens, current = [], []
+    for ch in text:
+        if ch.isalnum() or unicodedata.category(ch)[0] == 'M':
+            current.append(ch)
+        elif current:
+            tokens.append(''.join(current))
+            current = []
+    if current:
+        tokens.append(''.join(current))
+    return [token for token in tokens if token not in STOPWORDS]
+
+
+def build_match_query(text):
+    """
+    FTS5 MATCH expression for free text: any term may match (bm25 ranks
+    documents matching more of them higher) and the last term also matches
+    as a prefix, so partially typed words still find results
+    """
+    tokens = search_tokens(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    if len(tokens[-1]) >= 3:
+        terms[-1] += '*'
+    return ' OR '.join(terms)
+
+
+def _content_hash(doc):
+    return hashlib.sha256(
+        json.dumps([doc['title'], doc['body'], doc.get('url')], ensure_ascii=False).encode('utf-8')
+    ).hexdigest()
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 index over schemes, news, crop advisory tips and calendar
+    activities. Each source is synced incrementally: unchanged sources are
+    skipped by fingerprint and only added, changed or removed documents touch
+    the index.
+    """
+
+    def __init__(self, path='search.db'):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def fingerprint(self, kind):
+        row = self._connect().execute(
+            'SELECT fingerprint FROM source_state WHERE kind = ?', (kind,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def sync(self, kind, docs, fingerprint=None, prune=True):
+        """
+        Bring the documents of one kind in line with docs (dicts with doc_id,
+        title, body and optional url). Skipped entirely when fingerprint matches
+        the last sync. With prune=False, documents missing from docs are kept,
+        for append-only sources fed in increments. Returns the number of
+        documents added, updated or removed.
+        """
+        conn = self._connect()
+        changed = 0
+        with self._write_lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if fingerprint is not None:
+                    row = conn.execute('SELECT fingerprint FROM source_state WHERE kind = ?', (kind,)).fetchone()
+                    if row and row[0] == fingerprint:
+                        conn.execute('COMMIT')
+                        return 0
+
+                existing = {
+                    row['doc_id']: row['content_hash'] for row in conn.execute(
+                        'SELECT doc_id, content_hash FROM documents WHERE kind = ?', (kind,)
+                    )
+                }
+                seen = set()
+                for doc in docs:
+                    doc_id = f"{kind}:{doc['doc_id']}"
+                    seen.add(doc_id)
+                    content_hash = _content_hash(doc)
+                    if existing.get(doc_id) == content_hash:
+                        continue
+                    if doc_id in existing:
+                        conn.execute(
+                            'UPDATE documents SET title = ?, body = ?, url = ?, content_hash = ? WHERE doc_id = ?',
+                            (doc['title'], doc['body'], doc.get('url'), content_hash, doc_id)
+                        )
+                    else:
+                        conn.execute(
+                            'INSERT INTO documents (doc_id, kind, title, body, url, content_hash) '
+                            'VALUES (?, ?, ?, ?, ?, ?)',
+                            (doc_id, kind, doc['title'], doc['body'], doc.get('url'), content_hash)
+                        )
+                    changed += 1
+
+                if prune:
+                    for doc_id in existing.keys() - seen:
+                        conn.execute('DELETE FROM documents WHERE doc_id = ?', (doc_id,))
+                        changed += 1
+
+                if fingerprint is not None:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO source_state (kind, fingerprint, updated_at) VALUES (?, ?, ?)',
+                        (kind, fingerprint, time.time())
+                    )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return changed
+
+    def search(self, text, kinds=None, limit=20):
+        """
+        Ranked matches for free text as dicts with kind, title, snippet and url,
+        best first. kinds optionally restricts the document types searched.
+        """
+        match = build_match_query(text)
+        if match is None:
+            return []
+
+        sql = (
+            'SELECT d.kind, d.title, d.url, '
+            "snippet(documents_fts, 1, '**', '**', '…', 16) AS snippet, "
+            'bm25(documents_fts, ?, ?) AS rank '
+            'FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid '
+            'WHERE documents_fts MATCH ?'
+        )
+        params = [TITLE_WEIGHT, BODY_WEIGHT, match]
+        if kinds:
+            sql += f" AND d.kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        sql += ' ORDER BY rank LIMIT ?'
+        params.append(limit)
+
+        rows = self._connect().execute(sql, params).fetchall()
+        return [
+            {'kind': row['kind'], 'title': row['title'], 'snippet': row['snippet'], 'url': row['url']}
+            for row in rows
+        ]
+
+    def count(self, kind=None):
+        if kind is None:
+            return self._connect().execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+        return self._connect().execute('SELECT COUNT(*) FROM documents WHERE kind = ?', (kind,)).fetchone()[0]
+
+
+def scheme_documents(schemes):
+    return [
+        {
+            'doc_id': scheme['id'],
+            'title': scheme['title'],
+            'body': '\n'.join(
+                str(scheme.get(field) or '')
+                for field in ('description', 'eligibility', 'benefits', 'how_to_apply', 'deadline', 'contact_info')
+            ) + '\n' + ', '.join(scheme.get('applicable_states', [])),
+        }
+        for scheme in schemes
+    ]
+
+
+def news_documents(articles):
+    return [
+        {
+            'doc_id': article['url'],
+            'title': article['title'],
+            'body': f"{article.get('description') or ''}\n{article.get('source') or ''}",
+            'url': article['url'],
+        }
+        for article in articles
+    ]
+
+
+def advisory_tip_documents():
+    from utils.crop_advisory import SEASON_TIPS, SOIL_TIPS, STATE_TIPS
+
+    docs = []
+    for label, tips_by_key in (('Season', SEASON_TIPS), ('Soil', SOIL_TIPS), ('State', STATE_TIPS)):
+        for key, tips in tips_by_key.items():
+            for i, tip in enumerate(tips):
+                docs.append({'doc_id': f"{label}:{key}:{i}", 'title': tip, 'body': f"{label}: {key}"})
+    return docs
+
+
+def calendar_documents():
+    from utils.farming_calendar import CROP_SCHEDULES
+
+    docs = []
+    for crop, schedule in CROP_SCHEDULES.items():
+        start = 0
+        for stage in schedule['stages']:
+            docs.append({
+                'doc_id': f"{crop}:stage:{stage['name']}",
+                'title': f"{crop}: {stage['name']}",
+                'body': f"{', '.join(stage['activities'])}\nDays {start}-{start + stage['days']} after planting",
+            })
+            start += stage['days']
+        for fert in schedule['fertilizer_schedule']:
+            docs.append({
+                'doc_id': f"{crop}:fertilizer:{fert['days']}",
+                'title': f"{crop}: {fert['fertilizer']}",
+                'body': f"Fertilizer application, {fert['stage']}\nDay {fert['days']} after planting",
+            })
+    return docs
+
+
+def _docs_fingerprint(docs):
+    return hashlib.sha256(
+        json.dumps(docs, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+
+
+def refresh_search_index(index):
+    """Sync every content source into the index. Returns the number of documents changed"""
+    from utils.news_store import get_news_store
+    from utils.schemes import get_scheme_catalog
+
+    changed = 0
+
+    catalog = get_scheme_catalog()
+    try:
+        stat = os.stat(catalog.path)
+        fingerprint = f"{stat.st_mtime_ns}:{stat.st_size}"
+        if index.fingerprint('scheme') != fingerprint:
+            changed += index.sync('scheme', scheme_documents(catalog.all()), fingerprint)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    # The news store is append-only, so only articles after the last indexed
+    # rowid are read
+    store = get_news_store()
+    cursor = int(index.fingerprint('news') or 0)
+    while True:
+        articles = store.articles_after(cursor)
+        if not articles:
+            break
+        cursor = articles[-1]['rowid']
+        changed += index.sync('news', news_documents(articles), str(cursor), prune=False)
+
+    for kind, docs in (('tip', advisory_tip_documents()), ('calendar', calendar_documents())):
+        changed += index.sync(kind, docs, _docs_fingerprint(docs))
+
+    return changed
+
+
+_index = None
+_index_lock = threading.Lock()
+_last_refresh = 0.0
+_refresh_lock = threading.Lock()
+
+
+def get_search_index():
+    """Return the process-wide search index (path from SEARCH_DB_PATH)"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SearchIndex(os.getenv('SEARCH_DB_PATH', 'search.db'))
+    return _index
+
+
+def search(text, kinds=None, limit=20):
+    """
+    Search schemes, news, advisory tips and calendar activities. Sources are
+    re-synced at most every SEARCH_REFRESH_INTERVAL seconds before searching.
+    """
+    global _last_refresh
+    index = get_search_index()
+    interval = float(os.getenv('SEARCH_REFRESH_INTERVAL', '60'))
+    if time.time() - _last_refresh >= interval and _refresh_lock.acquire(blocking=False):
+        try:
+            refresh_search_index(index)
+            _last_refresh = time.time()
+        except Exception:
+            pass  # Serve results from the existing index
+        finally:
+            _refresh_lock.release()
+    return index.search(text, kinds=kinds, limit=limit)
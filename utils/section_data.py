@@ -0,0 +1,112 @@
+import os
+from datetime import date
+import streamlit as st
+
+# How long each section's data is reused across reruns (and sessions) before
+# it is recomputed, in seconds. Sources that already refresh on their own
+# clock reuse that setting so the UI never lags behind them by more.
+NEWS_PAGE_TTL = int(os.getenv('NEWS_PAGE_CACHE_TTL', '60'))
+SEARCH_RESULTS_TTL = int(os.getenv('SEARCH_REFRESH_INTERVAL', '60'))
+SCHEMES_VIEW_TTL = int(os.getenv('SCHEMES_VIEW_CACHE_TTL', '300'))
+MARKET_VIEW_TTL = int(os.getenv('MARKET_SNAPSHOT_TTL', '300'))
+UPCOMING_TASKS_TTL = int(os.getenv('UPCOMING_TASKS_CACHE_TTL', '300'))
+ADVISORY_TTL = 24 * 3600
+
+
+@st.cache_data(ttl=SCHEMES_VIEW_TTL, show_spinner=False)
+def scheme_view(state, user_data=None):
+    """(schemes open in the state, upcoming deadlines, ids the user is eligible for)"""
+    from utils.schemes import get_scheme_catalog
+
+    catalog = get_scheme_catalog()
+    eligible_ids = set()
+    if user_data:
+        eligible_ids = {scheme['id'] for scheme in catalog.eligible_for_user(user_data)}
+    return (
+        list(catalog.for_state(state)),
+        catalog.upcoming_deadlines(days=60, state=state),
+        eligible_ids,
+    )
+
+
+@st.cache_data(ttl=ADVISORY_TTL, show_spinner=False)
+def crop_recommendation(season, soil_type, state):
+    from utils.crop_advisory import get_crop_recommendation
+    return get_crop_recommendation(season, soil_type, state)
+
+
+def forecast_advisory(location):
+    """
+    Multi-day advisory for a weather location: precomputed by the background
+    advisories feed for every tracked location, built from the cached
+    forecast for one it hasn't covered yet (None without a forecast)
+    """
+    from utils.prefetch import get_refresher
+
+    advisories = get_refresher().read('advisories', 'all') or {}
+    if location in advisories:
+        return advisories[location]
+
+    from utils.forecast_analytics import build_advisories
+    from utils.weather_service import get_forecast
+
+    frame = get_forecast(location)
+    return build_advisories([frame]).get(location) if frame is not None else None
+
+
+@st.cache_data(ttl=NEWS_PAGE_TTL, show_spinner=False)
+def news_page(page):
+    """(articles on the page, total page count) from the local news store"""
+    from utils.news_helper import get_agriculture_news, get_news_page_count
+    return get_agriculture_news(page=page, fetch_if_empty=False), get_news_page_count()
+
+
+# Market snapshots are immutable and hold read-only mappings that don't
+# pickle, so they are shared as resources rather than copied out of
+# st.cache_data on every hit
+@st.cache_resource(ttl=MARKET_VIEW_TTL, show_spinner=False)
+def market_view(state):
+    """(price snapshot, market insights) for a state"""
+    from utils.market_prices import get_market_insights, get_market_prices
+    from utils.prefetch import get_refresher
+
+    snapshot = get_refresher().read('market', state) or get_market_prices(state)
+    return snapshot, tuple(get_market_insights(state))
+
+
+@st.cache_data(ttl=MARKET_VIEW_TTL, show_spinner=False)
+def selling_advice(crop_name, state):
+    from utils.market_prices import get_best_selling_time
+    return get_best_selling_time(crop_name, state)
+
+
+@st.cache_data(ttl=SEARCH_RESULTS_TTL, show_spinner=False)
+def search_results(query):
+    from utils.search_index import search
+    return search(query)
+
+
+@st.cache_data(ttl=UPCOMING_TASKS_TTL, show_spinner=False)
+def _upcoming_tasks(mobile, days, today):
+    from utils.farming_calendar import get_upcoming_tasks
+    return get_upcoming_tasks(mobile, days=days)
+
+
+def upcoming_tasks(mobile, days):
+    """A user's tasks for the next days, keyed on today's date so the window moves at midnight"""
+    return _upcoming_tasks(mobile, days, date.today())
+
+
+def translations(texts, language_code):
+    """
+    {text: text in the language} for content shown on a page, read from the
+    translation memory without waiting on the model. Strings it lacks are
+    shown in English this time and translated in the background.
+    """
+    from utils.translation_memory import translate_from_memory
+    return translate_from_memory(texts, language_code)
+
+
+def invalidate_user_tasks():
+    """Drop cached task lists after a crop or reminder is added"""
+    _upcoming_tasks.clear()
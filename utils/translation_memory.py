@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    source_hash TEXT NOT NULL,
+    language TEXT NOT NULL,
+    source TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (source_hash, language)
+);
+"""
+
+
+def source_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class TranslationMemory:
+    """Persistent store of translations keyed by (source text hash, target language)"""
+
+    def __init__(self, path='translations.db'):
+        self.path = path
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, text, language):
+        row = self._connect().execute(
+            'SELECT translation FROM translations WHERE source_hash = ? AND language = ?',
+            (source_hash(text), language)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, texts, language):
+        """Look up several texts at once, returning {text: translation} for the ones found"""
+        found = {}
+        hashes = {source_hash(text): text for text in texts}
+        keys = list(hashes)
+        conn = self._connect()
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for hash_value, translation in conn.execute(
+                f'SELECT source_hash, translation FROM translations '
+                f'WHERE language = ? AND source_hash IN ({placeholders})',
+                (language, *chunk)
+            ):
+                found[hashes[hash_value]] = translation
+        return found
+
+    def put_many(self, pairs, language):
+        """Store {source text: translation} pairs for one target language"""
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT OR REPLACE INTO translations '
+                '(source_hash, language, source, translation, created_at) VALUES (?, ?, ?, ?, ?)',
+                [(source_hash(text), language, text, translation, now)
+                 for text, translation in pairs.items()]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def put(self, text, language, translation):
+        self.put_many({text: translation}, language)
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+    """Return the process-wide translation memory (path from TRANSLATION_MEMORY_PATH)"""
+    global _memory
+    if _memory is None:
+        with _memory_lock:
+            if _memory is None:
+                _memory = TranslationMemory(os.getenv('TRANSLATION_MEMORY_PATH', 'translations.db'))
+    return _memory
+
+
+class TranslationQueue:
+    """
+    Strings the translation memory is missing, waiting for the model. Pages
+    render from the memory alone and enqueue the misses; one worker thread
+    sends them to translate (translate_batch, which stores results in the
+    memory) a batch at a time, so they appear on a later render. Strings
+    that come back untranslated aren't retried for retry_after seconds.
+    """
+
+    def __init__(self, translate, memory, batch_size=50, retry_after=300):
+        self.translate = translate
+        self.memory = memory
+        self.batch_size = batch_size
+        self.retry_after = retry_after
+        self._pending = {}  # language -> {text: None}, insertion-ordered
+        self._busy = set()
+        self._failed_at = {}
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def enqueue(self, texts, language):
+        now = time.time()
+        with self._condition:
+            pending = self._pending.setdefault(language, {})
+            for text in texts:
+                key = (text, language)
+                if key in self._busy or now - self._failed_at.get(key, 0) < self.retry_after:
+                    continue
+                pending[text] = None
+            if not pending:
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="translation-queue", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _next_batch(self):
+        with self._condition:
+            while True:
+                for language, pending in self._pending.items():
+                    if pending:
+                        batch = list(pending)[:self.batch_size]
+                        for text in batch:
+                            del pending[text]
+                        self._busy.update((text, language) for text in batch)
+                        return batch, language
+                self._condition.wait()
+
+    def _run(self):
+        while True:
+            batch, language = self._next_batch()
+            try:
+                self.translate(batch, language)
+                translated = self.memory.get_many(batch, language)
+            except Exception:
+                translated = {}
+            now = time.time()
+            with self._condition:
+                for text in batch:
+                    self._busy.discard((text, language))
+                    if text not in translated:
+                        self._failed_at[(text, language)] = now
+
+    def pending_count(self):
+        with self._condition:
+            return sum(len(pending) for pending in self._pending.values()) + len(self._busy)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_translation_queue():
+    """Return the process-wide background translation queue"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                from utils.gemini_helper import translate_batch
+                _queue = TranslationQueue(translate_batch, get_translation_memory())
+    return _queue
+
+
+def translate_from_memory(texts, language):
+    """
+    {text: translation} for texts, from the translation memory only; misses
+    map to themselves and are queued for background translation
+    """
+    texts = list(dict.fromkeys(text for text in texts if text))
+    if language == 'en' or not texts:
+        return {text: text for text in texts}
+    found = get_translation_memory().get_many(texts, language)
+    missing = [text for text in texts if text not in found]
+    if missing:
+        get_translation_queue().enqueue(missing, language)
+    return {text: found.get(text, text) for text in texts}
+
+
+def load_english_ui_strings(locales_dir='locales'):
+    """Read the English UI labels from the locale catalog"""
+    path = os.path.join(locales_dir, 'en.json')
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(json.load(f)['messages'].values())
+
+
+def collect_content_strings(schemes_path='schemes.json', locales_dir='locales'):
+    """Gather every translatable English string the app renders"""
+    from utils.crop_advisory import generate_farming_tips
+    from utils.forecast_analytics import ADVISORY_MESSAGES, FAVORABLE_MESSAGE
+    from utils.news_helper import get_fallback_news
+
+    strings = []
+    strings.extend(load_english_ui_strings(locales_dir))
+
+    if os.path.exists(schemes_path):
+        with open(schemes_path, 'r', encoding='utf-8') as f:
+            for scheme in json.load(f)['schemes']:
+                for field in ('title', 'description', 'eligibility', 'benefits', 'how_to_apply', 'deadline'):
+                    if scheme.get(field):
+                        strings.append(scheme[field])
+
+    strings.extend(ADVISORY_MESSAGES.values())
+    strings.append(FAVORABLE_MESSAGE)
+
+    for news in get_fallback_news():
+        strings.extend([news['title'], news['description']])
+
+    for season in ['Kharif (Monsoon)', 'Rabi (Winter)', 'Zaid (Summer)']:
+        for soil_type in ['Loamy', 'Clay', 'Sandy', 'Red Soil', 'Black Soil', 'Alluvial']:
+            strings.extend(generate_farming_tips(season, soil_type, 'Kerala'))
+
+    # De-duplicate while keeping first-seen order
+    return list(dict.fromkeys(strings))
+
+
+if __name__ == '__main__':
+    import argparse
+    from utils.gemini_helper import translate_batch
+
+    parser = argparse.ArgumentParser(description="Pre-translate UI labels and content into the translation memory")
+    parser.add_argument('--languages', nargs='+', default=['hi', 'ml', 'mr'])
+    parser.add_argument('--batch-size', type=int, default=50)
+    args = parser.parse_args()
+
+    strings = collect_content_strings()
+    memory = get_translation_memory()
+    for language in args.languages:
+        missing_before = len(strings) - len(memory.get_many(strings, language))
+        translate_batch(strings, language, batch_size=args.batch_size)
+        missing_after = len(strings) - len(memory.get_many(strings, language))
+        print(f"{language}: {len(strings)} strings, {missing_before - missing_after} newly translated, "
+              f"{missing_after} still missing")
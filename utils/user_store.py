@@ -0,0 +1,474 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+# Columns stored directly on the users / crops / reminders tables. Any other
+# keys are kept in the row's "extra" JSON column so records round-trip.
+USER_FIELDS = ('name', 'location', 'mobile', 'password', 'registered_at')
+CROP_FIELDS = ('name', 'planting_date', 'area_acres', 'added_at')
+REMINDER_FIELDS = ('id', 'created_at', 'title', 'date', 'description')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    mobile TEXT PRIMARY KEY,
+    name TEXT,
+    location TEXT,
+    password TEXT,
+    registered_at TEXT,
+    extra TEXT NOT NULL DEFAULT '{}',
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS crops (
+    crop_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mobile TEXT NOT NULL REFERENCES users(mobile) ON DELETE CASCADE,
+    name TEXT,
+    planting_date TEXT,
+    area_acres REAL,
+    added_at TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_crops_mobile ON crops(mobile);
+CREATE TABLE IF NOT EXISTS reminders (
+    mobile TEXT NOT NULL REFERENCES users(mobile) ON DELETE CASCADE,
+    id INTEGER NOT NULL,
+    created_at TEXT,
+    title TEXT,
+    date TEXT,
+    description TEXT,
+    extra TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (mobile, id)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', '0');
+INSERT OR IGNORE INTO meta (key, value) VALUES ('store_id', lower(hex(randomblob(8))));
+"""
+
+
+def _split(record, fields):
+    """Split a dict into known column values and leftover extra fields"""
+    values = [record.get(field) for field in fields]
+    extra = {k: v for k, v in record.items() if k not in fields}
+    return values, json.dumps(extra)
+
+
+def _join(row, fields):
+    """Rebuild a dict from a row of column values plus its extra JSON"""
+    record = {field: row[field] for field in fields if row[field] is not None}
+    record.update(json.loads(row['extra'] or '{}'))
+    return record
+
+
+class UserStore:
+    """Interface shared by the user storage backends"""
+
+    def get(self, mobile):
+        raise NotImplementedError
+
+    def exists(self, mobile):
+        return self.get(mobile) is not None
+
+    def create(self, user):
+        """Insert a new user, returning False if the mobile is already taken"""
+        raise NotImplementedError
+
+    def update(self, mobile, data):
+        raise NotImplementedError
+
+    def add_crop(self, mobile, crop):
+        raise NotImplementedError
+
+    def add_reminder(self, mobile, reminder):
+        """Append a reminder, assigning the next per-user id. Returns the id or None"""
+        raise NotImplementedError
+
+    def load_all(self):
+        raise NotImplementedError
+
+    def locations(self):
+        """Distinct non-empty locations users registered with"""
+        return {user['location'] for user in self.load_all().values() if user.get('location')}
+
+    def version(self, mobile):
+        """Opaque token that changes whenever any process writes the user (None if missing)"""
+        raise NotImplementedError
+
+    def store_version(self):
+        """Opaque string that changes whenever any process writes any user, or the store is replaced"""
+        raise NotImplementedError
+
+    def save_all(self, users):
+        raise NotImplementedError
+
+
+class JSONUserStore(UserStore):
+    """Legacy adapter over the whole-file users.json layout"""
+
+    def __init__(self, path='users.json'):
+        self.path = path
+        self._lock = threading.RLock()
+
+    def load_all(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def save_all(self, users):
+        # Write to a sibling temp file and rename so readers never see a
+        # half-written file
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(users, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get(self, mobile):
+        return self.load_all().get(mobile)
+
+    def version(self, mobile):
+        # The whole file is rewritten on every change, so its stat is the version
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def store_version(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 'missing'
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def create(self, user):
+        with self._lock:
+            users = self.load_all()
+            if user['mobile'] in users:
+                return False
+            users[user['mobile']] = user
+            self.save_all(users)
+            return True
+
+    def update(self, mobile, data):
+        with self._lock:
+            users = self.load_all()
+            if mobile not in users:
+                return False
+            users[mobile].update(data)
+            self.save_all(users)
+            return True
+
+    def add_crop(self, mobile, crop):
+        with self._lock:
+            users = self.load_all()
+            if mobile not in users:
+                return False
+            users[mobile].setdefault('crops', []).append(crop)
+            self.save_all(users)
+            return True
+
+    def add_reminder(self, mobile, reminder):
+        with self._lock:
+            users = self.load_all()
+            if mobile not in users:
+                return None
+            reminders = users[mobile].setdefault('reminders', [])
+            reminder_id = max([r.get('id', 0) for r in reminders], default=0) + 1
+            reminders.append({'id': reminder_id, **reminder})
+            self.save_all(users)
+            return reminder_id
+
+
+class SQLiteUserStore(UserStore):
+    """SQLite backend keyed by mobile number, with crops and reminders in child tables"""
+
+    def __init__(self, path='users.db', legacy_json_path='users.json'):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        columns = [row['name'] for row in conn.execute('PRAGMA table_info(users)')]
+        if 'version' not in columns:
+            conn.execute('ALTER TABLE users ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+        if legacy_json_path:
+            self.migrate_from_json(legacy_json_path)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # One connection per thread; autocommit mode so transactions are
+            # only the explicit BEGIN IMMEDIATE blocks below
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._connect())
+
+    def _touch(self, conn, mobile):
+        # Stamp the user with the store version this transaction will commit
+        conn.execute(
+            "UPDATE users SET version = "
+            "(SELECT CAST(value AS INTEGER) + 1 FROM meta WHERE key = 'version') "
+            "WHERE mobile = ?",
+            (mobile,)
+        )
+
+    def _insert_user(self, conn, user):
+        values, extra = _split(
+            {k: v for k, v in user.items() if k not in ('crops', 'reminders')},
+            USER_FIELDS
+        )
+        conn.execute(
+            'INSERT INTO users (name, location, mobile, password, registered_at, extra) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (*values, extra)
+        )
+        for crop in user.get('crops', []):
+            self._insert_crop(conn, user['mobile'], crop)
+        for reminder in user.get('reminders', []):
+            self._insert_reminder(conn, user['mobile'], reminder)
+        self._touch(conn, user['mobile'])
+
+    def _insert_crop(self, conn, mobile, crop):
+        values, extra = _split(crop, CROP_FIELDS)
+        conn.execute(
+            'INSERT INTO crops (mobile, name, planting_date, area_acres, added_at, extra) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (mobile, *values, extra)
+        )
+
+    def _insert_reminder(self, conn, mobile, reminder):
+        values, extra = _split(reminder, REMINDER_FIELDS)
+        conn.execute(
+            'INSERT INTO reminders (mobile, id, created_at, title, date, description, extra) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (mobile, *values, extra)
+        )
+
+    def _read_user(self, conn, mobile):
+        row = conn.execute('SELECT * FROM users WHERE mobile = ?', (mobile,)).fetchone()
+        if row is None:
+            return None
+        user = _join(row, USER_FIELDS)
+        user['crops'] = [
+            _join(crop_row, CROP_FIELDS)
+            for crop_row in conn.execute(
+                'SELECT * FROM crops WHERE mobile = ? ORDER BY crop_id', (mobile,)
+            )
+        ]
+        user['reminders'] = [
+            _join(reminder_row, REMINDER_FIELDS)
+            for reminder_row in conn.execute(
+                'SELECT * FROM reminders WHERE mobile = ? ORDER BY id', (mobile,)
+            )
+        ]
+        return user
+
+    def get(self, mobile):
+        with _Snapshot(self._connect()) as conn:
+            return self._read_user(conn, mobile)
+
+    def version(self, mobile):
+        row = self._connect().execute(
+            'SELECT version FROM users WHERE mobile = ?', (mobile,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def store_version(self):
+        # The random store id tells a replaced users.db apart from this one
+        meta = dict(self._connect().execute(
+            "SELECT key, value FROM meta WHERE key IN ('store_id', 'version')"
+        ).fetchall())
+        return f"{meta['store_id']}:{meta['version']}"
+
+    def exists(self, mobile):
+        row = self._connect().execute(
+            'SELECT 1 FROM users WHERE mobile = ?', (mobile,)
+        ).fetchone()
+        return row is not None
+
+    def create(self, user):
+        with self._transaction() as conn:
+            if conn.execute('SELECT 1 FROM users WHERE mobile = ?', (user['mobile'],)).fetchone():
+                return False
+            self._insert_user(conn, user)
+            return True
+
+    def update(self, mobile, data):
+        with self._transaction() as conn:
+            current = self._read_user(conn, mobile)
+            if current is None:
+                return False
+
+            if 'crops' in data:
+                conn.execute('DELETE FROM crops WHERE mobile = ?', (mobile,))
+                for crop in data['crops']:
+                    self._insert_crop(conn, mobile, crop)
+            if 'reminders' in data:
+                conn.execute('DELETE FROM reminders WHERE mobile = ?', (mobile,))
+                for reminder in data['reminders']:
+                    self._insert_reminder(conn, mobile, reminder)
+
+            fields = {k: v for k, v in data.items() if k not in ('crops', 'reminders')}
+            if fields:
+                current.update(fields)
+                values, extra = _split(
+                    {k: v for k, v in current.items() if k not in ('crops', 'reminders')},
+                    USER_FIELDS
+                )
+                conn.execute(
+                    'UPDATE users SET name = ?, location = ?, mobile = ?, password = ?, '
+                    'registered_at = ?, extra = ? WHERE mobile = ?',
+                    (*values, extra, mobile)
+                )
+            self._touch(conn, mobile)
+            return True
+
+    def add_crop(self, mobile, crop):
+        with self._transaction() as conn:
+            if not conn.execute('SELECT 1 FROM users WHERE mobile = ?', (mobile,)).fetchone():
+                return False
+            self._insert_crop(conn, mobile, crop)
+            self._touch(conn, mobile)
+            return True
+
+    def add_reminder(self, mobile, reminder):
+        with self._transaction() as conn:
+            if not conn.execute('SELECT 1 FROM users WHERE mobile = ?', (mobile,)).fetchone():
+                return None
+            reminder_id = conn.execute(
+                'SELECT COALESCE(MAX(id), 0) + 1 FROM reminders WHERE mobile = ?', (mobile,)
+            ).fetchone()[0]
+            self._insert_reminder(conn, mobile, {'id': reminder_id, **reminder})
+            self._touch(conn, mobile)
+            return reminder_id
+
+    def load_all(self):
+        with _Snapshot(self._connect()) as conn:
+            mobiles = [row['mobile'] for row in conn.execute('SELECT mobile FROM users')]
+            return {mobile: self._read_user(conn, mobile) for mobile in mobiles}
+
+    def locations(self):
+        rows = self._connect().execute(
+            "SELECT DISTINCT location FROM users WHERE location IS NOT NULL AND location != ''"
+        )
+        return {row['location'] for row in rows}
+
+    def save_all(self, users):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM crops')
+            conn.execute('DELETE FROM reminders')
+            conn.execute('DELETE FROM users')
+            for mobile, user in users.items():
+                self._insert_user(conn, {**user, 'mobile': mobile})
+
+    def migrate_from_json(self, json_path):
+        """One-shot import of a legacy users.json file. Returns the number of users imported"""
+        if not os.path.exists(json_path):
+            return 0
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_json'").fetchone():
+                return 0
+            with open(json_path, 'r') as f:
+                users = json.load(f)
+            imported = 0
+            for mobile, user in users.items():
+                if conn.execute('SELECT 1 FROM users WHERE mobile = ?', (mobile,)).fetchone():
+                    continue
+                self._insert_user(conn, {**user, 'mobile': mobile})
+                imported += 1
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from_json', ?)",
+                (os.path.abspath(json_path),)
+            )
+            return imported
+
+
+class _Transaction:
+    """Context manager running a write transaction that holds the database write lock.
+
+    Every committed write bumps the store-wide version counter in the meta
+    table; users written in the transaction are stamped with the new value
+    so caches in other threads and processes can tell their copy is stale.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def _before_commit(self):
+        self.conn.execute(
+            "UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'"
+        )
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._before_commit()
+            self.conn.execute('COMMIT')
+        else:
+            self.conn.execute('ROLLBACK')
+        return False
+
+
+class _Snapshot(_Transaction):
+    """Context manager running a read transaction so multi-table reads are consistent"""
+
+    def __enter__(self):
+        self.conn.execute('BEGIN')
+        return self.conn
+
+    def _before_commit(self):
+        pass
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store():
+    """Return the process-wide user store, chosen by the USER_STORE_BACKEND env var"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = os.getenv('USER_STORE_BACKEND', 'sqlite').lower()
+                json_path = os.getenv('USERS_JSON_PATH', 'users.json')
+                if backend == 'json':
+                    _store = JSONUserStore(json_path)
+                else:
+                    _store = SQLiteUserStore(os.getenv('USERS_DB_PATH', 'users.db'), json_path)
+    return _store
+
+
+def set_user_store(store):
+    """Replace the process-wide user store (e.g. for scripts or a different deployment)"""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+if __name__ == '__main__':
+    import sys
+
+    json_path = sys.argv[1] if len(sys.argv) > 1 else 'users.json'
+    db_path = sys.argv[2] if len(sys.argv) > 2 else 'users.db'
+    store = SQLiteUserStore(db_path, legacy_json_path=None)
+    print(f"Imported {store.migrate_from_json(json_path)} users from {json_path} into {db_path}")
@@ -2,6 +2,7 @@ import requests
 import os
 from datetime import datetime
 from dotenv import load_dotenv
+from utils.http_client import http_get
 
 # Load environment variables from .env file (if it exists)
 load_dotenv()
@@ -20,7 +21,7 @@ def get_weather_data(location):
             'units': 'metric'  # Celsius
         }
         
-        response = requests.get(base_url, params=params, timeout=10)
+        response = http_get(base_url, params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -56,9 +57,9 @@ def get_weather_data(location):
     except Exception as e:
         raise Exception(f"Error fetching weather data: {str(e)}")
 
-def get_weather_forecast(location, days=5):
+def fetch_forecast_payload(location, days=5):
     """
-    Get weather forecast for specified number of days
+    Fetch the raw 3-hourly forecast response from OpenWeatherMap (None if unavailable)
     """
     try:
         api_key = os.getenv("OPENWEATHER_API_KEY", "default_key")
@@ -71,55 +72,46 @@ def get_weather_forecast(location, days=5):
             'cnt': days * 8  # 8 forecasts per day (every 3 hours)
         }
         
-        response = requests.get(base_url, params=params, timeout=10)
+        response = http_get(base_url, params=params)
         
         if response.status_code == 200:
-            data = response.json()
-            forecast = []
-            
-            for item in data['list']:
-                forecast_item = {
-                    'datetime': datetime.fromtimestamp(item['dt']),
-                    'temperature': round(item['main']['temp']),
-                    'humidity': item['main']['humidity'],
-                    'description': item['weather'][0]['description'].title(),
-                    'wind_speed': round(item['wind']['speed'] * 3.6, 1),
-                    'rainfall': item.get('rain', {}).get('3h', 0)
-                }
-                forecast.append(forecast_item)
-            
-            return forecast
+            return response.json()
         else:
             return None
             
     except Exception as e:
         raise Exception(f"Error fetching weather forecast: {str(e)}")
 
-def get_farming_weather_advisory(weather_data):
+def get_weather_forecast(location, days=5):
     """
-    Generate farming advisory based on weather conditions
+    Get the 3-hourly weather forecast for specified number of days as a
+    columnar ForecastFrame (None if unavailable)
     """
-    advisories = []
-    
-    if weather_data['temperature'] > 35:
-        advisories.append("🌡️ High temperature detected. Increase irrigation frequency and provide shade for sensitive crops.")
-    
-    if weather_data['temperature'] < 10:
-        advisories.append("🥶 Low temperature warning. Protect crops from frost damage.")
-    
-    if weather_data['humidity'] > 85:
-        advisories.append("💧 High humidity levels. Monitor for fungal diseases and improve air circulation.")
-    
-    if weather_data['humidity'] < 30:
-        advisories.append("🏜️ Low humidity. Increase irrigation and consider mulching.")
+    from utils.forecast_analytics import ForecastFrame
     
-    if weather_data['rainfall'] > 50:
-        advisories.append("🌧️ Heavy rainfall expected. Ensure proper drainage and harvest ready crops.")
+    data = fetch_forecast_payload(location, days)
+    if not data or not data.get('list'):
+        return None
     
-    if weather_data['wind_speed'] > 25:
-        advisories.append("💨 Strong winds expected. Secure tall crops and protect seedlings.")
-    
-    if not advisories:
-        advisories.append("🌱 Weather conditions are favorable for normal farming activities.")
+    try:
+        return ForecastFrame.from_payload(location, data)
+        
+    except Exception as e:
+        raise Exception(f"Error fetching weather forecast: {str(e)}")
+
+def get_farming_weather_advisory(weather_data):
+    """
+    Generate farming advisory based on weather conditions, with the same
+    rules build_advisories applies to each forecast day
+    """
+    from utils.forecast_analytics import ForecastFrame, build_advisories
     
-    return advisories
+    frame = ForecastFrame(
+        'current',
+        timestamps=[int(datetime.now().timestamp())],
+        temperature=[weather_data['temperature']],
+        humidity=[weather_data['humidity']],
+        rain=[weather_data.get('rainfall', 0)],
+        wind=[weather_data.get('wind_speed', 0)],
+    )
+    return build_advisories([frame])['current']['daily'][0]['advisories']
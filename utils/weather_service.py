@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from utils.weather_helper import get_weather_data, get_weather_forecast
+
+DEFAULT_LOCATION = "Palakkad,Kerala,IN"
+
+
+class SingleFlightCache:
+    """
+    Per-key TTL cache for slow upstream fetches.
+
+    - Fresh entries (younger than ttl) are returned directly.
+    - Stale entries (younger than ttl + stale_ttl) are returned immediately
+      while one background refresh runs (stale-while-revalidate).
+    - Missing or expired entries are fetched, and concurrent callers for the
+      same key wait on that single in-flight fetch instead of starting their own.
+    """
+
+    def __init__(self, fetch, ttl=600, stale_ttl=3600, max_workers=4):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.upstream_calls = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self._entries = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="refresh")
+
+    def _start_fetch(self, key):
+        # Caller holds self._lock
+        future = Future()
+        self._in_flight[key] = future
+        self.upstream_calls += 1
+        return future
+
+    def _run_fetch(self, key, future, *args):
+        try:
+            value = self.fetch(*args)
+        except Exception as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            return
+        with self._lock:
+            if value is not None:
+                self._entries[key] = (value, time.time())
+            self._in_flight.pop(key, None)
+        future.set_result(value)
+
+    def get(self, key, *args):
+        """Return the value for key, calling fetch(*args) on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry[1] if entry else None
+
+            if entry and age < self.ttl:
+                self.hits += 1
+                return entry[0]
+
+            if entry and age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                if key not in self._in_flight:
+                    future = self._start_fetch(key)
+                    self._executor.submit(self._run_fetch, key, future, *args)
+                return entry[0]
+
+        return self.refresh(key, *args)
+
+    def refresh(self, key, *args):
+        """Fetch key now regardless of age, joining a fetch already in flight"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._start_fetch(key)
+
+        if leader:
+            self._run_fetch(key, future, *args)
+        return future.result()
+
+    def peek(self, key):
+        """Return the cached value for key (fresh or not) without fetching"""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'upstream_calls': self.upstream_calls,
+                'entries': len(self._entries),
+            }
+
+
+def location_query(location):
+    """
+    Turn a free-text location such as "Palakkad, Kerala" into an
+    OpenWeatherMap query ("Palakkad,Kerala,IN"); blank falls back to the default
+    """
+    if not location or not location.strip():
+        return DEFAULT_LOCATION
+    parts = [part.strip() for part in location.split(',') if part.strip()]
+    if parts[-1].upper() != 'IN':
+        parts.append('IN')
+    return ','.join(parts)
+
+
+def get_user_weather_location(user_data):
+    """Weather query for a registered user's location (default location for guests)"""
+    if not user_data:
+        return DEFAULT_LOCATION
+    return location_query(user_data.get('location'))
+
+
+current_weather_cache = SingleFlightCache(
+    get_weather_data,
+    ttl=int(os.getenv('WEATHER_CACHE_TTL', '600')),
+    stale_ttl=int(os.getenv('WEATHER_STALE_TTL', '3600')),
+)
+
+forecast_cache = SingleFlightCache(
+    get_weather_forecast,
+    ttl=int(os.getenv('FORECAST_CACHE_TTL', '1800')),
+    stale_ttl=int(os.getenv('WEATHER_STALE_TTL', '3600')),
+)
+
+
+def get_current_weather(location=DEFAULT_LOCATION):
+    """Current weather for a location, served from the shared per-location cache"""
+    query = location_query(location)
+    return current_weather_cache.get(query.lower(), query)
+
+
+def refresh_current_weather(location=DEFAULT_LOCATION):
+    """Refetch a location's current weather into the shared cache (used by the background refresher)"""
+    query = location_query(location)
+    return current_weather_cache.refresh(query.lower(), query)
+
+
+def get_forecast(location=DEFAULT_LOCATION):
+    """5-day forecast for a location, served from the shared per-location cache"""
+    query = location_query(location)
+    return forecast_cache.get(query.lower(), query)
+
+
+def get_weather_cache_stats():
+    """Hit / stale-hit / upstream-call counters for the weather caches"""
+    return {
+        'current': current_weather_cache.stats(),
+        'forecast': forecast_cache.stats(),
+    }